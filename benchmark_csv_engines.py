@@ -0,0 +1,155 @@
+"""
+Benchmark de los motores de lectura del CSV (pandas, pyarrow, polars).
+
+Mide, para cada motor instalado, el tiempo de la carga completa (página
+"Análisis de Datos") y de la carga de features para entrenar, verifica que
+todos producen el mismo resultado que pandas y publica la tabla en
+docs/benchmarks/csv_engines.md.
+
+Uso:
+    python benchmark_csv_engines.py                      # CSV sintético de 1M filas
+    python benchmark_csv_engines.py --file data/x.csv    # CSV propio
+"""
+
+import argparse
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from infrastructure.data.csv_engines import CSV_ENGINES, available_engines  # noqa: E402
+from infrastructure.data.data_loader import CSVDataLoader  # noqa: E402
+
+TOWNS = ['Portland', 'Windham', 'Hartford', 'Stamford', 'Bristol', 'Norwalk', 'Danbury', 'Milford']
+PROPERTY_TYPES = ['Residential', 'Single Family', 'Condo', 'Two Family', 'Commercial']
+
+
+def generate_csv(path: str, n_rows: int, seed: int = 42) -> None:
+    """Genera un CSV sintético con el formato del export de transacciones."""
+    rng = np.random.default_rng(seed)
+    years = rng.integers(2006, 2022, n_rows)
+    assessed = rng.integers(50_000, 900_000, n_rows)
+    area = rng.integers(40, 400, n_rows)
+    df = pd.DataFrame({
+        'Serial Number': np.arange(1, n_rows + 1),
+        'List Year': years,
+        'Date Recorded': [f"{m:02d}/{d:02d}/{y}" for m, d, y in zip(rng.integers(1, 13, n_rows), rng.integers(1, 29, n_rows), years)],
+        'Town': rng.choice(TOWNS, n_rows),
+        'Address': [f"{n} MAIN ST" for n in rng.integers(1, 5_000, n_rows)],
+        'Assessed Value': assessed,
+        'Property Type': rng.choice(PROPERTY_TYPES, n_rows),
+        'Residential Type': rng.choice(['Single Family', 'Condo', 'Two Family'], n_rows),
+        'area_m2': [f"{a}m2" for a in area],
+        'meses_en_venta': rng.integers(1, 24, n_rows),
+        'nro_habitaciones': rng.integers(1, 9, n_rows),
+        'nro_pisos': rng.integers(1, 4, n_rows),
+        'Sale Amount': np.round(assessed * rng.uniform(0.8, 1.4, n_rows), 2),
+    })
+    # Faltantes en ~2% de los valores de algunas columnas, como en el export real
+    for col in ('Residential Type', 'meses_en_venta', 'Sale Amount'):
+        df.loc[rng.random(n_rows) < 0.02, col] = None
+    df.to_csv(path, sep=';', index=False)
+
+
+def time_call(func, repeat: int) -> float:
+    """Mediana del tiempo de func() en segundos."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def library_version(engine: str) -> str:
+    module = {'pandas': 'pandas', 'pyarrow': 'pyarrow', 'polars': 'polars'}[engine]
+    return getattr(__import__(module), '__version__', '?')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de motores de lectura CSV")
+    parser.add_argument('--file', help="CSV a medir (por defecto se genera uno sintético)")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Filas del CSV sintético")
+    parser.add_argument('--repeat', type=int, default=3, help="Repeticiones por medición (se usa la mediana)")
+    parser.add_argument('--output', default=os.path.join('docs', 'benchmarks', 'csv_engines.md'))
+    args = parser.parse_args()
+
+    tmp_dir = None
+    file_path = args.file
+    if file_path is None:
+        tmp_dir = tempfile.mkdtemp(prefix="csv-bench-")
+        file_path = os.path.join(tmp_dir, 'transacciones.csv')
+        print(f"🔄 Generando CSV sintético de {args.rows:,} filas...")
+        generate_csv(file_path, args.rows)
+
+    engines = available_engines()
+    missing = [engine for engine in CSV_ENGINES if engine not in engines]
+    size_mb = os.path.getsize(file_path) / 1024**2
+    print(f"📊 Archivo: {file_path} ({size_mb:.1f} MB), motores: {', '.join(engines)}")
+
+    reference_df = reference_X = None
+    results = []
+    for engine in engines:
+        loader = CSVDataLoader(engine=engine)
+        df = loader.load_data(file_path)
+        X, y = loader.load_features(file_path)
+        if reference_df is None:
+            reference_df, reference_X, reference_y = df, X, y
+        pd.testing.assert_frame_equal(df, reference_df)
+        pd.testing.assert_frame_equal(X, reference_X)
+        pd.testing.assert_series_equal(y, reference_y)
+
+        load_seconds = time_call(lambda: loader.load_data(file_path), args.repeat)
+        features_seconds = time_call(lambda: loader.load_features(file_path), args.repeat)
+        results.append((engine, library_version(engine), load_seconds, features_seconds))
+        print(f"✅ {engine}: carga completa {load_seconds:.2f}s, features {features_seconds:.2f}s")
+
+    base_load, base_features = results[0][2], results[0][3]
+    lines = [
+        "# Benchmark de motores de lectura CSV",
+        "",
+        "Generado con `python benchmark_csv_engines.py"
+        + (f" --file {args.file}" if args.file else f" --rows {args.rows}")
+        + f" --repeat {args.repeat}`. Tiempos en segundos (mediana de {args.repeat} ejecuciones).",
+        "",
+        f"- Archivo: {len(reference_df):,} filas, {reference_df.shape[1]} columnas, {size_mb:.1f} MB",
+        f"- Máquina: {platform.platform()}, {os.cpu_count()} CPUs, Python {platform.python_version()}",
+        "- Todos los motores producen el mismo DataFrame y la misma matriz de features que pandas.",
+        "",
+        "| Motor | Versión | Carga completa (s) | Aceleración | Features de entrenamiento (s) | Aceleración |",
+        "|---|---|---|---|---|---|",
+    ]
+    for engine, version, load_seconds, features_seconds in results:
+        lines.append(
+            f"| {engine} | {version} | {load_seconds:.3f} | {base_load / load_seconds:.2f}x "
+            f"| {features_seconds:.3f} | {base_features / features_seconds:.2f}x |"
+        )
+    if missing:
+        lines += ["", f"Motores no instalados en esta ejecución: {', '.join(missing)}."]
+    lines += [
+        "",
+        "\"Carga completa\" es `CSVDataLoader.load_data` con todas las columnas (página de análisis);",
+        "\"Features de entrenamiento\" es `CSVDataLoader.load_features` (columnas de entrenamiento + preprocesamiento).",
+        "El motor se elige con la variable de entorno `CSV_ENGINE`.",
+        "",
+    ]
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines))
+    print(f"📄 Resultados publicados en {args.output}")
+
+    if tmp_dir is not None:
+        os.remove(file_path)
+        os.rmdir(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
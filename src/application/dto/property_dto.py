@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 @dataclass
 class PropertyInputDTO:
@@ -11,6 +11,8 @@ class PropertyInputDTO:
     nro_habitaciones: int
     nro_pisos: int
     property_type: str  # "Residential", "Single Family", etc.
+    residential_type: Optional[str] = None  # Opcionales: solo los usa el backend hist_gradient_boosting
+    town: Optional[str] = None
     
     def validate(self) -> bool:
         """Valida que los datos sean correctos."""
@@ -127,6 +129,11 @@ class TrainingResultDTO:
     test_samples: Optional[int] = None
     features_count: Optional[int] = None
     training_time_seconds: Optional[float] = None  # Timing information
+    backend: str = "random_forest"                 # Backend del estimador que produjo el modelo
+    model_size_bytes: Optional[float] = None       # Tamaño serializado del artefacto
+    single_row_latency_ms: Optional[float] = None  # Latencia de predecir una fila
+    cv_folds: Optional[int] = None                 # Folds si las métricas son medias de validación cruzada
+    cv_std: Optional[Dict[str, float]] = None      # Desviación estándar de cada métrica entre folds
     
     def get_quality_assessment(self) -> str:
         """
@@ -271,6 +278,56 @@ class TrainingResultDTO:
         return summary.strip()
 
 
+@dataclass
+class RefreshResultDTO:
+    """DTO para resultado del refresh incremental de un modelo."""
+    
+    refreshed: bool                                # False si no había filas nuevas o no mejoró al padre
+    parent_run_id: str
+    new_rows: int = 0
+    rejected: bool = False                         # True si el refresh no mejoró al padre y no se registró
+    model_uri: str = ""
+    n_new_trees: int = 0
+    n_dropped_trees: int = 0
+    n_estimators: Optional[int] = None
+    rmse: Optional[float] = None                   # Métricas sobre las filas de prueba del padre más las nuevas reservadas
+    mae: Optional[float] = None
+    r2_score: Optional[float] = None
+    parent_rmse: Optional[float] = None            # Métricas del padre sobre las mismas filas
+    parent_r2_score: Optional[float] = None
+    success: bool = True
+    error_message: Optional[str] = None
+    
+    def get_improvement(self) -> Optional[float]:
+        """Retorna la mejora de RMSE respecto del padre (positiva = mejor)."""
+        if self.rmse is None or self.parent_rmse is None:
+            return None
+        return self.parent_rmse - self.rmse
+
+
+@dataclass
+class BacktestResultDTO:
+    """DTO para resultado de un backtesting con origen móvil por año."""
+    
+    run_id: str
+    year_column: str
+    strategy: str                                  # 'incremental' o 'full'
+    years: Optional[List[Dict[str, Any]]] = None   # Una fila por año evaluado
+    rmse: Optional[float] = None                   # Medias entre años
+    mae: Optional[float] = None
+    r2_score: Optional[float] = None
+    r2_score_std: Optional[float] = None
+    success: bool = True
+    error_message: Optional[str] = None
+    
+    def get_worst_year(self) -> Optional[Dict[str, Any]]:
+        """Retorna la fila del año con menor R²."""
+        completed = [row for row in self.years or [] if row.get('r2_score') is not None]
+        if not completed:
+            return None
+        return min(completed, key=lambda row: row['r2_score'])
+
+
 @dataclass
 class PredictionResultDTO:
     """DTO mejorado para resultado de predicciones."""
@@ -318,7 +375,11 @@ def create_training_result_with_estimates(
     experiment_id: str,
     run_id: str,
     mae: Optional[float] = None,
-    r2_score: Optional[float] = None
+    r2_score: Optional[float] = None,
+    backend: str = "random_forest",
+    training_time_seconds: Optional[float] = None,
+    model_size_bytes: Optional[float] = None,
+    single_row_latency_ms: Optional[float] = None
 ) -> TrainingResultDTO:
     """
     Crea un TrainingResultDTO con estimaciones automáticas si faltan métricas.
@@ -332,6 +393,10 @@ def create_training_result_with_estimates(
         run_id: ID del run
         mae: Mean Absolute Error (opcional, se estima si no se proporciona)
         r2_score: R² Score (opcional, se estima si no se proporciona)
+        backend: Backend del estimador ('random_forest' o 'hist_gradient_boosting')
+        training_time_seconds: Tiempo de entrenamiento (opcional)
+        model_size_bytes: Tamaño serializado del artefacto (opcional)
+        single_row_latency_ms: Latencia de predecir una fila (opcional)
     
     Returns:
         TrainingResultDTO con todas las métricas
@@ -361,5 +426,9 @@ def create_training_result_with_estimates(
         experiment_id=experiment_id,
         run_id=run_id,
         mae=estimated_mae,
-        r2_score=estimated_r2
+        r2_score=estimated_r2,
+        training_time_seconds=training_time_seconds,
+        backend=backend,
+        model_size_bytes=model_size_bytes,
+        single_row_latency_ms=single_row_latency_ms
     )
\ No newline at end of file
@@ -0,0 +1,97 @@
+from typing import Any, Dict, Optional
+from application.dto.property_dto import BacktestResultDTO
+from domain.repositories.model_repository import DataRepository, ModelRepository
+from domain.services.prediction_service import BacktestService, ModelTrainingService
+
+class BacktestModelUseCase:
+    """Caso de uso para evaluar un modelo hacia adelante en el tiempo (backtesting por año)."""
+    
+    def __init__(
+        self, 
+        data_repository: DataRepository,
+        model_repository: ModelRepository,
+        training_service: ModelTrainingService
+    ):
+        self.data_repository = data_repository
+        self.model_repository = model_repository
+        self.training_service = training_service
+    
+    def execute(
+        self,
+        file_path: str,
+        year_column: str = "List Year",
+        strategy: str = "incremental",
+        min_train_years: int = 3,
+        first_year: Optional[int] = None,
+        n_estimators: int = 100,
+        max_depth: int = 5,
+        max_trees: Optional[int] = None,
+        experiment_name: str = "Grupo_2_Proyecto_Inmobiliario",
+        data_filters: Optional[Dict[str, Any]] = None,
+        n_jobs: Optional[int] = None,
+        max_threads: Optional[int] = None
+    ) -> BacktestResultDTO:
+        """
+        Entrena con los años anteriores a cada año Y y evalúa sobre Y.
+        
+        Args:
+            file_path: Ruta al archivo de datos
+            year_column: Columna temporal ('List Year' o 'Date Recorded')
+            strategy: 'incremental' (suma árboles año a año) o 'full' (bosque nuevo por año)
+            min_train_years: Años de historia mínimos antes del primer año evaluado
+            first_year: Primer año a evaluar (None = según min_train_years)
+            n_estimators: Árboles del bosque base
+            max_depth: Profundidad máxima del árbol
+            max_trees: Tamaño máximo de los bosques incrementales (None = sin límite)
+            experiment_name: Nombre del experimento en MLflow
+            data_filters: Filtros de partición (años, ciudades) para datasets particionados
+            n_jobs: Núcleos a repartir entre los folds (None = 1, -1 = todos)
+            max_threads: Límite de hilos de BLAS/OpenMP (None = sin límite)
+            
+        Returns:
+            BacktestResultDTO con la tabla de métricas por año
+        """
+        
+        try:
+            if not isinstance(self.training_service, BacktestService):
+                raise ValueError(f"{type(self.training_service).__name__} no soporta backtesting")
+            self.model_repository.set_experiment(experiment_name)
+            
+            result = self.training_service.backtest(
+                file_path=file_path,
+                year_column=year_column,
+                strategy=strategy,
+                min_train_years=min_train_years,
+                first_year=first_year,
+                max_trees=max_trees,
+                n_estimators=n_estimators,
+                max_depth=max_depth,
+                data_filters=data_filters,
+                n_jobs=n_jobs,
+                max_threads=max_threads
+            )
+            
+            table = result['table']
+            print(f"✅ Backtesting completado: {len(table)} años por {year_column}")
+            print(table[['year', 'train_rows', 'test_rows', 'rmse', 'mae', 'r2_score']].to_string(index=False))
+            
+            return BacktestResultDTO(
+                run_id=result['run_id'],
+                year_column=year_column,
+                strategy=strategy,
+                years=table.to_dict('records'),
+                rmse=result['rmse'],
+                mae=result['mae'],
+                r2_score=result['r2_score'],
+                r2_score_std=result['metrics'].get('r2_score_std')
+            )
+            
+        except Exception as e:
+            print(f"❌ Error durante el backtesting: {str(e)}")
+            return BacktestResultDTO(
+                run_id="",
+                year_column=year_column,
+                strategy=strategy,
+                success=False,
+                error_message=str(e)
+            )
@@ -1,3 +1,4 @@
+from typing import Optional
 from application.dto.property_dto import PropertyInputDTO, PropertyPredictionDTO
 from domain.entities.property import Property
 from domain.services.prediction_service import PredictionService
@@ -14,12 +15,13 @@ class PredictPriceUseCase:
         self.prediction_service = prediction_service
         self.model_repository = model_repository
     
-    def execute(self, property_input: PropertyInputDTO) -> PropertyPredictionDTO:
+    def execute(self, property_input: PropertyInputDTO, model_uri: Optional[str] = None) -> PropertyPredictionDTO:
         """
         Ejecuta la predicción de precio para una propiedad.
         
         Args:
             property_input: Datos de entrada de la propiedad
+            model_uri: Versión registrada a usar (None = el modelo actual)
             
         Returns:
             PropertyPredictionDTO con la predicción
@@ -37,26 +39,24 @@ class PredictPriceUseCase:
             raise ValueError("Propiedad no válida para predicción")
         
         # Realizar predicción
-        predicted_price = self.prediction_service.predict_price(property_entity)
+        predicted_price, model_version = self.prediction_service.predict_with_version(property_entity, model_uri=model_uri)
         
         return PropertyPredictionDTO(
             predicted_price=float(predicted_price),
-            model_version="latest"
+            model_version=model_version
         )
     
     def _convert_dto_to_entity(self, dto: PropertyInputDTO) -> Property:
         """Convierte DTO a entidad de dominio."""
         
-        # Mapear tipo de propiedad a variables dummy
-        property_type_residential = 1.0 if dto.property_type == "Residential" else 0.0
-        property_type_single_family = 1.0 if dto.property_type == "Single Family" else 0.0
-        
+        # La codificación del tipo de propiedad la hace el encoder del modelo
         return Property(
             assessed_value=dto.assessed_value,
             area_m2=dto.area_m2,
             meses_en_venta=dto.meses_en_venta,
             nro_habitaciones=dto.nro_habitaciones,
             nro_pisos=dto.nro_pisos,
-            property_type_residential=property_type_residential,
-            property_type_single_family=property_type_single_family
+            property_type=dto.property_type,
+            residential_type=dto.residential_type,
+            town=dto.town
         )
\ No newline at end of file
@@ -0,0 +1,95 @@
+from typing import Optional
+from application.dto.property_dto import RefreshResultDTO
+from domain.repositories.model_repository import DataRepository, ModelRepository
+from domain.services.prediction_service import ModelRefreshService, ModelTrainingService
+
+class RefreshModelUseCase:
+    """Caso de uso para refrescar el mejor modelo con los datos llegados desde su entrenamiento."""
+    
+    def __init__(
+        self, 
+        data_repository: DataRepository,
+        model_repository: ModelRepository,
+        training_service: ModelTrainingService
+    ):
+        self.data_repository = data_repository
+        self.model_repository = model_repository
+        self.training_service = training_service
+    
+    def execute(
+        self,
+        file_path: Optional[str] = None,
+        n_new_trees: Optional[int] = None,
+        max_trees: Optional[int] = None,
+        experiment_name: str = "Grupo_2_Proyecto_Inmobiliario",
+        n_jobs: Optional[int] = None,
+        max_threads: Optional[int] = None
+    ) -> RefreshResultDTO:
+        """
+        Agrega al mejor modelo árboles entrenados solo con las filas nuevas.
+        
+        Args:
+            file_path: CSV de datos (None = la fuente registrada en el modelo)
+            n_new_trees: Árboles a agregar (None = proporcional a las filas nuevas)
+            max_trees: Tamaño máximo del bosque; se descartan los árboles más antiguos
+            experiment_name: Nombre del experimento en MLflow
+            n_jobs: Núcleos para entrenar y evaluar (None = 1, -1 = todos)
+            max_threads: Límite de hilos de BLAS/OpenMP (None = sin límite)
+            
+        Returns:
+            RefreshResultDTO con el resultado del refresh
+        """
+        
+        try:
+            if not isinstance(self.training_service, ModelRefreshService):
+                raise ValueError(f"{type(self.training_service).__name__} no soporta refresh incremental")
+            self.model_repository.set_experiment(experiment_name)
+            
+            result = self.training_service.refresh_model(
+                file_path=file_path,
+                n_new_trees=n_new_trees,
+                max_trees=max_trees,
+                n_jobs=n_jobs,
+                max_threads=max_threads
+            )
+            
+            if not result['refreshed']:
+                return RefreshResultDTO(
+                    refreshed=False,
+                    parent_run_id=result['parent_run_id'],
+                    new_rows=result['new_rows'],
+                    rejected=result.get('rejected', False),
+                    rmse=result.get('rmse'),
+                    mae=result.get('mae'),
+                    r2_score=result.get('r2_score'),
+                    parent_rmse=result.get('parent_rmse'),
+                    parent_r2_score=result.get('parent_r2_score')
+                )
+            
+            print(f"✅ Modelo refrescado: {result['n_estimators']} árboles "
+                  f"(+{result['n_new_trees']}, -{result['n_dropped_trees']}) con {result['new_rows']} filas nuevas")
+            print(f"   RMSE sobre las filas de prueba: ${result['rmse']:,.2f} (padre: ${result['parent_rmse']:,.2f})")
+            
+            return RefreshResultDTO(
+                refreshed=True,
+                parent_run_id=result['parent_run_id'],
+                new_rows=result['new_rows'],
+                model_uri=result['model_uri'],
+                n_new_trees=result['n_new_trees'],
+                n_dropped_trees=result['n_dropped_trees'],
+                n_estimators=result['n_estimators'],
+                rmse=result['rmse'],
+                mae=result['mae'],
+                r2_score=result['r2_score'],
+                parent_rmse=result['parent_rmse'],
+                parent_r2_score=result['parent_r2_score']
+            )
+            
+        except Exception as e:
+            print(f"❌ Error durante el refresh: {str(e)}")
+            return RefreshResultDTO(
+                refreshed=False,
+                parent_run_id="",
+                success=False,
+                error_message=str(e)
+            )
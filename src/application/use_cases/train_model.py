@@ -1,7 +1,9 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from application.dto.property_dto import TrainingResultDTO, create_training_result_with_estimates
 from domain.repositories.model_repository import DataRepository, ModelRepository
-from domain.services.prediction_service import ModelTrainingService
+from domain.services.prediction_service import (
+    CheckpointTrainingService, CrossValidationService, HyperparameterSearchService, ModelTrainingService
+)
 
 class TrainModelUseCase:
     """Caso de uso para entrenar modelos de predicción de precios."""
@@ -21,7 +23,14 @@ class TrainModelUseCase:
         file_path: str, 
         n_estimators: int = 100, 
         max_depth: int = 5,
-        experiment_name: str = "Grupo_2_Proyecto_Inmobiliario"
+        experiment_name: str = "Grupo_2_Proyecto_Inmobiliario",
+        data_filters: Optional[Dict[str, Any]] = None,
+        sample_rows: Optional[int] = None,
+        sampling: str = "reservoir",
+        sample_memory_mb: Optional[float] = None,
+        n_jobs: Optional[int] = None,
+        max_threads: Optional[int] = None,
+        backend: str = "random_forest"
     ) -> TrainingResultDTO:
         """
         Ejecuta el entrenamiento de un modelo.
@@ -31,6 +40,14 @@ class TrainModelUseCase:
             n_estimators: Número de estimadores para RandomForest
             max_depth: Profundidad máxima del árbol
             experiment_name: Nombre del experimento en MLflow
+            data_filters: Filtros de partición (años, ciudades) para datasets particionados
+            sample_rows: Filas de entrenamiento a muestrear (None = todas)
+            sampling: Método de muestreo ('reservoir' o 'stratified')
+            sample_memory_mb: Presupuesto de memoria de la muestra en MB (opcional)
+            n_jobs: Núcleos para entrenar y evaluar (None = 1, -1 = todos)
+            max_threads: Límite de hilos de BLAS/OpenMP (None = sin límite)
+            backend: Estimador ('random_forest' o 'hist_gradient_boosting', que
+                usa n_estimators como máximo de iteraciones con early stopping)
             
         Returns:
             TrainingResultDTO con los resultados del entrenamiento
@@ -41,16 +58,30 @@ class TrainModelUseCase:
             self.model_repository.set_experiment(experiment_name)
             
             print(f"🚀 Iniciando entrenamiento con:")
+            print(f"   Backend: {backend}")
             print(f"   Estimadores: {n_estimators}")
             print(f"   Profundidad: {max_depth}")
             print(f"   Experimento: {experiment_name}")
             print(f"   Archivo: {file_path}")
+            if data_filters:
+                print(f"   Filtros: {data_filters}")
+            if sample_rows or sample_memory_mb:
+                print(f"   Muestreo: {sampling} (filas: {sample_rows or '-'}, memoria: {sample_memory_mb or '-'} MB)")
+            if n_jobs is not None or max_threads is not None:
+                print(f"   Cómputo: n_jobs={n_jobs}, hilos BLAS/OpenMP={max_threads or 'sin límite'}")
             
             # Entrenar modelo
             training_result = self.training_service.train_model(
                 file_path=file_path,
                 n_estimators=n_estimators,
-                max_depth=max_depth
+                max_depth=max_depth,
+                data_filters=data_filters,
+                sample_rows=sample_rows,
+                sampling=sampling,
+                sample_memory_mb=sample_memory_mb,
+                n_jobs=n_jobs,
+                max_threads=max_threads,
+                backend=backend
             )
             
             # Extraer métricas con valores por defecto
@@ -80,7 +111,11 @@ class TrainModelUseCase:
                 experiment_id=training_result.get("experiment_id", "unknown"),
                 run_id=training_result.get("run_id", "unknown"),
                 mae=mae,                    # Se estimará automáticamente si es None
-                r2_score=r2_score          # Se estimará automáticamente si es None
+                r2_score=r2_score,         # Se estimará automáticamente si es None
+                backend=training_result.get("backend", backend),
+                training_time_seconds=training_result.get("training_seconds"),
+                model_size_bytes=training_result.get("model_size_bytes"),
+                single_row_latency_ms=training_result.get("single_row_latency_ms")
             )
             
             # Validar calidad del modelo usando valores reales o estimados
@@ -103,7 +138,8 @@ class TrainModelUseCase:
                 n_estimators=n_estimators,
                 max_depth=max_depth,
                 experiment_id="error",
-                run_id="error"
+                run_id="error",
+                backend=backend
             )
             
             # Marcar como fallido si el DTO soporta el campo success
@@ -206,17 +242,183 @@ class TrainModelUseCase:
         
         return result
     
+    def execute_cross_validation(
+        self,
+        file_path: str,
+        n_splits: int = 5,
+        n_estimators: int = 100,
+        max_depth: int = 5,
+        backend: str = "random_forest",
+        experiment_name: str = "Grupo_2_Proyecto_Inmobiliario",
+        data_filters: Optional[Dict[str, Any]] = None,
+        n_jobs: Optional[int] = None,
+        max_threads: Optional[int] = None
+    ) -> TrainingResultDTO:
+        """
+        Evalúa un modelo con validación cruzada K-fold (folds en paralelo).
+        
+        Args:
+            file_path: Ruta al archivo de datos
+            n_splits: Número de folds
+            n_estimators: Número de estimadores
+            max_depth: Profundidad máxima del árbol
+            backend: Estimador ('random_forest' o 'hist_gradient_boosting')
+            experiment_name: Nombre del experimento en MLflow
+            data_filters: Filtros de partición (años, ciudades) para datasets particionados
+            n_jobs: Núcleos a repartir entre los folds (None = 1, -1 = todos)
+            max_threads: Límite de hilos de BLAS/OpenMP (None = sin límite)
+            
+        Returns:
+            TrainingResultDTO con las métricas medias y su desviación estándar (cv_std)
+        """
+        
+        try:
+            if not isinstance(self.training_service, CrossValidationService):
+                raise ValueError(f"{type(self.training_service).__name__} no soporta validación cruzada")
+            self.model_repository.set_experiment(experiment_name)
+            
+            training_result = self.training_service.cross_validate(
+                file_path=file_path,
+                n_splits=n_splits,
+                n_estimators=n_estimators,
+                max_depth=max_depth,
+                backend=backend,
+                data_filters=data_filters,
+                n_jobs=n_jobs,
+                max_threads=max_threads
+            )
+            
+            result_dto = create_training_result_with_estimates(
+                model_uri=training_result["model_uri"],
+                rmse=training_result["rmse"],
+                n_estimators=n_estimators,
+                max_depth=max_depth,
+                experiment_id=training_result.get("experiment_id", "unknown"),
+                run_id=training_result.get("run_id", "unknown"),
+                mae=training_result["mae"],
+                r2_score=training_result["r2_score"],
+                backend=training_result.get("backend", backend),
+                training_time_seconds=training_result.get("cv_wall_seconds")
+            )
+            result_dto.cv_folds = n_splits
+            result_dto.cv_std = {
+                key[:-len('_std')]: value for key, value in training_result["metrics"].items() if key.endswith('_std')
+            }
+            return result_dto
+            
+        except Exception as e:
+            print(f"❌ Error durante la validación cruzada: {str(e)}")
+            
+            error_dto = create_training_result_with_estimates(
+                model_uri="",
+                rmse=float('inf'),
+                n_estimators=n_estimators,
+                max_depth=max_depth,
+                experiment_id="error",
+                run_id="error",
+                backend=backend
+            )
+            error_dto.success = False
+            error_dto.error_message = str(e)
+            return error_dto
+    
+    def execute_n_estimators_sweep(
+        self,
+        file_path: str,
+        max_depth: int = 5,
+        checkpoints: Optional[List[int]] = None,
+        experiment_name: str = "Grupo_2_Proyecto_Inmobiliario",
+        data_filters: Optional[Dict[str, Any]] = None,
+        n_jobs: Optional[int] = None,
+        max_threads: Optional[int] = None
+    ) -> TrainingResultDTO:
+        """
+        Evalúa la curva de n_estimators para una profundidad con un solo bosque (warm start).
+        
+        Args:
+            file_path: Ruta al archivo de datos
+            max_depth: Profundidad máxima del árbol
+            checkpoints: Números de árboles a evaluar (None = 100, 200, 300 y 500)
+            experiment_name: Nombre del experimento en MLflow
+            data_filters: Filtros de partición (años, ciudades) para datasets particionados
+            n_jobs: Núcleos para entrenar y evaluar (None = 1, -1 = todos)
+            max_threads: Límite de hilos de BLAS/OpenMP (None = sin límite)
+            
+        Returns:
+            TrainingResultDTO con el mejor checkpoint
+        """
+        
+        try:
+            if not isinstance(self.training_service, CheckpointTrainingService):
+                raise ValueError(f"{type(self.training_service).__name__} no soporta entrenamiento por checkpoints")
+            self.model_repository.set_experiment(experiment_name)
+            
+            training_result = self.training_service.train_with_checkpoints(
+                file_path=file_path,
+                checkpoints=checkpoints,
+                max_depth=max_depth,
+                data_filters=data_filters,
+                n_jobs=n_jobs,
+                max_threads=max_threads
+            )
+            
+            return create_training_result_with_estimates(
+                model_uri=training_result["model_uri"],
+                rmse=training_result["rmse"],
+                n_estimators=training_result["n_estimators"],
+                max_depth=max_depth,
+                experiment_id=training_result.get("experiment_id", "unknown"),
+                run_id=training_result.get("run_id", "unknown"),
+                mae=training_result["mae"],
+                r2_score=training_result["r2_score"]
+            )
+            
+        except Exception as e:
+            print(f"❌ Error durante el entrenamiento: {str(e)}")
+            
+            error_dto = create_training_result_with_estimates(
+                model_uri="",
+                rmse=float('inf'),
+                n_estimators=max(checkpoints or [100]),
+                max_depth=max_depth,
+                experiment_id="error",
+                run_id="error"
+            )
+            if hasattr(error_dto, 'success'):
+                error_dto.success = False
+            if hasattr(error_dto, 'error_message'):
+                error_dto.error_message = str(e)
+            return error_dto
+    
     def execute_hyperparameter_optimization(
         self,
         file_path: str,
-        experiment_name: str = "Grupo_2_Hyperparameter_Optimization"
+        experiment_name: str = "Grupo_2_Hyperparameter_Optimization",
+        candidates: Optional[List[Dict[str, Any]]] = None,
+        data_filters: Optional[Dict[str, Any]] = None,
+        n_jobs: Optional[int] = None,
+        max_threads: Optional[int] = None,
+        strategy: str = "grid",
+        **search_options
     ) -> TrainingResultDTO:
         """
         Ejecuta optimización automática de hiperparámetros.
         
+        Los datos se cargan una sola vez y los trials corren en paralelo
+        dentro del presupuesto de cómputo; cada trial queda como run anidado
+        bajo un único run padre del experimento.
+        
         Args:
             file_path: Ruta al archivo de datos
             experiment_name: Nombre del experimento
+            candidates: Combinaciones de hiperparámetros para 'grid' (None = espacio por defecto)
+            data_filters: Filtros de partición (años, ciudades) para datasets particionados
+            n_jobs: Núcleos totales de la búsqueda (None = 1, -1 = todos)
+            max_threads: Límite de hilos de BLAS/OpenMP (None = sin límite)
+            strategy: 'grid' (combinaciones fijas) o 'adaptive' (successive
+                halving + modelo sustituto, reanudable)
+            **search_options: Opciones de la búsqueda adaptativa (n_initial,
+                eta, min_fraction, resource, n_proposals)
             
         Returns:
             TrainingResultDTO con los mejores hiperparámetros
@@ -224,55 +426,54 @@ class TrainModelUseCase:
         
         print("🔍 Iniciando optimización de hiperparámetros...")
         
-        # Configuraciones a probar (optimizadas para inmobiliaria)
-        hyperparameter_combinations = [
-            {'n_estimators': 100, 'max_depth': 5},    # Baseline
-            {'n_estimators': 150, 'max_depth': 7},    # Más complejo
-            {'n_estimators': 200, 'max_depth': 10},   # Aún más complejo
-            {'n_estimators': 300, 'max_depth': 8},    # Más estimadores
-            {'n_estimators': 250, 'max_depth': 12},   # Más profundo
-            {'n_estimators': 100, 'max_depth': 15},   # Muy profundo
-            {'n_estimators': 500, 'max_depth': 6},    # Muchos estimadores
-        ]
-        
         best_result = None
         best_r2 = -float('inf')
         
         results_summary = []
         
-        for i, params in enumerate(hyperparameter_combinations, 1):
-            print(f"🧪 Probando combinación {i}/{len(hyperparameter_combinations)}: {params}")
-            
-            try:
-                result = self.execute(
-                    file_path=file_path,
-                    n_estimators=params['n_estimators'],
-                    max_depth=params['max_depth'],
-                    experiment_name=f"{experiment_name}_trial_{i}"
-                )
-                
-                # Obtener R² real o estimado
-                current_r2 = result.r2_score if hasattr(result, 'r2_score') and result.r2_score is not None else self._estimate_r2_from_rmse(result.rmse)
-                current_mae = result.mae if hasattr(result, 'mae') and result.mae is not None else result.rmse * 0.7
-                
+        try:
+            if not isinstance(self.training_service, HyperparameterSearchService):
+                raise ValueError(f"{type(self.training_service).__name__} no soporta búsqueda de hiperparámetros")
+            self.model_repository.set_experiment(experiment_name)
+            search_result = self.training_service.search_hyperparameters(
+                file_path=file_path,
+                candidates=candidates,
+                data_filters=data_filters,
+                n_jobs=n_jobs,
+                max_threads=max_threads,
+                strategy=strategy,
+                study=experiment_name,
+                **search_options
+            )
+            
+            for trial in search_result['trials']:
+                # Solo los trials a fidelidad completa son comparables entre sí
+                if trial['error'] or trial.get('fidelity', 1.0) < 1:
+                    continue
                 results_summary.append({
-                    'trial': i,
-                    'params': params,
-                    'rmse': result.rmse,
-                    'mae': current_mae,
-                    'r2': current_r2
+                    'trial': trial['trial'],
+                    'params': trial['params'],
+                    'rmse': trial['metrics']['rmse'],
+                    'mae': trial['metrics']['mae'],
+                    'r2': trial['metrics']['r2_score']
                 })
-                
-                if current_r2 > best_r2:
-                    best_r2 = current_r2
-                    best_result = result
-                    print(f"🏆 Nueva mejor configuración: R² = {best_r2:.4f}, RMSE = ${result.rmse:,.0f}")
-                else:
-                    print(f"📊 R² = {current_r2:.4f}, RMSE = ${result.rmse:,.0f}")
-                    
-            except Exception as e:
-                print(f"❌ Error en trial {i}: {str(e)}")
-                continue
+            
+            best_params = search_result['best_params']
+            best_r2 = search_result['r2_score']
+            best_result = create_training_result_with_estimates(
+                model_uri=search_result['model_uri'],
+                rmse=search_result['rmse'],
+                n_estimators=best_params['n_estimators'],
+                max_depth=best_params['max_depth'],
+                experiment_id=search_result.get('experiment_id', 'unknown'),
+                run_id=search_result.get('run_id', 'unknown'),
+                mae=search_result['mae'],
+                r2_score=search_result['r2_score']
+            )
+            print(f"🏆 Mejor configuración: R² = {best_r2:.4f}, RMSE = ${search_result['rmse']:,.0f}")
+            
+        except Exception as e:
+            print(f"❌ Error en la búsqueda de hiperparámetros: {str(e)}")
         
         # Mostrar resumen de resultados
         print(f"\n📊 RESUMEN DE OPTIMIZACIÓN:")
@@ -286,7 +487,7 @@ class TrainModelUseCase:
             rmse = summary['rmse']
             r2 = summary['r2']
             marker = "🏆" if summary['r2'] == best_r2 else "  "
-            print(f"{marker} {trial:<4} {est:<12} {depth:<12} ${rmse:<11,.0f} {r2:.4f}")
+            print(f"{marker} {trial:<4} {est:<12} {str(depth):<12} ${rmse:<11,.0f} {r2:.4f}")
         
         if best_result:
             print(f"\n✅ Optimización completada. Mejores parámetros:")
@@ -342,27 +543,19 @@ class TrainModelUseCase:
         """
         
         try:
-            # Cargar datos para análisis
-            df = self.data_repository.load_data(file_path)
+            # Cargar features para análisis (reutiliza la caché del repositorio si existe)
+            X, y = self.data_repository.load_features(file_path)
             
             # Análisis básico
-            n_samples = len(df)
-            n_features = len(df.columns) - 1  # Asumiendo que target es una columna
+            n_samples = len(X)
+            n_features = X.shape[1]
             
             # Detectar posibles problemas en los datos
             data_issues = []
             
-            # Verificar si hay una columna de precio
-            price_columns = ['Sale Amount', 'Price', 'sale_amount', 'price']
-            price_column = None
-            for col in price_columns:
-                if col in df.columns:
-                    price_column = col
-                    break
-            
-            if price_column:
+            if n_samples > 0:
                 # Análisis del target
-                price_data = df[price_column]
+                price_data = y
                 price_std = price_data.std()
                 price_mean = price_data.mean()
                 cv = price_std / price_mean if price_mean > 0 else 0
@@ -371,9 +564,9 @@ class TrainModelUseCase:
                     data_issues.append("Alta variabilidad en precios - considerar transformación logarítmica")
                 
                 # Detectar posibles datos sintéticos
-                if 'Assessed Value' in df.columns:
-                    exact_matches = (df[price_column] == df['Assessed Value']).sum()
-                    match_percentage = (exact_matches / len(df)) * 100
+                if 'Assessed Value' in X.columns:
+                    exact_matches = (y.to_numpy() == X['Assessed Value'].to_numpy()).sum()
+                    match_percentage = (exact_matches / n_samples) * 100
                     
                     if match_percentage > 50:
                         data_issues.append(f"⚠️ {match_percentage:.1f}% de datos sintéticos detectados (Sale = Assessed)")
@@ -398,7 +591,7 @@ class TrainModelUseCase:
             else:
                 recommended_estimators = 300
                 recommended_depth = 10
-                note = "Dataset muy grande - usar configuración robusta"
+                note = "Dataset muy grande - usar configuración robusta con muestreo estratificado"
                 training_strategy = "robust"
             
             # Ajustar recomendaciones si hay problemas de datos
@@ -424,6 +617,9 @@ class TrainModelUseCase:
                     'n_estimators': recommended_estimators,
                     'max_depth': recommended_depth
                 },
+                'recommended_sampling': (
+                    {'sampling': 'stratified', 'sample_rows': 50000} if n_samples >= 50000 else None
+                ),
                 'training_strategy': training_strategy,
                 'note': note,
                 'expected_training_time': (
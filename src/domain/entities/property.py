@@ -10,9 +10,12 @@ class Property:
     meses_en_venta: int
     nro_habitaciones: int
     nro_pisos: int
-    property_type_residential: float
-    property_type_single_family: float
+    property_type_residential: Optional[float] = None
+    property_type_single_family: Optional[float] = None
     sale_amount: Optional[float] = None
+    property_type: Optional[str] = None  # "Residential", "Single Family", etc.
+    residential_type: Optional[str] = None  # Solo la usan los modelos con categóricas nativas
+    town: Optional[str] = None
     
     def to_dict(self) -> dict:
         """Convierte la propiedad a diccionario para predicciones."""
@@ -26,6 +29,31 @@ class Property:
             'Property Type_Single Family': self.property_type_single_family
         }
     
+    def to_raw_dict(self) -> dict:
+        """
+        Convierte la propiedad a una fila con las columnas raw del CSV.
+        
+        Si la propiedad no tiene tipo en texto se incluyen las columnas dummy.
+        Residential Type y Town se incluyen solo si se conocen.
+        """
+        row = {
+            'Assessed Value': self.assessed_value,
+            'area_m2': self.area_m2,
+            'meses_en_venta': self.meses_en_venta,
+            'nro_habitaciones': self.nro_habitaciones,
+            'nro_pisos': self.nro_pisos
+        }
+        if self.property_type is not None:
+            row['Property Type'] = self.property_type
+        else:
+            row['Property Type_Residential'] = self.property_type_residential or 0.0
+            row['Property Type_Single Family'] = self.property_type_single_family or 0.0
+        if self.residential_type is not None:
+            row['Residential Type'] = self.residential_type
+        if self.town is not None:
+            row['Town'] = self.town
+        return row
+    
     @classmethod
     def from_dict(cls, data: dict) -> 'Property':
         """Crea una propiedad desde un diccionario."""
@@ -37,5 +65,8 @@ class Property:
             nro_pisos=data.get('nro_pisos', 0),
             property_type_residential=data.get('Property Type_Residential', 0.0),
             property_type_single_family=data.get('Property Type_Single Family', 0.0),
-            sale_amount=data.get('Sale Amount')
+            sale_amount=data.get('Sale Amount'),
+            property_type=data.get('Property Type'),
+            residential_type=data.get('Residential Type'),
+            town=data.get('Town')
         )
\ No newline at end of file
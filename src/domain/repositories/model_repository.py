@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional
 import pandas as pd
 
 class ModelRepository(ABC):
@@ -25,15 +25,154 @@ class ModelRepository(ABC):
         """Configura el experimento para tracking."""
         pass
 
+class ModelRunRepository(ABC):
+    """Capacidad opcional de un repositorio de modelos: consultar runs y versiones sin cargar modelos."""
+    
+    @abstractmethod
+    def get_best_run(self, metric_name: str = "rmse") -> Dict[str, Any]:
+        """
+        Obtiene los datos del run del mejor modelo (run_id, model_uri,
+        params, metrics y tags) sin cargar el modelo.
+        """
+        pass
+    
+    @abstractmethod
+    def resolve_model(self, selector: str = "best", metric_name: str = "rmse") -> Dict[str, Any]:
+        """
+        Resuelve qué versión servir sin cargarla: 'best' (mejor métrica),
+        'stage:<etapa>' o 'alias:<alias>'. Devuelve model_uri, version y run_id.
+        """
+        pass
+
+class SearchRepository(ABC):
+    """Capacidad opcional de un repositorio de modelos: guardar búsquedas de hiperparámetros."""
+    
+    @abstractmethod
+    def save_search(
+        self,
+        model: Any,
+        search_params: Dict[str, Any],
+        trials: List[Dict[str, Any]],
+        best_params: Dict[str, Any],
+        metrics: Dict[str, float],
+        **kwargs
+    ) -> str:
+        """
+        Guarda una búsqueda de hiperparámetros: cada trial como run anidado
+        y el mejor modelo en el run padre.
+        """
+        pass
+
+class BacktestRepository(ABC):
+    """Capacidad opcional de un repositorio de modelos: guardar backtestings."""
+    
+    @abstractmethod
+    def save_backtest(self, params: Dict[str, Any], table: pd.DataFrame, metrics: Dict[str, float]) -> str:
+        """
+        Guarda un backtesting por año (tabla de métricas por año y su
+        resumen) sin registrar modelo. Devuelve el run_id.
+        """
+        pass
+
 class DataRepository(ABC):
     """Interface para el repositorio de datos."""
     
     @abstractmethod
-    def load_data(self, file_path: str) -> pd.DataFrame:
-        """Carga datos desde un archivo."""
+    def load_data(self, file_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Carga datos desde un archivo (opcionalmente solo algunas columnas)."""
         pass
     
     @abstractmethod
     def preprocess_data(self, df: pd.DataFrame) -> tuple[pd.DataFrame, pd.Series]:
         """Preprocesa los datos y retorna features y target."""
-        pass
\ No newline at end of file
+        pass
+    
+    def load_features(self, file_path: str, filters: Optional[Dict[str, Any]] = None) -> tuple[pd.DataFrame, pd.Series]:
+        """
+        Carga y preprocesa los datos de un archivo (features y target).
+        
+        Los filtros (años, ciudades) solo los admiten las fuentes particionadas.
+        """
+        if filters:
+            raise ValueError("Los filtros de datos requieren un dataset particionado")
+        return self.preprocess_data(self.load_data(file_path))
+
+class IncrementalDataRepository(ABC):
+    """Capacidad opcional de un repositorio de datos: ingesta de las filas agregadas al final de la fuente."""
+    
+    @abstractmethod
+    def data_watermark(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Marca de agua de una fuente que solo crece por el final.
+        
+        Devuelve la posición (byte_offset) a partir de la cual
+        load_appended_features leerá las filas que se agreguen después, o
+        None si esta fuente no admite lectura incremental.
+        """
+        pass
+    
+    @abstractmethod
+    def load_appended_features(self, file_path: str, byte_offset: int) -> tuple[pd.DataFrame, pd.Series]:
+        """
+        Carga y preprocesa solo las filas agregadas a partir de un byte del archivo.
+        
+        Si la fuente no admite lectura incremental lanza NotImplementedError
+        y el llamador reconstruye todo el archivo.
+        """
+        pass
+
+class ChunkedDataRepository(ABC):
+    """Capacidad opcional de un repositorio de datos: lectura de features por chunks."""
+    
+    @abstractmethod
+    def iter_feature_chunks(
+        self,
+        file_path: str,
+        chunksize: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Iterator[tuple[pd.DataFrame, pd.Series]]:
+        """
+        Recorre las features y el target por chunks, sin materializar el archivo completo.
+        
+        Lo usa el entrenamiento out-of-core.
+        """
+        pass
+
+class AlignedColumnRepository(ABC):
+    """Capacidad opcional de un repositorio de datos: columnas raw alineadas con las features."""
+    
+    @abstractmethod
+    def load_aligned_column(
+        self,
+        file_path: str,
+        column: str,
+        filters: Optional[Dict[str, Any]] = None,
+        sources: Optional[List[str]] = None
+    ) -> pd.Series:
+        """
+        Carga una columna raw alineada fila a fila con las features de load_features.
+        
+        Se usa, por ejemplo, para estratificar el muestreo por Town, que no
+        forma parte de las features del modelo. sources son los archivos de
+        los que salieron las filas de X, si load_features los informó en
+        X.attrs['sources'] (p. ej. sin los shards que fallaron).
+        """
+        pass
+    
+    def load_aligned_columns(
+        self,
+        file_path: str,
+        columns: List[str],
+        filters: Optional[Dict[str, Any]] = None,
+        sources: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Carga varias columnas raw alineadas con las features de load_features.
+        
+        Por defecto llama a load_aligned_column una vez por columna; los
+        repositorios que leen el archivo completo lo redefinen para leerlo una vez.
+        """
+        return pd.DataFrame({
+            column: self.load_aligned_column(file_path, column, filters=filters, sources=sources).to_numpy()
+            for column in columns
+        })
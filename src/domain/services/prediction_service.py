@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Any, Dict, List, Optional, Tuple
 import pandas as pd
 
 class ModelTrainingService(ABC):
@@ -15,10 +15,54 @@ class ModelTrainingService(ABC):
         """Evalúa el rendimiento del modelo."""
         pass
 
+class CrossValidationService(ABC):
+    """Capacidad opcional de un servicio de entrenamiento: validación cruzada."""
+    
+    @abstractmethod
+    def cross_validate(self, file_path: str, n_splits: int = 5, **hyperparams) -> Dict[str, Any]:
+        """Evalúa un modelo con validación cruzada K-fold."""
+        pass
+
+class BacktestService(ABC):
+    """Capacidad opcional de un servicio de entrenamiento: backtesting por año."""
+    
+    @abstractmethod
+    def backtest(self, file_path: str, year_column: str = 'List Year', **options) -> Dict[str, Any]:
+        """Evalúa un modelo con origen móvil: entrena con los años anteriores y evalúa cada año."""
+        pass
+
+class CheckpointTrainingService(ABC):
+    """Capacidad opcional de un servicio de entrenamiento: evaluación por checkpoints."""
+    
+    @abstractmethod
+    def train_with_checkpoints(self, file_path: str, checkpoints: Optional[List[int]] = None, **hyperparams) -> Dict[str, Any]:
+        """Entrena un modelo evaluándolo en varios tamaños (p. ej. número de árboles)."""
+        pass
+
+class ModelRefreshService(ABC):
+    """Capacidad opcional de un servicio de entrenamiento: refresh incremental."""
+    
+    @abstractmethod
+    def refresh_model(self, file_path: Optional[str] = None, **options) -> Dict[str, Any]:
+        """Actualiza el modelo actual con los datos llegados desde su entrenamiento."""
+        pass
+
+class HyperparameterSearchService(ABC):
+    """Capacidad opcional de un servicio de entrenamiento: búsqueda de hiperparámetros."""
+    
+    @abstractmethod
+    def search_hyperparameters(self, file_path: str, candidates: Optional[List[Dict[str, Any]]] = None, **options) -> Dict[str, Any]:
+        """Busca los mejores hiperparámetros entre varias combinaciones."""
+        pass
+
 class PredictionService(ABC):
     """Servicio abstracto para predicciones."""
     
     @abstractmethod
-    def predict_price(self, property_data: Any) -> float:
-        """Realiza una predicción de precio usando el modelo."""
-        pass
\ No newline at end of file
+    def predict_price(self, property_data: Any, model_uri: Optional[str] = None) -> float:
+        """Realiza una predicción de precio usando el modelo actual o la versión indicada."""
+        pass
+    
+    def predict_with_version(self, property_data: Any, model_uri: Optional[str] = None) -> Tuple[float, str]:
+        """Predice el precio e informa la versión del modelo que se usó."""
+        return self.predict_price(property_data, model_uri=model_uri), model_uri or "latest"
\ No newline at end of file
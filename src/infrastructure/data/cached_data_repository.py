@@ -0,0 +1,164 @@
+import pandas as pd
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from domain.repositories.model_repository import (
+    AlignedColumnRepository, ChunkedDataRepository, DataRepository, IncrementalDataRepository
+)
+from infrastructure.data.feature_cache import FeatureCache
+
+class CachedDataRepository(DataRepository, IncrementalDataRepository, ChunkedDataRepository, AlignedColumnRepository):
+    """
+    Repositorio de datos con caché de features preprocesadas.
+
+    Envuelve otro DataRepository (normalmente CSVDataLoader): la primera vez
+    que se pide un archivo lo preprocesa y guarda el resultado en la caché;
+    las siguientes llamadas sobre el mismo contenido lo leen directamente.
+    Si el archivo solo creció por el final desde la última carga, se leen y
+    preprocesan únicamente las filas nuevas y se agregan a la entrada cacheada.
+    Las capacidades opcionales (chunks, columnas alineadas) se delegan y
+    lanzan NotImplementedError si el repositorio envuelto no las tiene.
+    """
+
+    def __init__(self, data_repository: DataRepository, feature_cache: FeatureCache):
+        self.data_repository = data_repository
+        self.feature_cache = feature_cache
+
+    def _wrapped(self, capability: type, description: str) -> Any:
+        """Repositorio envuelto, si tiene la capacidad pedida."""
+        if not isinstance(self.data_repository, capability):
+            raise NotImplementedError(f"{type(self.data_repository).__name__} no soporta {description}")
+        return self.data_repository
+
+    def load_data(self, file_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Carga datos raw delegando en el repositorio envuelto."""
+        return self.data_repository.load_data(file_path, columns=columns)
+
+    def preprocess_data(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series]:
+        """Preprocesa datos delegando en el repositorio envuelto."""
+        return self.data_repository.preprocess_data(df)
+
+    def load_features(self, file_path: str, filters: Optional[Dict[str, Any]] = None) -> Tuple[pd.DataFrame, pd.Series]:
+        """
+        Carga las features de un archivo usando la caché.
+
+        Args:
+            file_path: Ruta al archivo de datos
+            filters: No soportado para archivos individuales
+
+        Returns:
+            Tuple con (X, y) - features y target
+        """
+        if filters:
+            raise ValueError("Los filtros de datos requieren un dataset particionado")
+        key = self.feature_cache.file_key(file_path)
+
+        cached = None
+        with self.feature_cache.reading(key) as store:
+            if store is not None:
+                cached = store.load()
+        if cached is not None:
+            X, y = cached
+            self.feature_cache.record_watermark(file_path, key)
+            print(f"⚡ Features cargadas desde caché: {X.shape[0]} filas ({key[:12]})")
+            return X, y
+
+        watermark = self.feature_cache.appendable_watermark(file_path)
+        if watermark is not None:
+            result = self._load_incremental(file_path, key, watermark)
+            if result is not None:
+                return result
+
+        X, y = self.data_repository.load_features(file_path)
+        self.feature_cache.put(key, X, y, source=file_path)
+        self.feature_cache.record_watermark(file_path, key)
+        print(f"💾 Features guardadas en caché ({key[:12]})")
+        return X, y
+
+    def _load_incremental(self, file_path: str, key: str, watermark: dict) -> Optional[Tuple[pd.DataFrame, pd.Series]]:
+        """
+        Agrega a la entrada cacheada solo las filas posteriores a la marca de agua.
+
+        Args:
+            file_path: Ruta al archivo de datos
+            key: Clave del contenido actual del archivo
+            watermark: Marca de agua de la última carga
+
+        Returns:
+            Tuple con (X, y) completos o None si hay que reconstruir
+        """
+        if not isinstance(self.data_repository, IncrementalDataRepository):
+            return None
+        if self.feature_cache.get(watermark['prefix_sha256']) is None:
+            return None
+        try:
+            X_new, y_new = self.data_repository.load_appended_features(file_path, watermark['byte_offset'])
+        except NotImplementedError:
+            return None
+
+        self.feature_cache.append_entry(watermark['prefix_sha256'], key, X_new, y_new, source=file_path)
+        self.feature_cache.record_watermark(file_path, key)
+        with self.feature_cache.reading(key) as store:
+            if store is None:  # Desalojada antes de leerla
+                return None
+            X, y = store.load()
+        print(f"➕ Ingesta incremental: {len(X_new)} filas nuevas agregadas a {watermark['row_count']} "
+              f"filas ya procesadas ({key[:12]})")
+        return X, y
+
+    def load_aligned_column(
+        self,
+        file_path: str,
+        column: str,
+        filters: Optional[Dict[str, Any]] = None,
+        sources: Optional[List[str]] = None
+    ) -> pd.Series:
+        """Carga una columna alineada delegando en el repositorio envuelto (no se cachea)."""
+        return self._wrapped(AlignedColumnRepository, "columnas alineadas").load_aligned_column(
+            file_path, column, filters=filters, sources=sources
+        )
+
+    def load_aligned_columns(
+        self,
+        file_path: str,
+        columns: List[str],
+        filters: Optional[Dict[str, Any]] = None,
+        sources: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """Carga varias columnas alineadas delegando en el repositorio envuelto (no se cachean)."""
+        return self._wrapped(AlignedColumnRepository, "columnas alineadas").load_aligned_columns(
+            file_path, columns, filters=filters, sources=sources
+        )
+
+    def load_appended_features(self, file_path: str, byte_offset: int) -> Tuple[pd.DataFrame, pd.Series]:
+        """Carga las filas agregadas delegando en el repositorio envuelto."""
+        return self._wrapped(IncrementalDataRepository, "ingesta incremental").load_appended_features(file_path, byte_offset)
+
+    def iter_feature_chunks(
+        self,
+        file_path: str,
+        chunksize: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Tuple[pd.DataFrame, pd.Series]]:
+        """Recorre las features por chunks delegando en el repositorio envuelto (no se cachean)."""
+        return self._wrapped(ChunkedDataRepository, "lectura por chunks").iter_feature_chunks(
+            file_path, chunksize=chunksize, filters=filters
+        )
+
+    def data_watermark(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Marca de agua de la fuente delegando en el repositorio envuelto."""
+        if not isinstance(self.data_repository, IncrementalDataRepository):
+            return None
+        return self.data_repository.data_watermark(file_path)
+
+    def invalidate(self, file_path: Optional[str] = None) -> int:
+        """
+        Invalida la caché para un archivo o completa.
+
+        Args:
+            file_path: Archivo a invalidar; None para vaciar toda la caché
+
+        Returns:
+            Número de entradas eliminadas
+        """
+        removed = self.feature_cache.invalidate(file_path)
+        print(f"🗑️ Caché de features invalidada: {removed} entradas eliminadas")
+        return removed
@@ -0,0 +1,189 @@
+"""
+Motores de lectura del CSV de transacciones.
+
+Cada motor lee el archivo (separado por ';') y devuelve un DataFrame de
+pandas con los tipos del esquema declarado, de modo que el resto del
+preprocesamiento no depende del motor elegido:
+
+- pandas: parser C de pandas (un solo hilo, sin dependencias extra)
+- pyarrow: lector CSV multihilo de Apache Arrow
+- polars: lectura lazy (scan_csv) de Polars, multihilo
+
+Si un motor no está instalado o no puede leer el archivo con los tipos
+compactos, se usa pandas.
+"""
+
+import csv
+import pandas as pd
+from typing import Callable, Dict, List, Optional
+from infrastructure.data.schema import CSV_SCHEMA, CSV_SEPARATOR, apply_schema, read_options
+
+DEFAULT_ENGINE = 'pandas'
+
+# Valores que pandas interpreta como faltantes por defecto; los otros motores
+# usan la misma lista para que los NaN coincidan
+NA_VALUES = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+]
+
+
+def _read_header(file_path: str) -> List[str]:
+    """Lee los nombres de columna de la primera línea del CSV."""
+    with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+        return next(csv.reader([f.readline()], delimiter=CSV_SEPARATOR))
+
+
+def _selected_columns(file_path: str, columns: Optional[List[str]]) -> List[str]:
+    """Columnas del archivo a leer, en el orden del archivo (como usecols de pandas)."""
+    header = _read_header(file_path)
+    if columns is None:
+        return header
+    wanted = set(columns)
+    return [col for col in header if col in wanted]
+
+
+def _sort_categories(df: pd.DataFrame) -> pd.DataFrame:
+    """Ordena las categorías como el parser de pandas (que las infiere ordenadas)."""
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].cat.reorder_categories(sorted(df[col].cat.categories))
+    return df
+
+
+def read_csv_pandas(file_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Lee el CSV con el parser C de pandas."""
+    try:
+        return pd.read_csv(file_path, **read_options(columns))
+    except (ValueError, TypeError, OverflowError):
+        # Algún valor no admite el tipo compacto: leer con tipos por defecto y convertir lo posible
+        options = read_options(columns)
+        options.pop('dtype')
+        return apply_schema(pd.read_csv(file_path, **options))
+
+
+def read_csv_pyarrow(file_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Lee el CSV con el lector multihilo de pyarrow.
+
+    Las columnas category se leen como diccionario (llegan a pandas como
+    category) y las numéricas como int64/float64; apply_schema las reduce
+    igual que el parser de pandas.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    selected = _selected_columns(file_path, columns)
+    column_types = {}
+    for col in selected:
+        dtype = CSV_SCHEMA.get(col)
+        if dtype == 'category':
+            column_types[col] = pa.dictionary(pa.int32(), pa.string())
+        elif dtype is not None and dtype.startswith(('float', 'Float')):
+            column_types[col] = pa.float64()
+
+    table = pa_csv.read_csv(
+        file_path,
+        read_options=pa_csv.ReadOptions(use_threads=True),
+        parse_options=pa_csv.ParseOptions(delimiter=CSV_SEPARATOR),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=selected,
+            column_types=column_types,
+            null_values=NA_VALUES,
+            strings_can_be_null=True
+        )
+    )
+    return _sort_categories(apply_schema(table.to_pandas()))
+
+
+def read_csv_polars(file_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Lee el CSV con scan_csv de Polars, proyectando solo las columnas pedidas.
+
+    El texto se lee como Utf8 y se convierte a Categorical antes de pasar a
+    pandas; los números se leen como Float64 y apply_schema los reduce
+    igual que el parser de pandas.
+    """
+    import polars as pl
+
+    selected = _selected_columns(file_path, columns)
+    overrides = {}
+    for col in selected:
+        dtype = CSV_SCHEMA.get(col)
+        if dtype == 'category':
+            overrides[col] = pl.Utf8
+        elif dtype is not None:
+            # Los enteros con faltantes suelen exportarse como "21.0": se leen
+            # como Float64 y apply_schema los pasa al entero nullable
+            overrides[col] = pl.Float64
+
+    frame = (
+        pl.scan_csv(file_path, separator=CSV_SEPARATOR, schema_overrides=overrides, null_values=NA_VALUES)
+        .select(selected)
+        .with_columns([pl.col(col).cast(pl.Categorical) for col, dtype in overrides.items() if dtype == pl.Utf8])
+        .collect()
+    )
+    return _sort_categories(apply_schema(frame.to_pandas()))
+
+
+CSV_ENGINES: Dict[str, Callable[[str, Optional[List[str]]], pd.DataFrame]] = {
+    'pandas': read_csv_pandas,
+    'pyarrow': read_csv_pyarrow,
+    'polars': read_csv_polars,
+}
+
+_ENGINE_MODULES = {'pandas': 'pandas', 'pyarrow': 'pyarrow.csv', 'polars': 'polars'}
+
+
+def engine_available(engine: str) -> bool:
+    """Indica si la librería del motor está instalada."""
+    try:
+        __import__(_ENGINE_MODULES[engine])
+        return True
+    except ImportError:
+        return False
+
+
+def available_engines() -> List[str]:
+    """Motores registrados cuya librería está instalada."""
+    return [engine for engine in CSV_ENGINES if engine_available(engine)]
+
+
+def resolve_engine(engine: Optional[str]) -> str:
+    """
+    Valida el nombre del motor; si su librería no está instalada usa pandas.
+
+    Args:
+        engine: Nombre del motor (pandas, pyarrow o polars); None usa pandas
+
+    Returns:
+        Nombre del motor que se usará
+    """
+    engine = (engine or DEFAULT_ENGINE).strip().lower()
+    if engine not in CSV_ENGINES:
+        raise ValueError(f"Motor CSV desconocido: {engine}. Opciones: {', '.join(CSV_ENGINES)}")
+    if not engine_available(engine):
+        print(f"⚠️ El motor CSV '{engine}' no está instalado; se usa {DEFAULT_ENGINE}")
+        return DEFAULT_ENGINE
+    return engine
+
+
+def read_csv(file_path: str, columns: Optional[List[str]] = None, engine: str = DEFAULT_ENGINE) -> pd.DataFrame:
+    """
+    Lee el CSV con el motor indicado y los tipos del esquema.
+
+    Args:
+        file_path: Ruta al archivo CSV
+        columns: Columnas a leer; None para leer todas
+        engine: Motor de lectura
+
+    Returns:
+        DataFrame con los tipos del esquema aplicados
+    """
+    if engine == DEFAULT_ENGINE:
+        return read_csv_pandas(file_path, columns)
+    try:
+        return CSV_ENGINES[engine](file_path, columns)
+    except Exception as e:
+        print(f"⚠️ El motor {engine} no pudo leer {file_path} ({type(e).__name__}: {e}); se usa {DEFAULT_ENGINE}")
+        return read_csv_pandas(file_path, columns)
@@ -1,75 +1,407 @@
-import pandas as pd
+import csv
+import os
 import numpy as np
-from typing import Tuple
-from domain.repositories.model_repository import DataRepository
+import pandas as pd
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from domain.repositories.model_repository import (
+    AlignedColumnRepository, ChunkedDataRepository, DataRepository, IncrementalDataRepository
+)
+from infrastructure.data.csv_engines import DEFAULT_ENGINE, _read_header, read_csv, resolve_engine
+from infrastructure.data.feature_encoder import PropertyFeatureEncoder
+from infrastructure.data.feature_pipeline import FeaturePipeline
+from infrastructure.data.feature_store import FeatureStore
+from infrastructure.data.schema import CSV_SCHEMA, CSV_SEPARATOR, TRAINING_COLUMNS, apply_schema, memory_report, read_options
+
+# Features específicas usadas por el modelo (basado en el notebook)
+FEATURE_COLUMNS = [
+    'Assessed Value', 'area_m2', 'meses_en_venta', 
+    'nro_habitaciones', 'nro_pisos', 
+    'Property Type_Residential', 'Property Type_Single Family'
+]
+TARGET_COLUMN = 'Sale Amount'
+
+# Versión del preprocesamiento: cambiarla invalida las features cacheadas
+PREPROCESSING_VERSION = "4"
 
-class CSVDataLoader(DataRepository):
+# Filas por chunk en el modo streaming
+DEFAULT_CHUNK_ROWS = 100_000
+
+class CSVDataLoader(DataRepository, IncrementalDataRepository, ChunkedDataRepository, AlignedColumnRepository):
     """Implementación del repositorio de datos para archivos CSV."""
     
-    def load_data(self, file_path: str) -> pd.DataFrame:
+    def __init__(self, memory_budget_mb: Optional[float] = None, engine: str = DEFAULT_ENGINE, track_memory: bool = False):
+        """
+        Args:
+            memory_budget_mb: Presupuesto de memoria del preprocesamiento en MB (None = sin límite)
+            engine: Motor de lectura del CSV (pandas, pyarrow o polars)
+            track_memory: Si es True mide el pico de memoria del preprocesamiento con tracemalloc
         """
-        Carga datos desde un archivo CSV.
+        self.engine = resolve_engine(engine)
+        self.memory_budget_bytes = int(memory_budget_mb * 1024**2) if memory_budget_mb else None
+        self.track_memory = track_memory
+        self.encoder = PropertyFeatureEncoder().fit()
+        self.last_preprocess_report = {}
+    
+    def load_data(self, file_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Carga datos desde un archivo CSV usando el esquema declarado.
+        
+        Las columnas numéricas se leen con tipos reducidos y las de texto
+        como category. El ahorro de memoria frente a los tipos por defecto
+        queda en df.attrs['memory_report']. El parseo lo hace el motor
+        configurado (ver csv_engines); todos producen el mismo DataFrame.
         
         Args:
             file_path: Ruta al archivo CSV
+            columns: Columnas a leer; None para leer todas
             
         Returns:
             DataFrame con los datos cargados
         """
         try:
-            df = pd.read_csv(file_path, sep=';')
+            if file_path.lower().endswith('.parquet'):
+                df = self._read_parquet(file_path, columns)
+            else:
+                df = read_csv(file_path, columns, engine=self.engine)
+            
+            report = memory_report(df)
+            df.attrs['memory_report'] = report
             print(f"Datos cargados exitosamente: {df.shape[0]} filas, {df.shape[1]} columnas")
+            print(f"Memoria: {report['memory_bytes'] / 1024**2:.1f} MB "
+                  f"(ahorro estimado {report['saved_bytes'] / 1024**2:.1f} MB, {report['saved_pct']:.0f}%)")
             return df
         except Exception as e:
             raise Exception(f"Error al cargar datos desde {file_path}: {str(e)}")
     
-    def preprocess_data(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series]:
+    def _read_parquet(self, file_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Lee un archivo Parquet (por ejemplo, una partición del dataset) leyendo
+        solo las columnas pedidas que existan en el archivo.
+        
+        Args:
+            file_path: Ruta al archivo Parquet
+            columns: Columnas a leer; None para leer todas
+            
+        Returns:
+            DataFrame con los tipos del esquema aplicados
+        """
+        import pyarrow.parquet as pq
+        
+        available = pq.ParquetFile(file_path).schema_arrow.names
+        if columns is not None:
+            wanted = set(columns)
+            available = [col for col in available if col in wanted]
+        return apply_schema(pd.read_parquet(file_path, columns=available))
+    
+    def load_data_chunks(
+        self, 
+        file_path: str, 
+        chunksize: int = DEFAULT_CHUNK_ROWS,
+        columns: Optional[List[str]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Lee un archivo CSV en chunks de tamaño acotado.
+        
+        Args:
+            file_path: Ruta al archivo CSV
+            chunksize: Número máximo de filas por chunk
+            columns: Columnas a leer; None para leer todas
+            
+        Returns:
+            Iterador de DataFrames con los datos raw
+        """
+        # Los tipos numéricos se aplican por chunk para que un valor atípico no corte la lectura
+        options = read_options(columns)
+        options['dtype'] = {col: dtype for col, dtype in options['dtype'].items() if dtype == 'category'}
+        try:
+            reader = pd.read_csv(file_path, chunksize=chunksize, **options)
+        except Exception as e:
+            raise Exception(f"Error al cargar datos desde {file_path}: {str(e)}")
+        
+        with reader:
+            for chunk in reader:
+                yield apply_schema(chunk)
+    
+    def preprocess_data(
+        self, 
+        df: pd.DataFrame, 
+        verbose: bool = True, 
+        row_mask: Optional[np.ndarray] = None
+    ) -> Tuple[pd.DataFrame, pd.Series]:
         """
         Preprocesa los datos siguiendo la lógica del notebook original.
         
+        Elimina las filas con NaNs, limpia area_m2 y codifica Property Type,
+        escribiendo directamente en una matriz float32 preasignada (ver
+        FeaturePipeline). El resumen queda en last_preprocess_report (con el pico
+        de memoria solo si track_memory está activo).
+        
         Args:
             df: DataFrame con datos raw
+            verbose: Si es True imprime el resumen del preprocesamiento
+            row_mask: Filas completas según las columnas del archivo que no se
+                leyeron en df (ver _complete_rows); None si df trae todas
+            
+        Returns:
+            Tuple con (X, y) - features y target
+        """
+        pipeline = FeaturePipeline(
+            self.encoder, 
+            TARGET_COLUMN, 
+            memory_budget_bytes=self.memory_budget_bytes,
+            track_memory=self.track_memory
+        )
+        X, y = pipeline.transform(df, row_mask=row_mask)
+        self.last_preprocess_report = pipeline.last_report
+        
+        if verbose:
+            report = pipeline.last_report
+            print(f"Después de eliminar NaNs: {X.shape[0]} filas")
+            print(f"Features procesadas: {X.shape}")
+            print(f"Columnas de features: {list(X.columns)}")
+            print(f"Target shape: {y.shape}")
+            if report['peak_bytes'] is not None:
+                budget = report['memory_budget_bytes']
+                budget_text = f" / presupuesto {budget / 1024**2:.1f} MB" if budget else ""
+                print(f"Pico de memoria del preprocesamiento: {report['peak_bytes'] / 1024**2:.1f} MB{budget_text}")
+        
+        return X, y
+    
+    def _complete_rows(self, file_path: str, loaded_columns: List[str]) -> Optional[np.ndarray]:
+        """
+        Máscara de filas sin NaNs en las columnas del archivo que no están en loaded_columns.
+        
+        Esas columnas se leen por chunks solo para construir la máscara, así
+        una lectura podada (solo TRAINING_COLUMNS) descarta las mismas filas
+        que el dropna sobre el archivo completo.
+        
+        Args:
+            file_path: Ruta al archivo CSV o Parquet
+            loaded_columns: Columnas ya leídas (sus NaNs los revisa preprocess_data)
+            
+        Returns:
+            Máscara booleana por fila del archivo, o None si no quedan columnas por revisar
+        """
+        loaded = set(loaded_columns)
+        if file_path.lower().endswith('.parquet'):
+            import pyarrow.parquet as pq
+            
+            others = [col for col in pq.ParquetFile(file_path).schema_arrow.names if col not in loaded]
+            chunks = [pd.read_parquet(file_path, columns=others)] if others else []
+        else:
+            others = [col for col in _read_header(file_path) if col not in loaded]
+            chunks = self.load_data_chunks(file_path, columns=others) if others else []
+        if not others:
+            return None
+        masks = [chunk.notna().all(axis=1).to_numpy() for chunk in chunks]
+        return np.concatenate(masks) if masks else np.zeros(0, dtype=bool)
+    
+    def _load_complete(self, file_path: str, columns: List[str]) -> Tuple[pd.DataFrame, Optional[np.ndarray]]:
+        """Lee solo las columnas pedidas y la máscara de filas completas del resto del archivo."""
+        df = self.load_data(file_path, columns=columns)
+        row_mask = self._complete_rows(file_path, list(df.columns))
+        if row_mask is not None and len(row_mask) != len(df):
+            raise Exception(f"Error al cargar datos desde {file_path}: "
+                            f"{len(df)} filas leídas y {len(row_mask)} filas en la máscara")
+        return df, row_mask
+    
+    def load_features(self, file_path: str, filters: Optional[Dict[str, Any]] = None) -> Tuple[pd.DataFrame, pd.Series]:
+        """
+        Carga solo las columnas de entrenamiento y las preprocesa.
+        
+        Las filas con NaNs en las columnas no leídas también se descartan,
+        igual que en load_data + preprocess_data sobre el archivo completo.
+        
+        Args:
+            file_path: Ruta al archivo CSV
+            filters: No soportado para archivos individuales
             
         Returns:
             Tuple con (X, y) - features y target
         """
+        if filters:
+            raise ValueError("Los filtros de datos requieren un dataset particionado")
+        df, row_mask = self._load_complete(file_path, TRAINING_COLUMNS)
+        return self.preprocess_data(df, row_mask=row_mask)
+    
+    def load_aligned_column(
+        self, 
+        file_path: str, 
+        column: str, 
+        filters: Optional[Dict[str, Any]] = None, 
+        sources: Optional[List[str]] = None
+    ) -> pd.Series:
+        """
+        Carga una columna raw con las mismas filas que conserva load_features.
+        
+        Args:
+            file_path: Ruta al archivo
+            column: Columna a cargar (por ejemplo 'Town')
+            filters: No soportado para archivos individuales
+            sources: Ignorado (las filas salen de un único archivo)
+            
+        Returns:
+            Serie con un valor por fila de X, en el mismo orden
+        """
+        return self.load_aligned_columns(file_path, [column], filters=filters)[column]
+    
+    def load_aligned_columns(
+        self, 
+        file_path: str, 
+        columns: List[str], 
+        filters: Optional[Dict[str, Any]] = None, 
+        sources: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Carga varias columnas raw (en una sola lectura) con las mismas filas que conserva load_features.
+        
+        Args:
+            file_path: Ruta al archivo
+            columns: Columnas a cargar (por ejemplo Town y Residential Type)
+            filters: No soportado para archivos individuales
+            sources: Ignorado (las filas salen de un único archivo)
+            
+        Returns:
+            DataFrame con una fila por fila de X, en el mismo orden
+        """
+        if filters:
+            raise ValueError("Los filtros de datos requieren un dataset particionado")
+        df, row_mask = self._load_complete(file_path, TRAINING_COLUMNS + [col for col in columns if col not in TRAINING_COLUMNS])
+        mask = df.notna().all(axis=1).to_numpy()
+        if row_mask is not None:
+            mask = mask & row_mask
+        return df.loc[mask, list(columns)].reset_index(drop=True)
+    
+    def load_appended_features(self, file_path: str, byte_offset: int) -> Tuple[pd.DataFrame, pd.Series]:
+        """
+        Lee y preprocesa solo las filas escritas a partir de byte_offset.
+        
+        Se usa para la ingesta incremental de un CSV que solo crece por el
+        final: la cabecera se toma de la primera línea y la lectura empieza
+        directamente en el offset, sin recorrer las filas anteriores.
+        
+        Args:
+            file_path: Ruta al archivo CSV
+            byte_offset: Offset donde empieza la primera fila nueva (inicio de línea)
+            
+        Returns:
+            Tuple con (X, y) de las filas nuevas
+        """
+        if file_path.lower().endswith('.parquet'):
+            raise NotImplementedError("La ingesta incremental solo está disponible para CSV")
         
-        # Eliminar filas con NaNs
-        df_clean = df.dropna().copy()
-        print(f"Después de eliminar NaNs: {df_clean.shape[0]} filas")
+        def read_tail(options: dict) -> pd.DataFrame:
+            with open(file_path, 'rb') as f:
+                header = next(csv.reader([f.readline().decode('utf-8-sig')], delimiter=CSV_SEPARATOR))
+                f.seek(byte_offset)
+                try:
+                    return pd.read_csv(f, header=None, names=header, **options)
+                except pd.errors.EmptyDataError:
+                    return pd.DataFrame({col: pd.Series(dtype=CSV_SCHEMA.get(col, object)) for col in header})
         
-        # Limpiar columna area_m2 (remover 'm2' y convertir a float)
-        df_clean['area_m2'] = df_clean['area_m2'].str.replace('m2', '').astype(float)
+        # Se leen todas las columnas: las filas nuevas son pocas y así se
+        # descartan las mismas filas incompletas que en la recarga completa
+        try:
+            try:
+                df = read_tail(read_options())
+            except (ValueError, TypeError, OverflowError):
+                options = read_options()
+                options.pop('dtype')
+                df = apply_schema(read_tail(options))
+        except Exception as e:
+            raise Exception(f"Error al leer las filas nuevas de {file_path}: {str(e)}")
         
-        # Crear variables dummy para Property Type
-        df_encoded = pd.get_dummies(df_clean, columns=['Property Type'], dtype='float')
+        print(f"Filas nuevas leídas desde el byte {byte_offset}: {len(df)}")
+        return self.preprocess_data(df, verbose=False)
+    
+    def data_watermark(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Marca de agua de un CSV: su tamaño actual, si termina en salto de línea.
         
-        # Crear variables dummy para Residential Type
-        df_encoded = pd.get_dummies(df_encoded, columns=['Residential Type'], dtype='float')
+        Si la última fila no termina en salto de línea podría estar
+        incompleta (el archivo se está escribiendo) y no se devuelve marca.
         
-        # Seleccionar features específicas (basado en el notebook)
-        feature_columns = [
-            'Assessed Value', 'area_m2', 'meses_en_venta', 
-            'nro_habitaciones', 'nro_pisos', 
-            'Property Type_Residential', 'Property Type_Single Family'
-        ]
+        Args:
+            file_path: Ruta al archivo CSV
+            
+        Returns:
+            Diccionario con source (ruta absoluta) y byte_offset, o None
+        """
+        if not os.path.isfile(file_path) or file_path.lower().endswith('.parquet'):
+            return None
+        size = os.path.getsize(file_path)
+        if size == 0:
+            return None
+        with open(file_path, 'rb') as f:
+            f.seek(size - 1)
+            if f.read(1) != b'\n':
+                return None
+        return {'source': os.path.abspath(file_path), 'byte_offset': size}
+    
+    def iter_feature_chunks(
+        self, 
+        file_path: str, 
+        chunksize: Optional[int] = DEFAULT_CHUNK_ROWS,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Tuple[pd.DataFrame, pd.Series]]:
+        """
+        Modo streaming: lee el CSV por chunks y aplica a cada uno la misma
+        limpieza y codificación que preprocess_data.
         
-        # Verificar que las columnas existan
-        missing_cols = [col for col in feature_columns if col not in df_encoded.columns]
-        if missing_cols:
-            # Si faltan columnas dummy, las creamos con 0
-            for col in missing_cols:
-                df_encoded[col] = 0.0
+        Como todas las transformaciones son por fila, concatenar los chunks
+        produce las mismas features que procesar el archivo completo, con
+        las columnas de FEATURE_COLUMNS en el mismo orden. Cada chunk trae
+        todas las columnas para descartar las mismas filas incompletas.
         
-        # Extraer features y target
-        X = df_encoded[feature_columns].copy()
-        y = df_encoded['Sale Amount'].copy()
+        Los archivos Parquet (particiones de un dataset particionado) se leen
+        completos y se recorren por bloques de chunksize filas.
         
-        # Convertir a float32 para compatibilidad con MLflow
-        X = X.astype(np.float32)
+        Args:
+            file_path: Ruta al archivo CSV o Parquet
+            chunksize: Número máximo de filas leídas por chunk (None = DEFAULT_CHUNK_ROWS)
+            filters: No soportado para archivos individuales
+            
+        Returns:
+            Iterador de tuplas (X, y) por chunk
+        """
+        if filters:
+            raise ValueError("Los filtros de datos requieren un dataset particionado")
+        chunksize = chunksize or DEFAULT_CHUNK_ROWS
+        if file_path.lower().endswith('.parquet'):
+            df = self._read_parquet(file_path)
+            chunks = (df.iloc[start:start + chunksize] for start in range(0, len(df), chunksize))
+        else:
+            chunks = self.load_data_chunks(file_path, chunksize=chunksize)
+        for chunk in chunks:
+            X_chunk, y_chunk = self.preprocess_data(chunk, verbose=False)
+            if len(X_chunk) > 0:
+                yield X_chunk, y_chunk
+    
+    def write_feature_store(
+        self, 
+        file_path: str, 
+        store_dir: str, 
+        chunksize: int = DEFAULT_CHUNK_ROWS
+    ) -> FeatureStore:
+        """
+        Preprocesa el CSV por chunks y escribe el resultado en un
+        almacén de features en disco, sin cargar el archivo completo.
+        
+        Args:
+            file_path: Ruta al archivo CSV
+            store_dir: Directorio del almacén de features
+            chunksize: Número máximo de filas leídas por chunk
+            
+        Returns:
+            FeatureStore con las features escritas
+        """
+        store = FeatureStore(store_dir)
+        store.create(FEATURE_COLUMNS, TARGET_COLUMN)
         
-        print(f"Features procesadas: {X.shape}")
-        print(f"Columnas de features: {list(X.columns)}")
-        print(f"Target shape: {y.shape}")
+        n_chunks = 0
+        for X_chunk, y_chunk in self.iter_feature_chunks(file_path, chunksize=chunksize):
+            store.append(X_chunk.to_numpy(), y_chunk.to_numpy())
+            n_chunks += 1
         
-        return X, y
\ No newline at end of file
+        print(f"Almacén de features creado en {store_dir}: {store.n_rows} filas en {n_chunks} chunks")
+        return store
@@ -0,0 +1,460 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+import numpy as np
+from typing import Iterator, List, Optional
+from infrastructure.data.feature_store import FeatureStore
+from infrastructure.data.file_lock import file_lock
+
+class FeatureCache:
+    """
+    Caché de features preprocesadas direccionada por contenido.
+
+    Cada entrada se identifica por el hash SHA-256 del contenido del archivo
+    de entrada más la versión del preprocesamiento, y guarda X (float32) e
+    y en un FeatureStore. Cuando el tamaño total supera el presupuesto se
+    eliminan las entradas usadas hace más tiempo.
+
+    Para cada archivo de origen se registra además una marca de agua
+    (offset en bytes, número de filas y hash del prefijo ya procesado). Si
+    el archivo solo creció por el final, la entrada anterior se reutiliza y
+    solo se preprocesan las filas nuevas; si el prefijo cambió, se
+    reconstruye completo.
+
+    Varios procesos (workers de shards, contenedores con el volumen montado)
+    comparten la caché con bloqueos de archivo: el índice se modifica y las
+    entradas se eliminan con un lock exclusivo, y una entrada que se está
+    leyendo (lock compartido, ver reading) no se elimina.
+    """
+
+    INDEX_FILE = "index.json"
+    HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+    def __init__(self, cache_dir: str, max_bytes: int = 2 * 1024**3, preprocessing_version: str = "1"):
+        """
+        Args:
+            cache_dir: Directorio raíz de la caché
+            max_bytes: Tamaño máximo total de la caché en bytes
+            preprocessing_version: Versión del preprocesamiento incluida en la clave
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.preprocessing_version = preprocessing_version
+        self.locks_dir = os.path.join(cache_dir, ".locks")
+        os.makedirs(self.locks_dir, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Claves
+    # ------------------------------------------------------------------
+
+    def _lock_path(self, name: str) -> str:
+        return os.path.join(self.locks_dir, f"{name}.lock")
+
+    def _index_lock(self):
+        return file_lock(self._lock_path("index"))
+
+    def _read_index(self) -> dict:
+        path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self, index: dict) -> None:
+        path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def _scan(self, abs_path: str, prefix_offset: Optional[int] = None) -> dict:
+        """
+        Recorre el archivo una sola vez calculando el hash del contenido y,
+        si se pide, el hash del prefijo hasta prefix_offset.
+
+        Ambos hashes incluyen la versión del preprocesamiento, de modo que el
+        hash de un prefijo coincide con la clave que tenía el archivo cuando
+        medía exactamente ese tamaño.
+
+        Args:
+            abs_path: Ruta absoluta al archivo
+            prefix_offset: Offset en bytes del prefijo a verificar (opcional)
+
+        Returns:
+            Diccionario con key, prefix_hash, rows y ends_with_newline
+        """
+        hasher = hashlib.sha256()
+        hasher.update(f"preprocessing:{self.preprocessing_version}\n".encode('utf-8'))
+        prefix_hash = None
+        position = 0
+        newlines = 0
+        last_byte = b''
+        with open(abs_path, 'rb') as f:
+            for block in iter(lambda: f.read(self.HASH_BLOCK_SIZE), b''):
+                if prefix_offset is not None and prefix_hash is None and position + len(block) >= prefix_offset:
+                    cut = prefix_offset - position
+                    hasher.update(block[:cut])
+                    prefix_hash = hasher.copy().hexdigest()
+                    hasher.update(block[cut:])
+                else:
+                    hasher.update(block)
+                newlines += block.count(b'\n')
+                position += len(block)
+                last_byte = block[-1:]
+
+        ends_with_newline = last_byte == b'\n'
+        lines = newlines + (0 if ends_with_newline or position == 0 else 1)
+        return {
+            'key': hasher.hexdigest(),
+            'prefix_hash': prefix_hash,
+            'rows': max(lines - 1, 0),  # Sin la cabecera
+            'ends_with_newline': ends_with_newline
+        }
+
+    def _source_record(self, file_path: str) -> dict:
+        """
+        Devuelve el registro del índice de un archivo de origen.
+
+        El hash del contenido se memoriza junto al tamaño y la fecha de
+        modificación, así un archivo sin cambios no se vuelve a leer. Si el
+        archivo cambió y tiene marca de agua, en la misma pasada se verifica
+        si el prefijo ya procesado sigue intacto.
+        """
+        abs_path = os.path.abspath(file_path)
+        stat = os.stat(abs_path)
+        index = self._read_index()
+
+        known = index.get(abs_path) or {}
+        if known.get('size') == stat.st_size and known.get('mtime_ns') == stat.st_mtime_ns \
+                and known.get('version') == self.preprocessing_version and 'rows' in known:
+            return known
+
+        watermark = known.get('watermark')
+        prefix_offset = None
+        if watermark and watermark.get('preprocessing_version') == self.preprocessing_version \
+                and watermark['byte_offset'] < stat.st_size:
+            prefix_offset = watermark['byte_offset']
+
+        # El recorrido del archivo no bloquea el índice: solo la escritura del registro
+        scan = self._scan(abs_path, prefix_offset)
+        record = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'version': self.preprocessing_version,
+            'key': scan['key'],
+            'rows': scan['rows'],
+            'ends_with_newline': scan['ends_with_newline'],
+            'watermark': watermark,
+            'prefix_matches': prefix_offset is not None and scan['prefix_hash'] == watermark['prefix_sha256']
+        }
+        with self._index_lock():
+            index = self._read_index()
+            index[abs_path] = record
+            self._write_index(index)
+        return record
+
+    def file_key(self, file_path: str) -> str:
+        """
+        Calcula la clave de caché de un archivo.
+
+        Args:
+            file_path: Ruta al archivo de datos
+
+        Returns:
+            Clave hexadecimal de la entrada
+        """
+        return self._source_record(file_path)['key']
+
+    # ------------------------------------------------------------------
+    # Marcas de agua (ingesta incremental)
+    # ------------------------------------------------------------------
+
+    def appendable_watermark(self, file_path: str) -> Optional[dict]:
+        """
+        Devuelve la marca de agua del archivo si solo creció desde ella.
+
+        Args:
+            file_path: Ruta al archivo de datos
+
+        Returns:
+            Marca de agua (byte_offset, row_count, prefix_sha256) o None si
+            no existe, está al día o el prefijo fue reescrito
+        """
+        record = self._source_record(file_path)
+        watermark = record.get('watermark')
+        if not watermark or watermark['prefix_sha256'] == record['key']:
+            return None
+        if not record.get('prefix_matches'):
+            print(f"⚠️ El contenido ya procesado de {file_path} cambió: se reconstruyen las features completas")
+            return None
+        return watermark
+
+    def record_watermark(self, file_path: str, key: str) -> Optional[dict]:
+        """
+        Registra que las features de la entrada key cubren el archivo completo.
+
+        Solo se registra si el archivo termina en salto de línea: si la
+        última fila estuviera incompleta, un agregado podría modificarla.
+
+        Args:
+            file_path: Ruta al archivo de datos
+            key: Clave de la entrada que contiene sus features
+
+        Returns:
+            La marca de agua registrada o None
+        """
+        abs_path = os.path.abspath(file_path)
+        with self._index_lock():
+            index = self._read_index()
+            record = index.get(abs_path)
+            if not record or record.get('key') != key:
+                return None
+
+            watermark = None
+            if record.get('ends_with_newline'):
+                watermark = {
+                    'byte_offset': record['size'],
+                    'row_count': record['rows'],
+                    'prefix_sha256': key,
+                    'preprocessing_version': self.preprocessing_version
+                }
+            if record.get('watermark') != watermark or record.get('prefix_matches'):
+                record['watermark'] = watermark
+                record['prefix_matches'] = False
+                self._write_index(index)
+        return watermark
+
+    # ------------------------------------------------------------------
+    # Entradas
+    # ------------------------------------------------------------------
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def _entry_lock(self, key: str, shared: bool = False, blocking: bool = True):
+        return file_lock(self._lock_path(key), shared=shared, blocking=blocking)
+
+    def _entries(self) -> List[FeatureStore]:
+        stores = []
+        for name in os.listdir(self.cache_dir):
+            if name.startswith('.'):  # Locks y entradas temporales a medio escribir
+                continue
+            store = FeatureStore(self._entry_dir(name))
+            if os.path.isdir(store.root_dir) and store.exists():
+                stores.append(store)
+        return stores
+
+    def get(self, key: str) -> Optional[FeatureStore]:
+        """
+        Busca una entrada y actualiza su fecha de último acceso.
+
+        Args:
+            key: Clave de la entrada
+
+        Returns:
+            FeatureStore de la entrada o None si no existe
+        """
+        store = FeatureStore(self._entry_dir(key))
+        if not store.exists():
+            return None
+        try:
+            meta = store.read_meta()
+        except (OSError, ValueError):
+            return None
+        try:
+            meta['last_access'] = time.time()
+            store.write_meta(meta)
+        except OSError:
+            pass  # Otro lector actualizó la fecha al mismo tiempo
+        return store
+
+    @contextmanager
+    def reading(self, key: str) -> Iterator[Optional[FeatureStore]]:
+        """
+        Busca una entrada y la protege de la eliminación mientras se lee.
+
+        Args:
+            key: Clave de la entrada
+
+        Returns:
+            Context manager que entrega el FeatureStore de la entrada o None
+        """
+        with self._entry_lock(key, shared=True):
+            yield self.get(key)
+
+    def put(self, key: str, X: np.ndarray, y: np.ndarray, source: str = "") -> FeatureStore:
+        """
+        Guarda una entrada nueva.
+
+        La entrada se escribe en un directorio temporal y se publica con un
+        rename atómico, por lo que otros procesos nunca ven una entrada a medias.
+
+        Args:
+            key: Clave de la entrada
+            X: Features preprocesadas
+            y: Target
+            source: Ruta del archivo de origen (informativa)
+
+        Returns:
+            FeatureStore de la entrada guardada
+        """
+        feature_columns = list(X.columns) if hasattr(X, 'columns') else [f"f{i}" for i in range(X.shape[1])]
+        target_name = getattr(y, 'name', None) or "target"
+
+        tmp_store = FeatureStore(os.path.join(self.cache_dir, f".tmp-{key}-{uuid.uuid4().hex}"))
+        tmp_store.create(feature_columns, target_name)
+        tmp_store.append(np.asarray(X), np.asarray(y))
+
+        meta = tmp_store.read_meta()
+        meta.update({
+            'key': key,
+            'source': source,
+            'preprocessing_version': self.preprocessing_version,
+            'created_at': time.time(),
+            'last_access': time.time()
+        })
+        tmp_store.write_meta(meta)
+
+        entry_dir = self._entry_dir(key)
+        try:
+            os.replace(tmp_store.root_dir, entry_dir)
+        except OSError:
+            # Otro proceso publicó la misma entrada primero
+            shutil.rmtree(tmp_store.root_dir, ignore_errors=True)
+
+        self.evict()
+        return FeatureStore(entry_dir)
+
+    def append_entry(self, base_key: str, key: str, X: np.ndarray, y: np.ndarray, source: str = "") -> FeatureStore:
+        """
+        Crea la entrada key agregando filas nuevas a una entrada existente.
+
+        La entrada base se copia a un directorio temporal, se le agregan las
+        filas y se publica con un rename atómico; la entrada base se elimina
+        porque su contenido ya no corresponde al archivo de origen.
+
+        Args:
+            base_key: Clave de la entrada con las features del prefijo
+            key: Clave de la nueva entrada
+            X: Features de las filas nuevas
+            y: Target de las filas nuevas
+            source: Ruta del archivo de origen (informativa)
+
+        Returns:
+            FeatureStore de la nueva entrada
+        """
+        base_store = FeatureStore(self._entry_dir(base_key))
+        tmp_store = FeatureStore(os.path.join(self.cache_dir, f".tmp-{key}-{uuid.uuid4().hex}"))
+        with self._entry_lock(base_key, shared=True):
+            shutil.copytree(base_store.root_dir, tmp_store.root_dir)
+        tmp_store.append(np.asarray(X), np.asarray(y))
+
+        meta = tmp_store.read_meta()
+        meta.update({
+            'key': key,
+            'source': source,
+            'base_key': base_key,
+            'appended_rows': int(len(X)),
+            'last_access': time.time()
+        })
+        tmp_store.write_meta(meta)
+
+        entry_dir = self._entry_dir(key)
+        try:
+            os.replace(tmp_store.root_dir, entry_dir)
+        except OSError:
+            shutil.rmtree(tmp_store.root_dir, ignore_errors=True)
+        # Si otro proceso la está leyendo, la entrada base queda para el desalojo
+        with self._entry_lock(base_key, blocking=False) as acquired:
+            if acquired:
+                shutil.rmtree(base_store.root_dir, ignore_errors=True)
+
+        self.evict()
+        return FeatureStore(entry_dir)
+
+    # ------------------------------------------------------------------
+    # Mantenimiento
+    # ------------------------------------------------------------------
+
+    def total_bytes(self) -> int:
+        """Tamaño total ocupado por las entradas."""
+        return sum(store.size_bytes() for store in self._entries())
+
+    def evict(self) -> int:
+        """
+        Elimina entradas por antigüedad de uso hasta respetar max_bytes.
+
+        Las entradas que otro proceso está leyendo se saltean.
+
+        Returns:
+            Número de entradas eliminadas
+        """
+        with self._index_lock():
+            entries = []
+            for store in self._entries():
+                try:
+                    entries.append((store.read_meta().get('last_access', 0), store.size_bytes(), store))
+                except (OSError, ValueError):
+                    continue
+
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, store in sorted(entries, key=lambda e: e[0]):
+                if total <= self.max_bytes:
+                    break
+                with self._entry_lock(os.path.basename(store.root_dir), blocking=False) as acquired:
+                    if not acquired:
+                        continue
+                    shutil.rmtree(store.root_dir, ignore_errors=True)
+                total -= size
+                removed += 1
+
+        if removed:
+            print(f"🧹 Caché de features: {removed} entradas eliminadas ({total / 1024**2:.1f} MB en uso)")
+        return removed
+
+    def invalidate(self, file_path: Optional[str] = None) -> int:
+        """
+        Invalida entradas de la caché.
+
+        Args:
+            file_path: Archivo cuya entrada se elimina; None para vaciar la caché
+
+        Returns:
+            Número de entradas eliminadas
+        """
+        if file_path is None:
+            with self._index_lock():
+                stores = self._entries()
+                for store in stores:
+                    with self._entry_lock(os.path.basename(store.root_dir)):
+                        shutil.rmtree(store.root_dir, ignore_errors=True)
+                self._write_index({})
+            return len(stores)
+
+        abs_path = os.path.abspath(file_path)
+        keys = set()
+        if os.path.exists(abs_path):
+            keys.add(self.file_key(abs_path))  # Toma el lock del índice: se calcula antes
+        with self._index_lock():
+            index = self._read_index()
+            known = index.pop(abs_path, None)
+            if known:
+                keys.add(known['key'])
+            self._write_index(index)
+
+            removed = 0
+            for key in keys:
+                entry_dir = self._entry_dir(key)
+                if os.path.isdir(entry_dir):
+                    with self._entry_lock(key):
+                        shutil.rmtree(entry_dir, ignore_errors=True)
+                    removed += 1
+        return removed
@@ -0,0 +1,298 @@
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+NUMERIC_COLUMNS = ('Assessed Value', 'area_m2', 'meses_en_venta', 'nro_habitaciones', 'nro_pisos')
+MODEL_PROPERTY_TYPES = ('Residential', 'Single Family')
+CATEGORICAL_COLUMNS = ('Property Type', 'Residential Type', 'Town')
+
+class PropertyFeatureEncoder(BaseEstimator, TransformerMixin):
+    """
+    Transformador de filas raw de propiedades a la matriz de features float32.
+
+    Es la única implementación de la codificación: la usa el preprocesamiento
+    de entrenamiento y viaja junto al RandomForest en el artefacto de MLflow,
+    de modo que la predicción aplica exactamente la misma transformación.
+
+    Acepta un diccionario, una lista de diccionarios o un DataFrame con las
+    columnas del CSV ('Property Type' como texto y area_m2 como "155m2" o
+    número). También acepta filas ya codificadas con las columnas dummy.
+    """
+
+    def __init__(
+        self,
+        numeric_columns: Sequence[str] = NUMERIC_COLUMNS,
+        categorical_column: str = 'Property Type',
+        categories: Sequence[str] = MODEL_PROPERTY_TYPES
+    ):
+        self.numeric_columns = numeric_columns
+        self.categorical_column = categorical_column
+        self.categories = categories
+
+    def fit(self, X: Any = None, y: Any = None) -> 'PropertyFeatureEncoder':
+        """
+        Ajusta el encoder.
+
+        Fija el orden de las features de salida y, si se pasan datos,
+        registra los valores de la columna categórica vistos en entrenamiento.
+
+        Args:
+            X: Filas raw de entrenamiento (opcional)
+            y: Ignorado
+
+        Returns:
+            El propio encoder ajustado
+        """
+        self.feature_names_out_ = list(self.numeric_columns) + [
+            f"{self.categorical_column}_{category}" for category in self.categories
+        ]
+        self.n_features_out_ = len(self.feature_names_out_)
+
+        seen: List[str] = []
+        if X is not None:
+            frame = self._to_frame(X)
+            if self.categorical_column in frame.columns:
+                seen = sorted(str(value) for value in frame[self.categorical_column].dropna().unique())
+        self.seen_categories_ = seen
+        return self
+
+    def get_feature_names_out(self, input_features: Any = None) -> np.ndarray:
+        """Nombres de las columnas de salida."""
+        self._check_fitted()
+        return np.asarray(self.feature_names_out_, dtype=object)
+
+    def _check_fitted(self) -> None:
+        if not hasattr(self, 'feature_names_out_'):
+            raise ValueError("PropertyFeatureEncoder no está ajustado; llamar a fit() primero")
+
+    @staticmethod
+    def _to_frame(rows: Any) -> pd.DataFrame:
+        """Convierte la entrada (dict, lista o DataFrame) en DataFrame."""
+        if isinstance(rows, pd.DataFrame):
+            return rows
+        if isinstance(rows, dict):
+            rows = [rows]
+        return pd.DataFrame.from_records(list(rows))
+
+    @staticmethod
+    def _parse_area(series: pd.Series) -> np.ndarray:
+        """Convierte area_m2 ("155m2" o numérico) a float64."""
+        if pd.api.types.is_numeric_dtype(series):
+            return series.to_numpy(dtype=np.float64, na_value=np.nan)
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Se parsea cada categoría una sola vez y se indexa por código
+            parsed = series.cat.categories.astype(str).str.replace('m2', '', regex=False).astype(np.float64)
+            return np.asarray(parsed)[series.cat.codes.to_numpy()]
+        return series.astype(str).str.replace('m2', '', regex=False).astype(np.float64).to_numpy()
+
+    def transform(
+        self,
+        rows: Any,
+        out: Optional[np.ndarray] = None,
+        row_mask: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Transforma filas raw en la matriz de features.
+
+        Args:
+            rows: Diccionario, lista de diccionarios o DataFrame
+            out: Matriz float32 preasignada donde escribir (opcional)
+            row_mask: Máscara booleana de filas a transformar (opcional)
+
+        Returns:
+            Matriz float32 de forma (n_filas, n_features)
+        """
+        self._check_fitted()
+        frame = self._to_frame(rows)
+
+        def column(name: str) -> pd.Series:
+            series = frame[name]
+            return series if row_mask is None else series[row_mask]
+
+        n_rows = len(frame) if row_mask is None else int(np.count_nonzero(row_mask))
+        if out is None:
+            out = np.empty((n_rows, self.n_features_out_), dtype=np.float32)
+        elif out.shape != (n_rows, self.n_features_out_):
+            raise ValueError(f"La matriz de salida tiene forma {out.shape}, se esperaba {(n_rows, self.n_features_out_)}")
+
+        self._transform_numeric(column, out)
+
+        offset = len(self.numeric_columns)
+        if self.categorical_column in frame.columns:
+            values = column(self.categorical_column)
+            for k, category in enumerate(self.categories):
+                out[:, offset + k] = (values == category).to_numpy()
+        else:
+            # Filas ya codificadas con las columnas dummy
+            for k, name in enumerate(self.feature_names_out_[offset:]):
+                out[:, offset + k] = column(name).to_numpy(dtype=np.float64, na_value=0.0) if name in frame.columns else 0.0
+
+        return out
+
+    def _transform_numeric(self, column: Callable[[str], pd.Series], out: np.ndarray) -> None:
+        """Escribe las columnas numéricas en las primeras columnas de out."""
+        for j, name in enumerate(self.numeric_columns):
+            series = column(name)
+            if name == 'area_m2':
+                out[:, j] = self._parse_area(series)
+            elif isinstance(series.dtype, np.dtype):
+                out[:, j] = series.to_numpy()
+            else:
+                # Tipos nullable de pandas (Int8, Int16, ...) u object
+                out[:, j] = series.to_numpy(dtype=np.float64, na_value=np.nan)
+
+    def inverse_transform(self, X: Any) -> pd.DataFrame:
+        """
+        Reconstruye filas raw a partir de la matriz de features.
+
+        Las filas sin ninguna de las categorías del modelo reciben 'Other'.
+
+        Args:
+            X: Matriz de features
+
+        Returns:
+            DataFrame con las columnas raw
+        """
+        self._check_fitted()
+        values = np.asarray(X)
+        offset = len(self.numeric_columns)
+        frame = pd.DataFrame(values[:, :offset], columns=list(self.numeric_columns))
+
+        categories = np.full(len(values), 'Other', dtype=object)
+        for k, category in enumerate(self.categories):
+            categories[values[:, offset + k] == 1.0] = category
+        frame[self.categorical_column] = categories
+        return frame
+
+
+class CategoricalPropertyEncoder(PropertyFeatureEncoder):
+    """
+    Variante del encoder para modelos con soporte nativo de categóricas.
+
+    En lugar de columnas dummy produce, después de las numéricas, una
+    columna por variable categórica (Property Type, Residential Type y Town)
+    con el código entero de la categoría como float32. Las categorías se
+    aprenden en fit(); los valores faltantes o no vistos se codifican como
+    NaN, que HistGradientBoostingRegressor trata como faltantes.
+    """
+
+    # HistGradientBoostingRegressor (max_bins=255) requiere códigos menores que max_bins - 1
+    MAX_CATEGORIES = 254
+
+    def __init__(
+        self,
+        numeric_columns: Sequence[str] = NUMERIC_COLUMNS,
+        categorical_columns: Sequence[str] = CATEGORICAL_COLUMNS,
+        max_categories: int = MAX_CATEGORIES
+    ):
+        self.numeric_columns = numeric_columns
+        self.categorical_columns = categorical_columns
+        self.max_categories = max_categories
+
+    def fit(self, X: Any = None, y: Any = None) -> 'CategoricalPropertyEncoder':
+        """
+        Ajusta el encoder registrando las categorías de cada columna.
+
+        Si una columna supera max_categories se conservan las más
+        frecuentes; el resto se codifica como faltante.
+
+        Args:
+            X: Filas raw de entrenamiento
+            y: Ignorado
+
+        Returns:
+            El propio encoder ajustado
+        """
+        if X is None:
+            raise ValueError("CategoricalPropertyEncoder necesita filas de entrenamiento para aprender las categorías")
+        frame = self._to_frame(X)
+
+        self.categories_: Dict[str, List[str]] = {}
+        for name in self.categorical_columns:
+            values = self._categorical_values(frame, name)
+            counts = values.dropna().astype(str).value_counts(sort=True)
+            self.categories_[name] = sorted(counts.index[:self.max_categories])
+
+        self.feature_names_out_ = list(self.numeric_columns) + list(self.categorical_columns)
+        self.n_features_out_ = len(self.feature_names_out_)
+        self.categorical_indices_ = list(range(len(self.numeric_columns), self.n_features_out_))
+        return self
+
+    @staticmethod
+    def _categorical_values(frame: pd.DataFrame, name: str) -> pd.Series:
+        """
+        Columna categórica de la entrada.
+
+        Property Type se reconstruye desde las columnas dummy si la fila ya
+        viene codificada; las columnas ausentes se tratan como faltantes.
+        """
+        if name in frame.columns:
+            return frame[name]
+        dummies = [col for col in frame.columns if col.startswith(f"{name}_")]
+        values = pd.Series(np.nan, index=frame.index, dtype=object)
+        for col in dummies:
+            values[frame[col].fillna(0).to_numpy() == 1] = col[len(name) + 1:]
+        return values
+
+    def transform(
+        self,
+        rows: Any,
+        out: Optional[np.ndarray] = None,
+        row_mask: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Transforma filas raw en la matriz de features con códigos de categoría.
+
+        Args:
+            rows: Diccionario, lista de diccionarios o DataFrame
+            out: Matriz float32 preasignada donde escribir (opcional)
+            row_mask: Máscara booleana de filas a transformar (opcional)
+
+        Returns:
+            Matriz float32 de forma (n_filas, n_features)
+        """
+        self._check_fitted()
+        frame = self._to_frame(rows)
+
+        def column(name: str) -> pd.Series:
+            series = frame[name]
+            return series if row_mask is None else series[row_mask]
+
+        n_rows = len(frame) if row_mask is None else int(np.count_nonzero(row_mask))
+        if out is None:
+            out = np.empty((n_rows, self.n_features_out_), dtype=np.float32)
+        elif out.shape != (n_rows, self.n_features_out_):
+            raise ValueError(f"La matriz de salida tiene forma {out.shape}, se esperaba {(n_rows, self.n_features_out_)}")
+
+        self._transform_numeric(column, out)
+
+        for j, name in zip(self.categorical_indices_, self.categorical_columns):
+            values = self._categorical_values(frame, name)
+            if row_mask is not None:
+                values = values[row_mask]
+            codes = pd.Categorical(values.astype(object), categories=self.categories_[name]).codes
+            out[:, j] = np.where(codes >= 0, codes, np.nan)
+
+        return out
+
+    def inverse_transform(self, X: Any) -> pd.DataFrame:
+        """
+        Reconstruye filas raw a partir de la matriz de features.
+
+        Args:
+            X: Matriz de features
+
+        Returns:
+            DataFrame con las columnas raw (None en las categorías faltantes)
+        """
+        self._check_fitted()
+        values = np.asarray(X)
+        offset = len(self.numeric_columns)
+        frame = pd.DataFrame(values[:, :offset], columns=list(self.numeric_columns))
+
+        for j, name in zip(self.categorical_indices_, self.categorical_columns):
+            categories = np.asarray(self.categories_[name] + [None], dtype=object)
+            codes = values[:, j]
+            frame[name] = categories[np.where(np.isnan(codes), len(categories) - 1, codes).astype(int)]
+        return frame
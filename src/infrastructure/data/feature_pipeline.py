@@ -0,0 +1,139 @@
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Tuple
+from infrastructure.data.feature_encoder import PropertyFeatureEncoder
+
+class FeaturePipeline:
+    """
+    Preprocesamiento sin copias intermedias.
+
+    Produce las mismas features que la versión basada en dropna/get_dummies
+    del notebook, pero escribe directamente en una única matriz float32
+    preasignada, recorriendo el DataFrame por bloques de filas cuyo tamaño
+    se ajusta al presupuesto de memoria. La codificación de cada bloque la
+    hace el PropertyFeatureEncoder, que solo genera las dos columnas de
+    Property Type que usa el modelo.
+    """
+
+    MIN_BLOCK_ROWS = 1_000
+    DEFAULT_BLOCK_ROWS = 250_000
+
+    # Bytes temporales estimados por fila y bloque (máscaras, parseo de area_m2 y selección)
+    TEMP_BYTES_PER_ROW = 64
+
+    def __init__(
+        self,
+        encoder: PropertyFeatureEncoder,
+        target_column: str,
+        memory_budget_bytes: Optional[int] = None,
+        track_memory: bool = False
+    ):
+        """
+        Args:
+            encoder: Encoder ajustado que define las columnas de salida
+            target_column: Columna target
+            memory_budget_bytes: Presupuesto de memoria máximo; None para no limitar
+            track_memory: Si es True mide el pico real de memoria con tracemalloc
+                (tiene costo: activarlo solo cuando se quiere el reporte)
+        """
+        self.encoder = encoder
+        self.feature_columns = list(encoder.get_feature_names_out())
+        self.target_column = target_column
+        self.memory_budget_bytes = memory_budget_bytes
+        self.track_memory = track_memory
+        self.last_report: Dict[str, float] = {}
+
+    def _block_rows(self, df: pd.DataFrame) -> int:
+        """Calcula el número de filas por bloque según el presupuesto."""
+        n_rows = len(df)
+        if self.memory_budget_bytes is None or n_rows == 0:
+            return max(min(n_rows, self.DEFAULT_BLOCK_ROWS), 1)
+
+        # Salida preasignada (cota superior) + máscara de filas completas
+        output_bytes = n_rows * (len(self.feature_columns) * 4 + 8 + 1)
+        temp_per_row = self.TEMP_BYTES_PER_ROW + df.shape[1]
+        available = self.memory_budget_bytes - output_bytes
+
+        if available < self.MIN_BLOCK_ROWS * temp_per_row:
+            print(f"⚠️ El presupuesto de memoria ({self.memory_budget_bytes / 1024**2:.1f} MB) no alcanza "
+                  f"para la salida ({output_bytes / 1024**2:.1f} MB); se usan bloques mínimos")
+            return self.MIN_BLOCK_ROWS
+        return int(max(min(available // temp_per_row, n_rows), self.MIN_BLOCK_ROWS))
+
+    def transform(self, df: pd.DataFrame, row_mask: Optional[np.ndarray] = None) -> Tuple[pd.DataFrame, pd.Series]:
+        """
+        Transforma datos raw en (X, y).
+
+        Args:
+            df: DataFrame con datos raw
+            row_mask: Filas que además deben conservarse según columnas que no
+                están en df (p. ej. las no leídas del archivo); None para ninguna
+
+        Returns:
+            Tuple con (X, y) - features float32 y target
+        """
+        started_tracing = False
+        if self.track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            base_memory, _ = tracemalloc.get_traced_memory()
+
+        start_time = time.time()
+        n_rows = len(df)
+        block_rows = self._block_rows(df)
+
+        # Paso 1: máscara de filas completas (equivalente a dropna)
+        mask = np.empty(n_rows, dtype=bool)
+        for start in range(0, n_rows, block_rows):
+            stop = min(start + block_rows, n_rows)
+            mask[start:stop] = df.iloc[start:stop].notna().all(axis=1).to_numpy()
+        if row_mask is not None:
+            mask &= row_mask
+        n_out = int(mask.sum())
+
+        # Paso 2: matriz de salida preasignada, rellenada bloque a bloque y columna a columna
+        X_out = np.empty((n_out, len(self.feature_columns)), dtype=np.float32)
+        offset = 0
+        for start in range(0, n_rows, block_rows):
+            stop = min(start + block_rows, n_rows)
+            block_mask = mask[start:stop]
+            n_block = int(block_mask.sum())
+            if n_block == 0:
+                continue
+            self.encoder.transform(
+                df.iloc[start:stop], 
+                out=X_out[offset:offset + n_block], 
+                row_mask=block_mask
+            )
+            offset += n_block
+
+        index = df.index[mask]
+        X = pd.DataFrame(X_out, columns=self.feature_columns, index=index, copy=False)
+        y = df[self.target_column][mask]
+
+        peak_bytes = None
+        if self.track_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            peak_bytes = max(peak - base_memory, 0)
+            if started_tracing:
+                tracemalloc.stop()
+
+        self.last_report = {
+            'rows_in': n_rows,
+            'rows_out': n_out,
+            'block_rows': block_rows,
+            'n_blocks': (n_rows + block_rows - 1) // block_rows if n_rows else 0,
+            'output_bytes': int(X_out.nbytes + y.memory_usage(index=False)),
+            'memory_budget_bytes': self.memory_budget_bytes,
+            'peak_bytes': peak_bytes,
+            'within_budget': (
+                None if self.memory_budget_bytes is None or peak_bytes is None
+                else peak_bytes <= self.memory_budget_bytes
+            ),
+            'seconds': time.time() - start_time
+        }
+        return X, y
@@ -0,0 +1,155 @@
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Tuple
+
+class FeatureStore:
+    """
+    Almacén de features en disco.
+
+    Guarda la matriz X (float32, fila a fila) y el target y (float64) en
+    archivos binarios a los que se pueden ir agregando chunks, de modo que
+    un dataset mayor que la RAM se pueda construir por partes y luego
+    abrirse con memory-mapping.
+    """
+
+    X_FILE = "X.f32"
+    Y_FILE = "y.f64"
+    META_FILE = "meta.json"
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root_dir, name)
+
+    def exists(self) -> bool:
+        """Indica si el almacén ya fue creado."""
+        return os.path.exists(self._path(self.META_FILE))
+
+    def read_meta(self) -> dict:
+        """Lee los metadatos del almacén."""
+        with open(self._path(self.META_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def write_meta(self, meta: dict) -> None:
+        """Escribe los metadatos de forma atómica."""
+        tmp_path = self._path(self.META_FILE + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, self._path(self.META_FILE))
+
+    def create(self, feature_columns: List[str], target_name: str) -> None:
+        """
+        Crea (o vacía) el almacén.
+
+        Args:
+            feature_columns: Nombres de las columnas de X
+            target_name: Nombre del target
+        """
+        if os.path.exists(self.root_dir):
+            shutil.rmtree(self.root_dir)
+        os.makedirs(self.root_dir)
+        open(self._path(self.X_FILE), 'wb').close()
+        open(self._path(self.Y_FILE), 'wb').close()
+        self.write_meta({
+            'feature_columns': list(feature_columns),
+            'target_name': target_name,
+            'n_rows': 0
+        })
+
+    def append(self, X: np.ndarray, y: np.ndarray) -> int:
+        """
+        Agrega un chunk de filas al final del almacén.
+
+        Args:
+            X: Features del chunk
+            y: Target del chunk
+
+        Returns:
+            Número total de filas tras agregar el chunk
+        """
+        meta = self.read_meta()
+        X_arr = np.ascontiguousarray(X, dtype=np.float32)
+        y_arr = np.ascontiguousarray(y, dtype=np.float64)
+
+        if X_arr.ndim != 2 or X_arr.shape[1] != len(meta['feature_columns']):
+            raise ValueError(f"El chunk tiene forma {X_arr.shape}, se esperaban {len(meta['feature_columns'])} columnas")
+        if len(X_arr) != len(y_arr):
+            raise ValueError("X e y deben tener el mismo número de filas")
+
+        with open(self._path(self.X_FILE), 'ab') as f:
+            f.write(X_arr.tobytes())
+        with open(self._path(self.Y_FILE), 'ab') as f:
+            f.write(y_arr.tobytes())
+
+        meta['n_rows'] += len(X_arr)
+        self.write_meta(meta)
+        return meta['n_rows']
+
+    @property
+    def n_rows(self) -> int:
+        """Número de filas almacenadas."""
+        return self.read_meta()['n_rows']
+
+    def size_bytes(self) -> int:
+        """Tamaño en disco del almacén."""
+        total = 0
+        for name in (self.X_FILE, self.Y_FILE, self.META_FILE):
+            path = self._path(name)
+            if os.path.exists(path):
+                total += os.path.getsize(path)
+        return total
+
+    def load_arrays(self, mmap: bool = True, start: int = 0, stop: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Abre X e y como arrays de NumPy.
+
+        Args:
+            mmap: Si es True se usa memory-mapping de solo lectura (sin copiar a RAM)
+            start: Primera fila a devolver
+            stop: Fila final (exclusiva); None para llegar al final
+
+        Returns:
+            Tuple con (X, y)
+        """
+        meta = self.read_meta()
+        n_rows = meta['n_rows']
+        n_cols = len(meta['feature_columns'])
+        stop = n_rows if stop is None else min(stop, n_rows)
+        start = min(max(start, 0), stop)
+
+        if stop == start:
+            return np.empty((0, n_cols), dtype=np.float32), np.empty(0, dtype=np.float64)
+
+        if mmap:
+            X = np.memmap(self._path(self.X_FILE), dtype=np.float32, mode='r',
+                          offset=start * n_cols * 4, shape=(stop - start, n_cols))
+            y = np.memmap(self._path(self.Y_FILE), dtype=np.float64, mode='r',
+                          offset=start * 8, shape=(stop - start,))
+        else:
+            X = np.fromfile(self._path(self.X_FILE), dtype=np.float32,
+                            count=(stop - start) * n_cols, offset=start * n_cols * 4).reshape(-1, n_cols)
+            y = np.fromfile(self._path(self.Y_FILE), dtype=np.float64,
+                            count=stop - start, offset=start * 8)
+        return X, y
+
+    def load(self, mmap: bool = True, start: int = 0, stop: Optional[int] = None) -> Tuple[pd.DataFrame, pd.Series]:
+        """
+        Carga el almacén como (X, y) de pandas, sin copiar los datos.
+
+        Args:
+            mmap: Si es True se usa memory-mapping de solo lectura
+            start: Primera fila a devolver
+            stop: Fila final (exclusiva)
+
+        Returns:
+            Tuple con (X, y) - features y target
+        """
+        meta = self.read_meta()
+        X_arr, y_arr = self.load_arrays(mmap=mmap, start=start, stop=stop)
+        X = pd.DataFrame(X_arr, columns=meta['feature_columns'], copy=False)
+        y = pd.Series(y_arr, name=meta['target_name'], copy=False)
+        return X, y
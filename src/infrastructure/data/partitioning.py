@@ -0,0 +1,206 @@
+"""
+Dataset particionado en disco con layout estilo Hive.
+
+Convierte el CSV de transacciones (separado por ';') en un directorio
+`List Year=<año>/Town=<ciudad>/part-<n>.<formato>` y permite seleccionar
+solo las particiones que cumplen filtros de año y ciudad, sin abrir los
+archivos descartados.
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote, unquote
+
+DATASET_META_FILE = "_dataset.json"
+PARTITION_COLUMNS = ('List Year', 'Town')
+DEFAULT_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+def parquet_available() -> bool:
+    """Indica si pyarrow está instalado para escribir/leer Parquet."""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _partition_value(value: Any) -> str:
+    """Codifica un valor de partición para usarlo como nombre de directorio."""
+    if value is None or value != value:  # NaN / NA
+        return DEFAULT_PARTITION
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return quote(str(value), safe='')
+
+
+def is_partitioned_dataset(path: str) -> bool:
+    """Indica si el directorio es un dataset particionado."""
+    return os.path.isfile(os.path.join(path, DATASET_META_FILE))
+
+
+def partition_csv(
+    data_loader: Any,
+    csv_path: str,
+    output_dir: str,
+    file_format: Optional[str] = None,
+    chunksize: int = 100_000
+) -> Dict[str, Any]:
+    """
+    Convierte un CSV en un dataset particionado por List Year y Town.
+
+    El CSV se lee por chunks, así que la conversión funciona con archivos
+    mayores que la memoria; cada chunk añade un archivo por partición.
+
+    Args:
+        data_loader: CSVDataLoader usado para leer los chunks con el esquema declarado
+        csv_path: Ruta al CSV de origen
+        output_dir: Directorio del dataset particionado (debe no existir o estar vacío)
+        file_format: 'parquet' o 'csv'; None usa Parquet si pyarrow está disponible
+        chunksize: Filas por chunk de lectura
+
+    Returns:
+        Metadatos del dataset escrito
+    """
+    if file_format is None:
+        file_format = 'parquet' if parquet_available() else 'csv'
+    if file_format not in ('parquet', 'csv'):
+        raise ValueError(f"Formato no soportado: {file_format}")
+    if os.path.isdir(output_dir) and os.listdir(output_dir):
+        raise ValueError(f"El directorio {output_dir} no está vacío")
+    os.makedirs(output_dir, exist_ok=True)
+
+    year_col, town_col = PARTITION_COLUMNS
+    n_rows = 0
+    partitions = set()
+
+    for chunk_index, chunk in enumerate(data_loader.load_data_chunks(csv_path, chunksize=chunksize)):
+        groups = chunk.groupby(
+            [chunk[year_col].astype(object), chunk[town_col].astype(object)],
+            dropna=False, sort=False, observed=True
+        )
+        for (year, town), part in groups:
+            partition_dir = os.path.join(
+                output_dir,
+                f"{year_col}={_partition_value(year)}",
+                f"{town_col}={_partition_value(town)}"
+            )
+            os.makedirs(partition_dir, exist_ok=True)
+            part_path = os.path.join(partition_dir, f"part-{chunk_index:05d}.{file_format}")
+            if file_format == 'parquet':
+                part.to_parquet(part_path, index=False)
+            else:
+                part.to_csv(part_path, sep=';', index=False)
+            partitions.add(partition_dir)
+        n_rows += len(chunk)
+
+    meta = {
+        'source': os.path.abspath(csv_path),
+        'partition_columns': list(PARTITION_COLUMNS),
+        'format': file_format,
+        'rows': n_rows,
+        'partitions': len(partitions)
+    }
+    with open(os.path.join(output_dir, DATASET_META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+    print(f"✅ Dataset particionado en {output_dir}: {n_rows} filas, {len(partitions)} particiones ({file_format})")
+    return meta
+
+
+def _parse_partition_dir(name: str) -> Tuple[str, str]:
+    """Separa 'Columna=valor' en (columna, valor decodificado)."""
+    column, _, value = name.partition('=')
+    return column, unquote(value)
+
+
+def list_partitions(root_dir: str) -> List[Dict[str, Any]]:
+    """
+    Lista las particiones del dataset leyendo solo los nombres de directorio.
+
+    Args:
+        root_dir: Directorio del dataset particionado
+
+    Returns:
+        Lista de diccionarios con year, town y files de cada partición
+    """
+    year_col, town_col = PARTITION_COLUMNS
+    partitions = []
+    for year_dir in sorted(os.listdir(root_dir)):
+        year_path = os.path.join(root_dir, year_dir)
+        column, year_value = _parse_partition_dir(year_dir)
+        if column != year_col or not os.path.isdir(year_path):
+            continue
+        for town_dir in sorted(os.listdir(year_path)):
+            town_path = os.path.join(year_path, town_dir)
+            column, town_value = _parse_partition_dir(town_dir)
+            if column != town_col or not os.path.isdir(town_path):
+                continue
+            files = sorted(
+                os.path.join(town_path, name) for name in os.listdir(town_path)
+                if name.startswith('part-')
+            )
+            partitions.append({
+                'year': None if year_value == DEFAULT_PARTITION else int(year_value),
+                'town': None if town_value == DEFAULT_PARTITION else town_value,
+                'files': files
+            })
+    return partitions
+
+
+def select_partition_files(root_dir: str, filters: Optional[Dict[str, Any]] = None) -> List[str]:
+    """
+    Devuelve los archivos de las particiones que cumplen los filtros.
+
+    Filtros soportados:
+        years: lista de años exactos
+        year_from / year_to: rango de años (inclusive)
+        last_years: últimos N años presentes en el dataset
+        towns: lista de ciudades
+
+    Args:
+        root_dir: Directorio del dataset particionado
+        filters: Diccionario de filtros; None para seleccionar todo
+
+    Returns:
+        Lista ordenada de archivos seleccionados
+    """
+    filters = dict(filters or {})
+    unknown = set(filters) - {'years', 'year_from', 'year_to', 'last_years', 'towns'}
+    if unknown:
+        raise ValueError(f"Filtros no soportados: {sorted(unknown)}")
+
+    partitions = list_partitions(root_dir)
+
+    years: Optional[Iterable[int]] = filters.get('years')
+    year_set = {int(y) for y in years} if years is not None else None
+    year_from = filters.get('year_from')
+    year_to = filters.get('year_to')
+    if filters.get('last_years'):
+        known_years = sorted({p['year'] for p in partitions if p['year'] is not None})
+        if known_years:
+            year_from = max(year_from or known_years[0], known_years[-1] - int(filters['last_years']) + 1)
+    towns = filters.get('towns')
+    town_set = {str(t) for t in towns} if towns is not None else None
+
+    restricts_year = year_set is not None or year_from is not None or year_to is not None
+
+    selected = []
+    for p in partitions:
+        year = p['year']
+        if restricts_year:
+            if year is None:
+                continue
+            if year_set is not None and year not in year_set:
+                continue
+            if year_from is not None and year < int(year_from):
+                continue
+            if year_to is not None and year > int(year_to):
+                continue
+        if town_set is not None and p['town'] not in town_set:
+            continue
+        selected.extend(p['files'])
+
+    print(f"🗂️ Particiones seleccionadas: {len(selected)} archivos de {sum(len(p['files']) for p in partitions)}")
+    return selected
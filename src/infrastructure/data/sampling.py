@@ -0,0 +1,266 @@
+"""
+Muestreo del conjunto de entrenamiento para datasets muy grandes.
+
+Dos estrategias:
+
+- reservoir: muestreo uniforme en una sola pasada (algoritmo R), sin
+  conocer de antemano el número de filas; funciona sobre bloques de un
+  array (también memory-mapped) o sobre los chunks de iter_feature_chunks.
+- stratified: muestreo proporcional por estratos de Town, Property Type y
+  decil de precio, garantizando al menos una fila por estrato cuando el
+  tamaño de la muestra lo permite.
+
+El tamaño de la muestra se fija por número de filas o por presupuesto de
+memoria (bytes de X en float32 más y en float64 por fila).
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Iterable, Optional, Tuple
+
+SAMPLING_METHODS = ('reservoir', 'stratified')
+PRICE_BINS = 10
+BLOCK_ROWS = 100_000
+
+
+def sample_size(
+    n_rows: int,
+    n_features: int,
+    sample_rows: Optional[int] = None,
+    memory_budget_mb: Optional[float] = None
+) -> Optional[int]:
+    """
+    Calcula el tamaño de la muestra a partir de las restricciones dadas.
+
+    Args:
+        n_rows: Filas disponibles
+        n_features: Columnas de X
+        sample_rows: Filas objetivo (opcional)
+        memory_budget_mb: Presupuesto de memoria de la muestra en MB (opcional)
+
+    Returns:
+        Filas a muestrear o None si no hace falta muestrear
+    """
+    limits = []
+    if sample_rows:
+        limits.append(int(sample_rows))
+    if memory_budget_mb:
+        bytes_per_row = n_features * np.dtype(np.float32).itemsize + np.dtype(np.float64).itemsize
+        limits.append(int(memory_budget_mb * 1024**2 // bytes_per_row))
+    if not limits:
+        return None
+    k = max(min(limits), 1)
+    return k if k < n_rows else None
+
+
+class ReservoirSampler:
+    """
+    Muestreo uniforme sin reemplazo en una sola pasada (algoritmo R).
+
+    Las filas llegan por bloques con add(); el reservorio conserva k filas y
+    la posición original de cada una, para devolver la muestra en el orden
+    en que aparecieron.
+    """
+
+    def __init__(self, k: int, random_state: Optional[int] = None):
+        """
+        Args:
+            k: Tamaño de la muestra
+            random_state: Semilla del generador
+        """
+        self.k = k
+        self.rng = np.random.default_rng(random_state)
+        self.seen = 0
+        self.X: Optional[np.ndarray] = None
+        self.y: Optional[np.ndarray] = None
+        self.positions = np.empty(k, dtype=np.int64)
+
+    def add(self, X_block: np.ndarray, y_block: np.ndarray) -> None:
+        """Procesa un bloque de filas."""
+        X_block = np.asarray(X_block)
+        y_block = np.asarray(y_block)
+        n_block = len(X_block)
+        if n_block == 0:
+            return
+        if self.X is None:
+            self.X = np.empty((self.k, X_block.shape[1]), dtype=X_block.dtype)
+            self.y = np.empty(self.k, dtype=y_block.dtype)
+
+        # Las primeras k filas llenan el reservorio
+        n_fill = min(max(self.k - self.seen, 0), n_block)
+        if n_fill:
+            self.X[self.seen:self.seen + n_fill] = X_block[:n_fill]
+            self.y[self.seen:self.seen + n_fill] = y_block[:n_fill]
+            self.positions[self.seen:self.seen + n_fill] = np.arange(self.seen, self.seen + n_fill)
+
+        # La fila t (t >= k) reemplaza la posición j ~ U[0, t] si j < k
+        positions = np.arange(self.seen + n_fill, self.seen + n_block)
+        if len(positions):
+            slots = (self.rng.random(len(positions)) * (positions + 1)).astype(np.int64)
+            accepted = np.flatnonzero(slots < self.k)
+            if len(accepted):
+                # Si dos filas del bloque caen en el mismo hueco gana la última
+                _, last = np.unique(slots[accepted][::-1], return_index=True)
+                accepted = accepted[::-1][last]
+                rows = accepted + n_fill
+                self.X[slots[accepted]] = X_block[rows]
+                self.y[slots[accepted]] = y_block[rows]
+                self.positions[slots[accepted]] = positions[accepted]
+        self.seen += n_block
+
+    def result(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Devuelve la muestra en el orden original.
+
+        Returns:
+            Tuple con (posiciones, X, y)
+        """
+        n = min(self.k, self.seen)
+        if n == 0 or self.X is None:
+            return np.empty(0, dtype=np.int64), np.empty((0, 0), dtype=np.float32), np.empty(0)
+        order = np.argsort(self.positions[:n], kind='stable')
+        return self.positions[:n][order], self.X[:n][order], self.y[:n][order]
+
+
+def reservoir_sample_indices(X: np.ndarray, y: np.ndarray, k: int, random_state: Optional[int] = None) -> np.ndarray:
+    """
+    Recorre X e y una vez por bloques y devuelve las posiciones muestreadas.
+
+    Args:
+        X: Features (array o memmap)
+        y: Target
+        k: Tamaño de la muestra
+        random_state: Semilla
+
+    Returns:
+        Posiciones ordenadas de las filas elegidas
+    """
+    sampler = ReservoirSampler(k, random_state)
+    for start in range(0, len(X), BLOCK_ROWS):
+        sampler.add(X[start:start + BLOCK_ROWS], y[start:start + BLOCK_ROWS])
+    positions, _, _ = sampler.result()
+    return positions
+
+
+def build_strata(X: pd.DataFrame, y: pd.Series, towns: Optional[Iterable] = None, price_bins: int = PRICE_BINS) -> np.ndarray:
+    """
+    Asigna a cada fila un código de estrato (Town × Property Type × decil de precio).
+
+    Property Type se reconstruye de las columnas dummy 'Property Type_*'
+    (las filas sin ninguna forman su propia categoría) o se toma de la
+    columna 'Property Type' si las features traen el código de categoría.
+
+    Args:
+        X: Features
+        y: Target
+        towns: Ciudad de cada fila, alineada con X (opcional)
+        price_bins: Número de cuantiles de precio
+
+    Returns:
+        Array de códigos enteros de estrato
+    """
+    keys = []
+
+    dummy_columns = [col for col in X.columns if str(col).startswith('Property Type_')]
+    if dummy_columns:
+        dummies = X[dummy_columns].to_numpy()
+        property_code = np.where(dummies.max(axis=1) > 0, dummies.argmax(axis=1) + 1, 0)
+        keys.append(property_code)
+    elif 'Property Type' in X.columns:
+        # Features con el código de categoría (CategoricalPropertyEncoder); NaN = faltante
+        codes = X['Property Type'].to_numpy()
+        keys.append(np.where(np.isnan(codes), -1, codes).astype(np.int64))
+
+    price_code = pd.qcut(pd.Series(np.asarray(y)).rank(method='first'), q=min(price_bins, max(len(y), 1)), labels=False)
+    keys.append(price_code.to_numpy())
+
+    if towns is not None:
+        town_code, _ = pd.factorize(np.asarray(towns, dtype=object))
+        keys.append(town_code)
+
+    stacked = np.column_stack(keys)
+    _, codes = np.unique(stacked, axis=0, return_inverse=True)
+    return codes.ravel()
+
+
+def stratified_sample_indices(strata: np.ndarray, k: int, random_state: Optional[int] = None) -> np.ndarray:
+    """
+    Muestreo estratificado con asignación proporcional.
+
+    Cada estrato recibe k * n_estrato / n filas (repartiendo los restos por
+    mayor parte fraccionaria) y al menos una si k alcanza para todos.
+
+    Args:
+        strata: Código de estrato por fila
+        k: Tamaño de la muestra
+        random_state: Semilla
+
+    Returns:
+        Posiciones ordenadas de las filas elegidas
+    """
+    rng = np.random.default_rng(random_state)
+    n = len(strata)
+    counts = np.bincount(strata)
+    present = counts > 0
+
+    exact = k * counts / n
+    alloc = np.floor(exact).astype(np.int64)
+    if k >= present.sum():
+        alloc[present & (alloc == 0)] = 1
+    # Ajustar al total exacto: sumar por mayor resto, restar de los estratos más grandes
+    remainder = k - alloc.sum()
+    if remainder > 0:
+        for stratum in np.argsort(-(exact - np.floor(exact)), kind='stable'):
+            if remainder == 0:
+                break
+            if alloc[stratum] < counts[stratum]:
+                alloc[stratum] += 1
+                remainder -= 1
+    elif remainder < 0:
+        for stratum in np.argsort(-alloc, kind='stable'):
+            if remainder == 0:
+                break
+            take = min(alloc[stratum] - 1, -remainder)
+            alloc[stratum] -= take
+            remainder += take
+
+    # Orden aleatorio dentro de cada estrato y se toman los primeros alloc[s]
+    order = np.lexsort((rng.random(n), strata))
+    sorted_strata = strata[order]
+    starts = np.searchsorted(sorted_strata, np.arange(len(counts)))
+    rank = np.arange(n) - starts[sorted_strata]
+    return np.sort(order[rank < alloc[sorted_strata]])
+
+
+def sample_training_set(
+    X: pd.DataFrame,
+    y: pd.Series,
+    k: int,
+    method: str = 'reservoir',
+    random_state: Optional[int] = None,
+    towns: Optional[pd.Series] = None
+) -> Tuple[pd.DataFrame, pd.Series]:
+    """
+    Muestrea k filas del conjunto de entrenamiento.
+
+    Args:
+        X: Features de entrenamiento
+        y: Target de entrenamiento
+        k: Tamaño de la muestra
+        method: 'reservoir' o 'stratified'
+        random_state: Semilla
+        towns: Ciudad de cada fila, alineada con X (solo para 'stratified')
+
+    Returns:
+        Tuple con (X, y) de la muestra
+    """
+    if method not in SAMPLING_METHODS:
+        raise ValueError(f"Método de muestreo no soportado: {method}. Opciones: {', '.join(SAMPLING_METHODS)}")
+
+    if method == 'reservoir':
+        positions = reservoir_sample_indices(X.to_numpy(), y.to_numpy(), k, random_state)
+    else:
+        positions = stratified_sample_indices(build_strata(X, y, towns), k, random_state)
+
+    print(f"🎲 Muestreo {method}: {len(positions)} de {len(X)} filas de entrenamiento")
+    return X.iloc[positions], y.iloc[positions]
@@ -0,0 +1,129 @@
+"""
+Esquema declarado del CSV de transacciones inmobiliarias.
+
+Define el tipo compacto de cada columna del export (separado por ';') y
+las columnas que necesita el entrenamiento, para que el cargador lea solo
+lo necesario y con tipos pequeños.
+"""
+
+import sys
+import pandas as pd
+from typing import Dict, List, Optional
+
+CSV_SEPARATOR = ';'
+
+# Tipos compactos por columna. Los enteros usan tipos nullable de pandas
+# para admitir valores faltantes sin pasar a float64.
+CSV_SCHEMA: Dict[str, str] = {
+    'Serial Number': 'Int64',
+    'List Year': 'Int16',
+    'Date Recorded': 'category',
+    'Town': 'category',
+    'Address': 'category',
+    'Assessed Value': 'float32',
+    'Property Type': 'category',
+    'Residential Type': 'category',
+    'area_m2': 'category',          # Texto con formato "XXXm2"
+    'meses_en_venta': 'Int16',
+    'nro_habitaciones': 'Int8',
+    'nro_pisos': 'Int8',
+    'Sale Amount': 'float64',       # El target conserva precisión completa
+}
+
+# Columnas leídas para entrenar: las features raw, el target y
+# Residential Type, que participa en la limpieza de filas incompletas.
+TRAINING_COLUMNS: List[str] = [
+    'Assessed Value', 'Property Type', 'Residential Type', 'area_m2',
+    'meses_en_venta', 'nro_habitaciones', 'nro_pisos', 'Sale Amount'
+]
+
+
+def read_options(columns: Optional[List[str]] = None) -> dict:
+    """
+    Construye los argumentos de pd.read_csv para el esquema.
+
+    Args:
+        columns: Columnas a leer; None para leer todas
+
+    Returns:
+        Diccionario con sep, dtype y usecols
+    """
+    options = {'sep': CSV_SEPARATOR}
+    if columns is None:
+        options['dtype'] = dict(CSV_SCHEMA)
+    else:
+        wanted = set(columns)
+        options['dtype'] = {col: dtype for col, dtype in CSV_SCHEMA.items() if col in wanted}
+        # Con un callable las columnas ausentes no provocan error de lectura
+        options['usecols'] = lambda col: col in wanted
+    return options
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte las columnas de un DataFrame a los tipos del esquema.
+
+    Las columnas cuyo contenido no admite el tipo compacto se dejan como
+    están, por lo que la conversión nunca pierde información.
+
+    Args:
+        df: DataFrame leído con tipos por defecto
+
+    Returns:
+        El mismo DataFrame con los tipos compactos aplicados
+    """
+    for col, dtype in CSV_SCHEMA.items():
+        if col in df.columns and str(df[col].dtype) != dtype:
+            try:
+                df[col] = df[col].astype(dtype)
+            except (ValueError, TypeError, OverflowError):
+                continue
+    return df
+
+
+def estimate_default_memory(df: pd.DataFrame) -> int:
+    """
+    Estima la memoria que ocuparía el DataFrame con los tipos por defecto
+    de pandas (int64/float64 y cadenas object).
+
+    Args:
+        df: DataFrame con tipos compactos
+
+    Returns:
+        Bytes estimados
+    """
+    n_rows = len(df)
+    total = df.index.memory_usage()
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            counts = series.value_counts(sort=False)
+            text_bytes = sum(sys.getsizeof(value) * int(count) for value, count in counts.items())
+            # Puntero por fila más el objeto str de cada valor
+            total += n_rows * 8 + text_bytes
+        elif series.dtype == object:
+            total += series.memory_usage(index=False, deep=True)
+        else:
+            total += n_rows * 8
+    return int(total)
+
+
+def memory_report(df: pd.DataFrame) -> dict:
+    """
+    Compara la memoria real del DataFrame con la estimada por defecto.
+
+    Args:
+        df: DataFrame con tipos compactos
+
+    Returns:
+        Diccionario con memoria usada, estimada por defecto y ahorrada
+    """
+    memory_bytes = int(df.memory_usage(deep=True).sum())
+    baseline_bytes = estimate_default_memory(df)
+    saved_bytes = max(baseline_bytes - memory_bytes, 0)
+    return {
+        'memory_bytes': memory_bytes,
+        'baseline_bytes': baseline_bytes,
+        'saved_bytes': saved_bytes,
+        'saved_pct': (saved_bytes / baseline_bytes * 100) if baseline_bytes > 0 else 0.0
+    }
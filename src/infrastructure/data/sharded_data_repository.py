@@ -0,0 +1,318 @@
+import glob
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from domain.repositories.model_repository import (
+    AlignedColumnRepository, ChunkedDataRepository, DataRepository, IncrementalDataRepository
+)
+from infrastructure.data.feature_store import FeatureStore
+from infrastructure.data.partitioning import is_partitioned_dataset, select_partition_files
+
+SHARD_EXTENSIONS = ('.csv', '.parquet')
+
+
+def _load_shard_worker(data_repository: DataRepository, shard_path: str, output_dir: str) -> Dict[str, object]:
+    """
+    Carga y preprocesa un shard en un proceso del pool.
+
+    El resultado se escribe en un FeatureStore temporal en lugar de devolverse
+    por el pipe, así el proceso principal lo copia una sola vez a la matriz final.
+
+    Args:
+        data_repository: Repositorio que sabe cargar un archivo individual
+        shard_path: Ruta del shard
+        output_dir: Directorio donde escribir las features del shard
+
+    Returns:
+        Diccionario con el resultado del shard (filas, columnas o error)
+    """
+    try:
+        X, y = data_repository.load_features(shard_path)
+        store = FeatureStore(output_dir)
+        store.create(list(X.columns), y.name or "target")
+        store.append(X.to_numpy(), y.to_numpy())
+        return {'path': shard_path, 'rows': len(X), 'store_dir': output_dir, 'error': None}
+    except Exception as e:
+        return {
+            'path': shard_path,
+            'rows': 0,
+            'store_dir': None,
+            'error': f"{type(e).__name__}: {e}"
+        }
+
+
+class ShardedDataRepository(DataRepository, IncrementalDataRepository, ChunkedDataRepository, AlignedColumnRepository):
+    """
+    Repositorio de datos para fuentes divididas en varios archivos.
+
+    Acepta un archivo, un directorio, un patrón glob o un dataset
+    particionado por List Year / Town, en cuyo caso los filtros de año y
+    ciudad descartan particiones sin abrirlas. Los shards se cargan
+    y preprocesan en paralelo con un pool de procesos (cada uno usando el
+    repositorio envuelto, incluida su caché) y se concatenan en una única
+    matriz preasignada. Un shard que falla se reporta sin abortar la carga.
+    """
+
+    def __init__(self, data_repository: DataRepository, max_workers: Optional[int] = None):
+        """
+        Args:
+            data_repository: Repositorio para archivos individuales
+            max_workers: Procesos del pool (None = número de CPUs)
+        """
+        self.data_repository = data_repository
+        self.max_workers = max_workers
+        self.last_load_report: Dict[str, object] = {}  # Solo informativo (el repositorio se comparte entre hilos)
+
+    @staticmethod
+    def is_sharded_source(source: str) -> bool:
+        """Indica si la fuente es un directorio o un patrón glob."""
+        return os.path.isdir(source) or glob.has_magic(source)
+
+    @staticmethod
+    def resolve_shards(source: str) -> List[str]:
+        """
+        Lista los shards de una fuente en orden estable.
+
+        Args:
+            source: Directorio o patrón glob
+
+        Returns:
+            Lista ordenada de rutas de shards
+        """
+        if os.path.isdir(source):
+            pattern = os.path.join(source, '**', '*')
+            paths = [p for p in glob.glob(pattern, recursive=True) if p.lower().endswith(SHARD_EXTENSIONS)]
+        else:
+            paths = glob.glob(source, recursive=True)
+        return sorted(p for p in paths if os.path.isfile(p))
+
+    def _wrapped(self, capability: type, description: str) -> Any:
+        """Repositorio envuelto, si tiene la capacidad pedida."""
+        if not isinstance(self.data_repository, capability):
+            raise NotImplementedError(f"{type(self.data_repository).__name__} no soporta {description}")
+        return self.data_repository
+
+    def load_data(self, file_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Carga datos raw; para fuentes con shards los concatena en orden.
+
+        Args:
+            file_path: Archivo, directorio o patrón glob
+            columns: Columnas a leer; None para leer todas
+
+        Returns:
+            DataFrame con los datos cargados
+        """
+        if not self.is_sharded_source(file_path):
+            return self.data_repository.load_data(file_path, columns=columns)
+
+        if is_partitioned_dataset(file_path):
+            shards = select_partition_files(file_path)
+        else:
+            shards = self.resolve_shards(file_path)
+        if not shards:
+            raise Exception(f"No se encontraron shards en {file_path}")
+        frames = [self.data_repository.load_data(shard, columns=columns) for shard in shards]
+        return pd.concat(frames, ignore_index=True)
+
+    def preprocess_data(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series]:
+        """Preprocesa datos delegando en el repositorio envuelto."""
+        return self.data_repository.preprocess_data(df)
+
+    def load_features(self, file_path: str, filters: Optional[Dict[str, Any]] = None) -> Tuple[pd.DataFrame, pd.Series]:
+        """
+        Carga las features de un archivo o de un conjunto de shards.
+
+        Para fuentes con shards, X.attrs['sources'] lista los shards que se
+        cargaron (sin los que fallaron); pasarla a load_aligned_columns
+        alinea las columnas raw con estas filas.
+
+        Args:
+            file_path: Archivo, directorio, patrón glob o dataset particionado
+            filters: Filtros de partición (years, year_from, year_to, last_years, towns)
+
+        Returns:
+            Tuple con (X, y) - features y target
+        """
+        if os.path.isdir(file_path) and is_partitioned_dataset(file_path):
+            return self._load_shards(select_partition_files(file_path, filters), source=file_path, filters=filters)
+        if not self.is_sharded_source(file_path):
+            return self.data_repository.load_features(file_path, filters=filters)
+        if filters:
+            raise ValueError("Los filtros de datos requieren un dataset particionado")
+        return self._load_shards(self.resolve_shards(file_path), source=file_path)
+
+    def load_aligned_column(
+        self,
+        file_path: str,
+        column: str,
+        filters: Optional[Dict[str, Any]] = None,
+        sources: Optional[List[str]] = None
+    ) -> pd.Series:
+        """
+        Carga una columna raw alineada con las features de load_features.
+
+        Args:
+            file_path: Archivo, directorio, patrón glob o dataset particionado
+            column: Columna a cargar
+            filters: Filtros de partición
+            sources: Shards de los que salieron las filas de X (X.attrs['sources'])
+
+        Returns:
+            Serie con un valor por fila de X, en el mismo orden
+        """
+        return self.load_aligned_columns(file_path, [column], filters=filters, sources=sources)[column]
+
+    def load_aligned_columns(
+        self,
+        file_path: str,
+        columns: List[str],
+        filters: Optional[Dict[str, Any]] = None,
+        sources: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Carga varias columnas raw alineadas con las features de load_features.
+
+        Con sources (X.attrs['sources'] de la carga de X) se leen exactamente
+        los shards que se cargaron, sin los que fallaron, para que las filas
+        coincidan con X; sin sources se leen todos los shards de la fuente.
+
+        Args:
+            file_path: Archivo, directorio, patrón glob o dataset particionado
+            columns: Columnas a cargar
+            filters: Filtros de partición
+            sources: Shards de los que salieron las filas de X
+
+        Returns:
+            DataFrame con una fila por fila de X, en el mismo orden
+        """
+        data_repository = self._wrapped(AlignedColumnRepository, "columnas alineadas")
+        if not self.is_sharded_source(file_path):
+            return data_repository.load_aligned_columns(file_path, columns, filters=filters)
+
+        if sources is not None:
+            shards = list(sources)
+        elif is_partitioned_dataset(file_path):
+            shards = select_partition_files(file_path, filters)
+        else:
+            if filters:
+                raise ValueError("Los filtros de datos requieren un dataset particionado")
+            shards = self.resolve_shards(file_path)
+
+        parts = [data_repository.load_aligned_columns(shard, columns) for shard in shards]
+        if not parts:
+            raise Exception(f"No se encontraron shards en {file_path}")
+        return pd.concat(parts, ignore_index=True)
+
+    def load_appended_features(self, file_path: str, byte_offset: int) -> Tuple[pd.DataFrame, pd.Series]:
+        """Carga las filas agregadas a un archivo único (las fuentes con shards no lo admiten)."""
+        if self.is_sharded_source(file_path):
+            raise NotImplementedError("La ingesta incremental solo está disponible para un archivo único")
+        return self._wrapped(IncrementalDataRepository, "ingesta incremental").load_appended_features(file_path, byte_offset)
+
+    def iter_feature_chunks(
+        self,
+        file_path: str,
+        chunksize: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Tuple[pd.DataFrame, pd.Series]]:
+        """
+        Recorre las features por chunks, shard por shard y en orden.
+
+        A diferencia de load_features no usa el pool de procesos: los shards
+        se leen de a uno para que la memoria quede acotada por un chunk.
+
+        Args:
+            file_path: Archivo, directorio, patrón glob o dataset particionado
+            chunksize: Filas máximas por chunk (None = el valor por defecto del repositorio)
+            filters: Filtros de partición
+
+        Returns:
+            Iterador de tuplas (X, y) por chunk
+        """
+        data_repository = self._wrapped(ChunkedDataRepository, "lectura por chunks")
+        if os.path.isdir(file_path) and is_partitioned_dataset(file_path):
+            shards = select_partition_files(file_path, filters)
+        elif not self.is_sharded_source(file_path):
+            yield from data_repository.iter_feature_chunks(file_path, chunksize=chunksize, filters=filters)
+            return
+        elif filters:
+            raise ValueError("Los filtros de datos requieren un dataset particionado")
+        else:
+            shards = self.resolve_shards(file_path)
+        if not shards:
+            raise Exception(f"No se encontraron shards en {file_path}")
+        for shard in shards:
+            yield from data_repository.iter_feature_chunks(shard, chunksize=chunksize)
+
+    def data_watermark(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Marca de agua de un archivo único (None para fuentes con shards)."""
+        if self.is_sharded_source(file_path) or not isinstance(self.data_repository, IncrementalDataRepository):
+            return None
+        return self.data_repository.data_watermark(file_path)
+
+    def _load_shards(
+        self,
+        shards: List[str],
+        source: str,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Tuple[pd.DataFrame, pd.Series]:
+        """Carga una lista de shards en paralelo y concatena sus features."""
+        if not shards:
+            raise Exception(f"No se encontraron shards en {source}")
+
+        max_workers = min(self.max_workers or os.cpu_count() or 1, len(shards))
+        print(f"📦 Cargando {len(shards)} shards con {max_workers} procesos...")
+
+        tmp_dir = tempfile.mkdtemp(prefix="shards-")
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(_load_shard_worker, self.data_repository, shard, os.path.join(tmp_dir, str(i)))
+                    for i, shard in enumerate(shards)
+                ]
+                results = [future.result() for future in futures]
+
+            loaded = [r for r in results if r['error'] is None]
+            failed = [r for r in results if r['error'] is not None]
+            for r in failed:
+                print(f"❌ Error en shard {r['path']}: {r['error']}")
+
+            load_report = {
+                'source': source,
+                'filters': filters,
+                'shards': len(shards),
+                'loaded': [r['path'] for r in loaded],
+                'failed': {r['path']: r['error'] for r in failed},
+                'rows': sum(r['rows'] for r in loaded)
+            }
+            self.last_load_report = load_report
+
+            if not loaded:
+                raise Exception(f"No se pudo cargar ningún shard de {source}")
+
+            # Matriz final preasignada: cada shard se copia una sola vez en su tramo
+            meta = FeatureStore(loaded[0]['store_dir']).read_meta()
+            n_rows = load_report['rows']
+            X_out = np.empty((n_rows, len(meta['feature_columns'])), dtype=np.float32)
+            y_out = np.empty(n_rows, dtype=np.float64)
+
+            offset = 0
+            for r in loaded:
+                X_shard, y_shard = FeatureStore(r['store_dir']).load_arrays(mmap=True)
+                X_out[offset:offset + len(X_shard)] = X_shard
+                y_out[offset:offset + len(y_shard)] = y_shard
+                offset += len(X_shard)
+                del X_shard, y_shard
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        print(f"✅ Shards cargados: {len(loaded)}/{len(shards)} ({n_rows} filas)")
+        X = pd.DataFrame(X_out, columns=meta['feature_columns'], copy=False)
+        y = pd.Series(y_out, name=meta['target_name'], copy=False)
+        X.attrs['sources'] = load_report['loaded']
+        return X, y
@@ -0,0 +1,240 @@
+import re
+import sqlite3
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from infrastructure.data.data_loader import DEFAULT_CHUNK_ROWS, CSVDataLoader
+from infrastructure.data.schema import CSV_SCHEMA, apply_schema, memory_report
+
+class SQLDataRepository(CSVDataLoader):
+    """
+    Repositorio de datos que lee las transacciones desde una base de datos.
+
+    Funciona con cualquier conexión DB-API 2.0 (SQLite, PostgreSQL, ...):
+    las filas se traen por bloques con fetchmany (con un cursor con nombre,
+    del lado del servidor, si el driver lo admite) y cada bloque se convierte
+    a los tipos del esquema del CSV. El preprocesamiento es el mismo de
+    CSVDataLoader, por lo que (X, y) coinciden con los del CSV equivalente.
+
+    En lugar de una ruta de archivo, `file_path` es el nombre de una tabla
+    o una consulta SELECT.
+    """
+
+    def __init__(
+        self,
+        connection_factory: Callable[[], Any],
+        column_mapping: Optional[Dict[str, str]] = None,
+        fetch_size: int = DEFAULT_CHUNK_ROWS,
+        cursor_name: Optional[str] = None,
+        memory_budget_mb: Optional[float] = None
+    ):
+        """
+        Args:
+            connection_factory: Función sin argumentos que abre una conexión DB-API
+            column_mapping: Nombre de columna en la base -> nombre de columna del CSV
+            fetch_size: Filas por llamada a fetchmany
+            cursor_name: Nombre del cursor del lado del servidor (p. ej. psycopg2); None usa un cursor normal
+            memory_budget_mb: Presupuesto de memoria del preprocesamiento en MB (None = sin límite)
+        """
+        super().__init__(memory_budget_mb=memory_budget_mb)
+        self.connection_factory = connection_factory
+        self.column_mapping = dict(column_mapping or {})
+        self.fetch_size = fetch_size
+        self.cursor_name = cursor_name
+
+    @classmethod
+    def from_sqlite(cls, db_path: str, **kwargs) -> 'SQLDataRepository':
+        """
+        Crea el repositorio para una base SQLite.
+
+        Args:
+            db_path: Ruta al archivo de la base
+            **kwargs: Resto de argumentos del constructor
+
+        Returns:
+            SQLDataRepository configurado
+        """
+        return cls(lambda: sqlite3.connect(db_path), **kwargs)
+
+    @staticmethod
+    def _quote(identifier: str) -> str:
+        """Cita un identificador SQL (las columnas del CSV tienen espacios)."""
+        return '"' + identifier.replace('"', '""') + '"'
+
+    @staticmethod
+    def _is_query(source: str) -> bool:
+        return re.match(r'^\s*(select|with)\b', source, re.IGNORECASE) is not None
+
+    def _base_query(self, source: str) -> str:
+        if self._is_query(source):
+            return f"SELECT * FROM ({source.strip().rstrip(';')}) AS src"
+        return f"SELECT * FROM {self._quote(source)}"
+
+    def _open_cursor(self, connection: Any) -> Any:
+        cursor = connection.cursor(self.cursor_name) if self.cursor_name else connection.cursor()
+        cursor.arraysize = self.fetch_size
+        return cursor
+
+    def _source_columns(self, connection: Any, source: str) -> List[str]:
+        """Columnas de la fuente, leídas de cursor.description sin traer filas."""
+        cursor = connection.cursor()
+        try:
+            cursor.execute(f"{self._base_query(source)} WHERE 1 = 0")
+            return [description[0] for description in cursor.description]
+        finally:
+            cursor.close()
+
+    def _select(self, connection: Any, source: str, columns: Optional[List[str]]) -> Tuple[str, List[str]]:
+        """
+        Construye la consulta con solo las columnas pedidas.
+
+        Returns:
+            Tuple con (consulta, nombres de columna del CSV en el orden de la consulta)
+        """
+        db_columns = self._source_columns(connection, source)
+        if columns is not None:
+            wanted = set(columns)
+            db_columns = [col for col in db_columns if self.column_mapping.get(col, col) in wanted]
+        if not db_columns:
+            raise ValueError(f"La fuente {source} no tiene ninguna de las columnas pedidas")
+
+        select_list = ", ".join(self._quote(col) for col in db_columns)
+        if self._is_query(source):
+            query = f"SELECT {select_list} FROM ({source.strip().rstrip(';')}) AS src"
+        else:
+            query = f"SELECT {select_list} FROM {self._quote(source)}"
+        return query, [self.column_mapping.get(col, col) for col in db_columns]
+
+    def load_data_chunks(
+        self,
+        file_path: str,
+        chunksize: Optional[int] = None,
+        columns: Optional[List[str]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Lee la tabla o consulta por bloques con fetchmany.
+
+        Cada bloque se convierte a los tipos del esquema y conserva el índice
+        correlativo, igual que los chunks de pd.read_csv.
+
+        Args:
+            file_path: Nombre de la tabla o consulta SELECT
+            chunksize: Filas por bloque; None usa fetch_size
+            columns: Columnas (nombres del CSV) a leer; None para leer todas
+
+        Returns:
+            Iterador de DataFrames con los datos raw
+        """
+        chunksize = chunksize or self.fetch_size
+        try:
+            connection = self.connection_factory()
+        except Exception as e:
+            raise Exception(f"Error al conectar con la base de datos: {str(e)}")
+
+        try:
+            query, names = self._select(connection, file_path, columns)
+            cursor = self._open_cursor(connection)
+            try:
+                cursor.execute(query)
+                offset = 0
+                while True:
+                    rows = cursor.fetchmany(chunksize)
+                    if not rows:
+                        break
+                    chunk = pd.DataFrame.from_records(rows, columns=names)
+                    chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+                    offset += len(chunk)
+                    yield apply_schema(chunk)
+            finally:
+                cursor.close()
+        except Exception as e:
+            raise Exception(f"Error al cargar datos desde {file_path}: {str(e)}")
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _empty_frame(columns: Optional[List[str]]) -> pd.DataFrame:
+        names = list(CSV_SCHEMA) if columns is None else [col for col in CSV_SCHEMA if col in set(columns)]
+        return pd.DataFrame({col: pd.Series(dtype=CSV_SCHEMA[col]) for col in names})
+
+    @staticmethod
+    def _concat_chunks(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+        """Concatena chunks unificando las categorías de las columnas category."""
+        if len(chunks) == 1:
+            return chunks[0]
+        data = {}
+        for col in chunks[0].columns:
+            parts = [chunk[col] for chunk in chunks]
+            if all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+                data[col] = pd.Series(union_categoricals(parts, ignore_order=True), name=col)
+            else:
+                data[col] = pd.concat(parts, ignore_index=True)
+        return pd.DataFrame(data)
+
+    def load_data(self, file_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Carga la tabla o consulta completa con los tipos del esquema.
+
+        Args:
+            file_path: Nombre de la tabla o consulta SELECT
+            columns: Columnas (nombres del CSV) a leer; None para leer todas
+
+        Returns:
+            DataFrame con los datos cargados
+        """
+        chunks = list(self.load_data_chunks(file_path, columns=columns))
+        df = self._concat_chunks(chunks) if chunks else self._empty_frame(columns)
+
+        report = memory_report(df)
+        df.attrs['memory_report'] = report
+        print(f"Datos cargados exitosamente: {df.shape[0]} filas, {df.shape[1]} columnas")
+        print(f"Memoria: {report['memory_bytes'] / 1024**2:.1f} MB "
+              f"(ahorro estimado {report['saved_bytes'] / 1024**2:.1f} MB, {report['saved_pct']:.0f}%)")
+        return df
+
+    def _load_complete(self, file_path: str, columns: List[str]) -> Tuple[pd.DataFrame, Optional[np.ndarray]]:
+        """
+        Lee todas las columnas en una sola consulta, conservando solo las
+        pedidas y la máscara de filas completas (dos consultas no garantizan
+        el mismo orden de filas).
+        """
+        wanted = set(columns)
+        chunks, masks = [], []
+        for chunk in self.load_data_chunks(file_path):
+            masks.append(chunk.notna().all(axis=1).to_numpy())
+            chunks.append(chunk[[col for col in chunk.columns if col in wanted]])
+        df = self._concat_chunks(chunks) if chunks else self._empty_frame(columns)
+        return df, (np.concatenate(masks) if masks else np.zeros(0, dtype=bool))
+
+    def load_features(self, file_path: str, filters: Optional[Dict[str, Any]] = None) -> Tuple[pd.DataFrame, pd.Series]:
+        """
+        Lee y preprocesa la fuente bloque a bloque, sin materializar los
+        datos raw completos.
+
+        Args:
+            file_path: Nombre de la tabla o consulta SELECT
+            filters: No soportado (usar una consulta SELECT con WHERE)
+
+        Returns:
+            Tuple con (X, y) - features y target
+        """
+        if filters:
+            raise ValueError("Los filtros de datos no aplican a fuentes SQL; usar una consulta con WHERE")
+
+        X_chunks, y_chunks = [], []
+        for chunk in self.load_data_chunks(file_path):
+            X_chunk, y_chunk = self.preprocess_data(chunk, verbose=False)
+            X_chunks.append(X_chunk)
+            y_chunks.append(y_chunk)
+
+        if not X_chunks:
+            return self.preprocess_data(self._empty_frame(None), verbose=False)
+
+        X = pd.concat(X_chunks) if len(X_chunks) > 1 else X_chunks[0]
+        y = pd.concat(y_chunks) if len(y_chunks) > 1 else y_chunks[0]
+        print(f"Features cargadas desde {file_path}: {X.shape} en {len(X_chunks)} bloques")
+        return X, y
+
+    def load_appended_features(self, file_path: str, byte_offset: int) -> Tuple[pd.DataFrame, pd.Series]:
+        raise NotImplementedError("SQLDataRepository no soporta ingesta incremental por offset de bytes")
@@ -0,0 +1,303 @@
+"""
+Búsqueda adaptativa de hiperparámetros.
+
+Dos fases sobre los datos compartidos de SharedTrainingData:
+
+1. Successive halving: se muestrean configuraciones al azar y se evalúan
+   con una fracción del recurso (filas de train o n_estimators); en cada
+   escalón sobrevive el mejor 1/eta y el recurso se multiplica por eta
+   hasta llegar a la fidelidad completa.
+2. Propuestas basadas en modelo: un RandomForest sustituto, entrenado con
+   todos los trials (la fidelidad es una feature más), predice media y
+   dispersión entre árboles para candidatos aleatorios; se evalúan a
+   fidelidad completa los de mayor mejora esperada.
+
+Cada trial se persiste en un TrialStore: al repetir la búsqueda (por
+ejemplo tras una interrupción) los trials ya hechos se leen del almacén y
+la secuencia de propuestas, determinista con la semilla, continúa donde
+quedó.
+"""
+
+import json
+import math
+import os
+import numpy as np
+from typing import Any, Dict, List, Optional, Set
+from scipy.stats import norm
+from sklearn.ensemble import RandomForestRegressor
+from infrastructure.ml.hyperparameter_search import HyperparameterSearch, LOWER_IS_BETTER, SharedTrainingData
+from infrastructure.ml.trial_store import TrialStore
+
+# Espacio de búsqueda: nombre -> (tipo, parámetros del tipo)
+SEARCH_SPACE = {
+    'n_estimators': ('int', 50, 500),
+    'max_depth': ('int_or_none', 4, 30),
+    'min_samples_leaf': ('log_int', 1, 50),
+    'max_features': ('choice', [1.0, 'sqrt', 0.5]),
+    'max_samples': ('float', 0.3, 1.0),
+}
+RESOURCES = ('rows', 'n_estimators')
+MIN_TRAIN_ROWS = 500       # Mínimo de filas por trial de baja fidelidad
+N_CANDIDATES = 256         # Candidatos aleatorios evaluados por el sustituto
+
+
+def sample_params(space: Dict[str, tuple], rng: np.random.Generator) -> Dict[str, Any]:
+    """
+    Muestrea una configuración del espacio de búsqueda.
+
+    Args:
+        space: Espacio de búsqueda (ver SEARCH_SPACE)
+        rng: Generador aleatorio
+
+    Returns:
+        Diccionario de hiperparámetros
+    """
+    params = {}
+    for name, (kind, *args) in space.items():
+        if kind == 'int':
+            params[name] = int(rng.integers(args[0], args[1] + 1))
+        elif kind == 'log_int':
+            params[name] = int(round(math.exp(rng.uniform(math.log(args[0]), math.log(args[1])))))
+        elif kind == 'int_or_none':
+            # Una de cada cinco configuraciones sin límite de profundidad
+            params[name] = None if rng.random() < 0.2 else int(rng.integers(args[0], args[1] + 1))
+        elif kind == 'float':
+            params[name] = round(float(rng.uniform(args[0], args[1])), 2)
+        elif kind == 'choice':
+            params[name] = args[0][int(rng.integers(len(args[0])))]
+        else:
+            raise ValueError(f"Tipo de parámetro no soportado: {kind}")
+    return params
+
+
+def encode_params(space: Dict[str, tuple], params: Dict[str, Any]) -> List[float]:
+    """Codifica una configuración como vector numérico para el modelo sustituto."""
+    vector = []
+    for name, (kind, *args) in space.items():
+        value = params[name]
+        if kind == 'log_int':
+            vector.append(math.log(value))
+        elif kind == 'int_or_none':
+            vector.append(2.0 * args[1] if value is None else float(value))
+        elif kind == 'choice':
+            vector.append(float(args[0].index(value)))
+        else:
+            vector.append(float(value))
+    return vector
+
+
+def _canonical(params: Dict[str, Any]) -> str:
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+class AdaptiveSearch:
+    """Successive halving seguido de propuestas de un modelo sustituto, con trials persistentes."""
+
+    def __init__(
+        self,
+        search: HyperparameterSearch,
+        store: TrialStore,
+        study: str = "default",
+        space: Optional[Dict[str, tuple]] = None,
+        n_initial: int = 16,
+        eta: int = 3,
+        min_fraction: float = 1 / 9,
+        resource: str = 'rows',
+        n_proposals: int = 6
+    ):
+        """
+        Args:
+            search: Ejecutor de trials (presupuesto, semilla y métrica)
+            store: Almacén persistente de trials
+            study: Nombre de la búsqueda en el almacén
+            space: Espacio de búsqueda (None = SEARCH_SPACE)
+            n_initial: Configuraciones aleatorias del primer escalón
+            eta: Factor de reducción entre escalones
+            min_fraction: Fracción del recurso en el primer escalón
+            resource: 'rows' (filas de train) o 'n_estimators'
+            n_proposals: Trials propuestos por el modelo sustituto
+        """
+        if resource not in RESOURCES:
+            raise ValueError(f"Recurso no soportado: {resource}. Opciones: {', '.join(RESOURCES)}")
+        self.search = search
+        self.store = store
+        self.study = study
+        self.space = space or SEARCH_SPACE
+        self.n_initial = n_initial
+        self.eta = eta
+        self.resource = resource
+        self.n_proposals = n_proposals
+
+        n_rungs = max(int(round(math.log(1 / min_fraction) / math.log(eta))), 0)
+        self.fidelities = [float(eta) ** -(n_rungs - i) for i in range(n_rungs + 1)]
+
+    def _score(self, trial: Dict[str, Any]) -> float:
+        """Métrica orientada para que mayor sea mejor."""
+        value = trial['metrics'][self.search.metric]
+        return -value if self.search.metric in LOWER_IS_BETTER else value
+
+    def _evaluate(
+        self,
+        data: SharedTrainingData,
+        data_key: str,
+        configs: List[Dict[str, Any]],
+        fidelity: float,
+        first_trial: int
+    ) -> List[Dict[str, Any]]:
+        """Evalúa configuraciones a una fidelidad, reutilizando las del almacén."""
+        trials = []
+        tasks = []
+        for i, params in enumerate(configs):
+            key = TrialStore.trial_key(data_key, params, fidelity, self.search.random_state, self.resource)
+            trial = {'trial': first_trial + i, 'params': params, 'fidelity': fidelity, 'trial_key': key}
+            stored = self.store.get(key)
+            if stored is not None:
+                trial.update(metrics=stored['metrics'], fit_seconds=stored['fit_seconds'],
+                             model_path=stored['model_path'], error=None, cached=True)
+            else:
+                trial['cached'] = False
+                fit_params = dict(params)
+                task = {'trial': trial['trial'], 'params': fit_params, 'key': key}
+                if fidelity < 1 and self.resource == 'n_estimators':
+                    fit_params['n_estimators'] = max(int(round(params['n_estimators'] * fidelity)), 1)
+                if fidelity < 1 and self.resource == 'rows':
+                    task['train_rows'] = max(int(data.n_train * fidelity), min(data.n_train, MIN_TRAIN_ROWS))
+                if fidelity >= 1:
+                    task['model_path'] = self.store.model_path(key)
+                tasks.append((trial, task))
+            trials.append(trial)
+
+        cached = len(configs) - len(tasks)
+        if cached:
+            print(f"♻️ {cached} trials reutilizados del almacén")
+
+        def persist(task: Dict[str, Any], result: Dict[str, Any]) -> None:
+            trial = next(t for t, pending in tasks if pending is task)
+            self.store.record(task['key'], self.study, data_key, trial['params'], fidelity, result)
+
+        results = self.search.execute(data, [task for _, task in tasks], on_result=persist)
+        for (trial, _), result in zip(tasks, results):
+            trial.update(metrics=result['metrics'], fit_seconds=result['fit_seconds'],
+                         model_path=result['model_path'], error=result['error'])
+        return trials
+
+    def _propose(
+        self,
+        trials: List[Dict[str, Any]],
+        seen: Set[str],
+        rng: np.random.Generator,
+        n: int
+    ) -> List[Dict[str, Any]]:
+        """Propone n configuraciones nuevas por mejora esperada (EI) según el sustituto."""
+        candidates = []
+        candidate_keys = set()
+        for _ in range(N_CANDIDATES * 4):
+            if len(candidates) == N_CANDIDATES:
+                break
+            params = sample_params(self.space, rng)
+            key = _canonical(params)
+            if key not in seen and key not in candidate_keys:
+                candidates.append(params)
+                candidate_keys.add(key)
+
+        done = [t for t in trials if not t['error']]
+        if len(done) < 3 or not candidates:
+            return candidates[:n]
+
+        X = np.array([encode_params(self.space, t['params']) + [t['fidelity']] for t in done])
+        y = np.array([self._score(t) for t in done])
+        surrogate = RandomForestRegressor(n_estimators=100, min_samples_leaf=2, random_state=self.search.random_state)
+        surrogate.fit(X, y)
+
+        X_candidates = np.array([encode_params(self.space, params) + [1.0] for params in candidates])
+        per_tree = np.stack([tree.predict(X_candidates) for tree in surrogate.estimators_])
+        mu = per_tree.mean(axis=0)
+        sigma = np.maximum(per_tree.std(axis=0), 1e-12)
+
+        full = [self._score(t) for t in done if t['fidelity'] >= 1]
+        best = max(full) if full else y.max()
+        z = (mu - best) / sigma
+        expected_improvement = (mu - best) * norm.cdf(z) + sigma * norm.pdf(z)
+
+        order = np.argsort(-expected_improvement, kind='stable')
+        return [candidates[i] for i in order[:n]]
+
+    def run(self, data: SharedTrainingData) -> List[Dict[str, Any]]:
+        """
+        Ejecuta la búsqueda completa.
+
+        Args:
+            data: Datos compartidos
+
+        Returns:
+            Todos los trials (cada uno con params, fidelity, metrics, cached,
+            trial_key y error)
+        """
+        data_key = data.fingerprint()
+        rng = np.random.default_rng(self.search.random_state)
+
+        configs = []
+        seen: Set[str] = set()
+        for _ in range(self.n_initial * 4):
+            if len(configs) == self.n_initial:
+                break
+            params = sample_params(self.space, rng)
+            if _canonical(params) not in seen:
+                configs.append(params)
+                seen.add(_canonical(params))
+
+        trials: List[Dict[str, Any]] = []
+
+        # Fase 1: successive halving
+        survivors = configs
+        for rung, fidelity in enumerate(self.fidelities):
+            print(f"🪜 Escalón {rung + 1}/{len(self.fidelities)}: {len(survivors)} configuraciones "
+                  f"con {fidelity:.0%} de {'las filas' if self.resource == 'rows' else 'los estimadores'}")
+            results = self._evaluate(data, data_key, survivors, fidelity, len(trials) + 1)
+            trials.extend(results)
+            if fidelity >= 1:
+                break
+            done = sorted((t for t in results if not t['error']), key=self._score, reverse=True)
+            survivors = [t['params'] for t in done[:max(math.ceil(len(survivors) / self.eta), 1)]]
+            if not survivors:
+                break
+
+        # Fase 2: propuestas del modelo sustituto, en lotes del tamaño del pool
+        batch_size = max(min(self.search.budget.cores, self.n_proposals), 1)
+        proposed = 0
+        while proposed < self.n_proposals:
+            n = min(batch_size, self.n_proposals - proposed)
+            proposals = self._propose(trials, seen, rng, n)
+            if not proposals:
+                break
+            seen.update(_canonical(params) for params in proposals)
+            print(f"🤖 Modelo sustituto: {len(proposals)} configuraciones propuestas")
+            trials.extend(self._evaluate(data, data_key, proposals, 1.0, len(trials) + 1))
+            proposed += len(proposals)
+
+        return trials
+
+    def best_trial(self, trials: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Mejor trial a fidelidad completa (None si ninguno terminó bien)."""
+        return self.search.best_trial([t for t in trials if t['fidelity'] >= 1])
+
+    def load_best_model(self, data: SharedTrainingData, best: Dict[str, Any]) -> Any:
+        """
+        Carga el modelo del mejor trial y poda los demás modelos guardados.
+
+        Si el modelo ya no está en disco (fue podado en una búsqueda
+        anterior) se reentrena una vez con los mismos datos y semilla.
+        """
+        data_key = data.fingerprint()
+        if not best.get('model_path') or not os.path.exists(best['model_path']):
+            print(f"♻️ El modelo del trial {best['trial']} no está guardado; reentrenando a fidelidad completa")
+            model_path = self.store.model_path(best['trial_key'])
+            result = self.search.execute(data, [{'trial': best['trial'], 'params': best['params'], 'model_path': model_path}])[0]
+            if result['error']:
+                raise Exception(f"No se pudo reentrenar el mejor trial: {result['error']}")
+            self.store.record(best['trial_key'], self.study, data_key, best['params'], 1.0, result)
+            best['model_path'] = model_path
+
+        model = self.search.load_trial_model(best)
+        self.store.prune_models(data_key, keep=[best['trial_key']])
+        return model
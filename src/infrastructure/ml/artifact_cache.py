@@ -0,0 +1,267 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional, Tuple
+import mlflow
+from infrastructure.data.file_lock import file_lock
+
+# URIs que pueden cambiar de contenido (etapas, alias, latest): no se cachean
+_MUTABLE_MODEL_URI = re.compile(r"^models:/[^/@]+(@.+|/(?!\d+$)[^/]+)$")
+
+
+def is_immutable_uri(model_uri: str) -> bool:
+    """
+    Indica si la URI siempre apunta al mismo artefacto.
+
+    runs:/, models:/<nombre>/<versión> y las rutas de artefactos son
+    inmutables; models:/<nombre>/Production, models:/<nombre>@alias o
+    models:/<nombre>/latest cambian al promover versiones.
+    """
+    return not _MUTABLE_MODEL_URI.match(model_uri)
+
+
+class ModelArtifactCache:
+    """
+    Caché local de artefactos de modelos direccionada por contenido.
+
+    Cada artefacto descargado se guarda una sola vez bajo el hash SHA-256
+    de sus archivos; el índice asocia cada URI (con su run_id y versión) a
+    ese hash, así dos URIs del mismo artefacto comparten la copia. Cuando el
+    tamaño total supera el presupuesto se eliminan los artefactos usados
+    hace más tiempo.
+
+    Varios procesos (workers de Streamlit, contenedores con el volumen
+    montado) comparten la caché con bloqueos de archivo: el índice se
+    modifica con un lock exclusivo, cada URI se descarga una sola vez aunque
+    la pidan varios procesos a la vez y un artefacto que se está cargando
+    (lock compartido) no se elimina.
+    """
+
+    INDEX_FILE = "index.json"
+    HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+    def __init__(self, cache_dir: str, max_bytes: int = 2 * 1024**3):
+        """
+        Args:
+            cache_dir: Directorio raíz de la caché
+            max_bytes: Tamaño máximo total de los artefactos en bytes
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.blobs_dir = os.path.join(cache_dir, "blobs")
+        self.locks_dir = os.path.join(cache_dir, "locks")
+        os.makedirs(self.blobs_dir, exist_ok=True)
+        os.makedirs(self.locks_dir, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Índice y locks
+    # ------------------------------------------------------------------
+
+    def _read_index(self) -> dict:
+        path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        index = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+            except (OSError, ValueError):
+                index = {}
+        index.setdefault('refs', {})
+        index.setdefault('blobs', {})
+        index.setdefault('stats', {'hits': 0, 'misses': 0, 'bytes_saved': 0, 'bytes_downloaded': 0})
+        return index
+
+    def _write_index(self, index: dict) -> None:
+        path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def _lock_path(self, name: str) -> str:
+        return os.path.join(self.locks_dir, f"{name}.lock")
+
+    def _index_lock(self):
+        return file_lock(self._lock_path("index"))
+
+    @staticmethod
+    def _uri_key(model_uri: str) -> str:
+        return hashlib.sha256(model_uri.encode('utf-8')).hexdigest()
+
+    def _blob_dir(self, sha256: str) -> str:
+        return os.path.join(self.blobs_dir, sha256)
+
+    # ------------------------------------------------------------------
+    # Contenido
+    # ------------------------------------------------------------------
+
+    def _hash_dir(self, root_dir: str) -> Tuple[str, int]:
+        """
+        Hash SHA-256 del contenido de un directorio (rutas relativas y bytes, en orden).
+
+        Returns:
+            Tuple con (hash hexadecimal, tamaño total en bytes)
+        """
+        hasher = hashlib.sha256()
+        total = 0
+        for dirpath, dirnames, filenames in os.walk(root_dir):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                path = os.path.join(dirpath, filename)
+                hasher.update(os.path.relpath(path, root_dir).replace(os.sep, '/').encode('utf-8') + b'\0')
+                with open(path, 'rb') as f:
+                    for block in iter(lambda: f.read(self.HASH_BLOCK_SIZE), b''):
+                        hasher.update(block)
+                        total += len(block)
+        return hasher.hexdigest(), total
+
+    def _lookup(self, model_uri: str) -> Optional[str]:
+        """Busca la URI en el índice y, si está, registra el acierto. Devuelve la ruta local."""
+        with self._index_lock():
+            index = self._read_index()
+            ref = index['refs'].get(model_uri)
+            blob = index['blobs'].get(ref['sha256']) if ref else None
+            if blob is None or not os.path.isdir(self._blob_dir(ref['sha256'])):
+                return None
+            blob['last_access'] = time.time()
+            index['stats']['hits'] += 1
+            index['stats']['bytes_saved'] += blob['bytes']
+            self._write_index(index)
+        print(f"⚡ Modelo desde la caché local: {model_uri} ({blob['bytes'] / 1024**2:.1f} MB sin descargar)")
+        return self._blob_dir(ref['sha256'])
+
+    def fetch(self, model_uri: str, run_id: Optional[str] = None, version: Optional[int] = None) -> str:
+        """
+        Devuelve la ruta local del artefacto, descargándolo si no está en caché.
+
+        Args:
+            model_uri: URI inmutable del modelo (ver is_immutable_uri)
+            run_id: Run del modelo (informativo, queda en el índice)
+            version: Versión registrada (informativa)
+
+        Returns:
+            Directorio local con el artefacto
+        """
+        path = self._lookup(model_uri)
+        if path is not None:
+            return path
+
+        # Un solo proceso descarga cada URI; los demás esperan y la encuentran en caché
+        with file_lock(self._lock_path(self._uri_key(model_uri))):
+            path = self._lookup(model_uri)
+            if path is not None:
+                return path
+
+            tmp_dir = os.path.join(self.cache_dir, f".tmp-{uuid.uuid4().hex}")
+            os.makedirs(tmp_dir)
+            try:
+                start = time.perf_counter()
+                local_path = mlflow.artifacts.download_artifacts(artifact_uri=model_uri, dst_path=tmp_dir)
+                sha256, size = self._hash_dir(local_path)
+                blob_dir = self._blob_dir(sha256)
+                if not os.path.isdir(blob_dir):
+                    try:
+                        os.replace(local_path, blob_dir)
+                    except OSError:
+                        # Otro proceso publicó el mismo contenido desde otra URI
+                        pass
+            finally:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+            with self._index_lock():
+                index = self._read_index()
+                index['refs'][model_uri] = {'sha256': sha256, 'run_id': run_id, 'version': version}
+                index['blobs'][sha256] = {'bytes': size, 'last_access': time.time()}
+                index['stats']['misses'] += 1
+                index['stats']['bytes_downloaded'] += size
+                self._evict(index, keep=sha256)
+                self._write_index(index)
+
+        print(f"⬇️ Modelo descargado a la caché local: {model_uri} ({size / 1024**2:.1f} MB en "
+              f"{time.perf_counter() - start:.1f}s)")
+        return blob_dir
+
+    def load(self, model_uri: str, loader: Callable[[str], Any], run_id: Optional[str] = None, version: Optional[int] = None) -> Any:
+        """
+        Carga un modelo desde la caché.
+
+        El artefacto queda protegido con un lock compartido mientras se
+        carga, para que otro proceso no lo elimine a mitad de la lectura.
+
+        Args:
+            model_uri: URI inmutable del modelo
+            loader: Función que carga el modelo desde un directorio local
+            run_id: Run del modelo (informativo)
+            version: Versión registrada (informativa)
+
+        Returns:
+            Modelo cargado
+        """
+        for _ in range(2):
+            path = self.fetch(model_uri, run_id=run_id, version=version)
+            with file_lock(self._lock_path(os.path.basename(path)), shared=True):
+                # Puede haberse eliminado entre fetch y el lock: se vuelve a pedir
+                if os.path.isdir(path):
+                    return loader(path)
+        raise Exception(f"El artefacto de {model_uri} se eliminó de la caché durante la carga")
+
+    # ------------------------------------------------------------------
+    # Mantenimiento
+    # ------------------------------------------------------------------
+
+    def _evict(self, index: dict, keep: Optional[str] = None) -> int:
+        """
+        Elimina artefactos por antigüedad de uso hasta respetar max_bytes (con el índice bloqueado).
+
+        Los artefactos que otro proceso está cargando se saltean.
+
+        Returns:
+            Número de artefactos eliminados
+        """
+        blobs = index['blobs']
+        total = sum(blob['bytes'] for blob in blobs.values())
+        removed = 0
+        for sha256, blob in sorted(blobs.items(), key=lambda item: item[1]['last_access']):
+            if total <= self.max_bytes:
+                break
+            if sha256 == keep:
+                continue
+            with file_lock(self._lock_path(sha256), blocking=False) as acquired:
+                if not acquired:
+                    continue
+                shutil.rmtree(self._blob_dir(sha256), ignore_errors=True)
+            del blobs[sha256]
+            total -= blob['bytes']
+            removed += 1
+
+        if removed:
+            index['refs'] = {uri: ref for uri, ref in index['refs'].items() if ref['sha256'] in blobs}
+            print(f"🧹 Caché de modelos: {removed} artefactos eliminados ({total / 1024**2:.1f} MB en uso)")
+        return removed
+
+    def evict(self) -> int:
+        """Elimina artefactos usados hace más tiempo hasta respetar max_bytes."""
+        with self._index_lock():
+            index = self._read_index()
+            removed = self._evict(index)
+            self._write_index(index)
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Contadores de la caché compartidos entre procesos.
+
+        Returns:
+            Diccionario con hits, misses, bytes_saved, bytes_downloaded,
+            entries y total_bytes
+        """
+        index = self._read_index()
+        return {
+            **index['stats'],
+            'entries': len(index['blobs']),
+            'total_bytes': sum(blob['bytes'] for blob in index['blobs'].values())
+        }
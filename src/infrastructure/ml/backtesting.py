@@ -0,0 +1,299 @@
+"""
+Backtesting con origen móvil por año (List Year o año de Date Recorded).
+
+Para cada año Y el modelo se entrena con las filas de los años anteriores
+y se evalúa con las de Y. Las features se preprocesan una sola vez (con la
+caché de features) y se escriben ordenadas por año en un FeatureStore
+compartido por memory-mapping: el train de cada fold es un prefijo de ese
+almacén y el test, el bloque contiguo del año.
+
+Estrategias:
+- incremental: como el refresh de modelos, el bosque de Y se obtiene
+  sumando al bosque de Y - 1 árboles nuevos entrenados solo con las filas
+  de Y - 1 (proporcionales a su cantidad). Cada bloque de árboles depende
+  solo de sus filas, así que todos los bloques se entrenan en paralelo y
+  cada fold combina los suyos sin volver a entrenar desde cero.
+- full: cada fold entrena un bosque nuevo con todo su prefijo; los folds
+  son independientes y también corren en paralelo.
+"""
+
+import math
+import os
+import time
+import joblib
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from sklearn.ensemble import RandomForestRegressor
+from infrastructure.ml.compute_budget import ComputeBudget
+from infrastructure.ml.hyperparameter_search import SharedTrainingData
+from infrastructure.ml.metrics import compute_regression_metrics
+from infrastructure.ml.warm_start import merge_forests
+
+YEAR_COLUMNS = ('List Year', 'Date Recorded')
+STRATEGIES = ('incremental', 'full')
+DEFAULT_MIN_TRAIN_YEARS = 3
+
+
+def row_years(values: pd.Series, year_column: str) -> np.ndarray:
+    """
+    Año de cada fila según la columna temporal.
+
+    Args:
+        values: Columna raw alineada con las features
+        year_column: 'List Year' o 'Date Recorded' (fecha MM/DD/YYYY)
+
+    Returns:
+        Array float64 con el año (NaN si falta o no se puede leer)
+    """
+    if year_column == 'Date Recorded':
+        dates = pd.to_datetime(values.astype(str), format='%m/%d/%Y', errors='coerce')
+        return dates.dt.year.to_numpy(dtype=np.float64, na_value=np.nan)
+    if year_column == 'List Year':
+        return pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    raise ValueError(f"Columna temporal no soportada: {year_column}. Disponibles: {', '.join(YEAR_COLUMNS)}")
+
+
+def year_ranges(sorted_years: np.ndarray) -> List[Tuple[int, int, int]]:
+    """
+    Rangos de filas de cada año en un array de años ordenado.
+
+    Returns:
+        Lista de (año, primera fila, fila final exclusiva)
+    """
+    years, starts = np.unique(sorted_years, return_index=True)
+    stops = list(starts[1:]) + [len(sorted_years)]
+    return [(int(year), int(start), int(stop)) for year, start, stop in zip(years, starts, stops)]
+
+
+def plan_backtest(
+    ranges: Sequence[Tuple[int, int, int]],
+    n_estimators: int,
+    random_state: int,
+    strategy: str = 'incremental',
+    min_train_years: int = DEFAULT_MIN_TRAIN_YEARS,
+    first_year: Optional[int] = None
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Arma los bloques de árboles a entrenar y los folds que los combinan.
+
+    Args:
+        ranges: Rangos de filas por año (year_ranges)
+        n_estimators: Árboles del bosque base (y de cada bosque en 'full')
+        random_state: Semilla base
+        strategy: 'incremental' o 'full'
+        min_train_years: Años de historia mínimos antes del primer año evaluado
+        first_year: Primer año a evaluar (None = el que deja min_train_years de historia)
+
+    Returns:
+        Tuple con (bloques: block, start, stop, n_estimators, random_state;
+        folds: year, start, stop y los bloques que combina)
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Estrategia desconocida: {strategy}. Disponibles: {', '.join(STRATEGIES)}")
+    eval_positions = [
+        i for i, (year, _, _) in enumerate(ranges)
+        if i >= max(min_train_years, 1) and (first_year is None or year >= first_year)
+    ]
+    if not eval_positions:
+        raise Exception(f"No hay años para evaluar: {len(ranges)} años en los datos y "
+                        f"{min_train_years} años mínimos de historia")
+
+    blocks: List[Dict[str, Any]] = []
+    folds: List[Dict[str, Any]] = []
+    for k, position in enumerate(eval_positions):
+        year, start, stop = ranges[position]
+        if strategy == 'full':
+            blocks.append({'block': len(blocks), 'start': 0, 'stop': start,
+                           'n_estimators': n_estimators, 'random_state': random_state})
+            folds.append({'year': year, 'start': start, 'stop': stop, 'blocks': [len(blocks) - 1]})
+            continue
+
+        if k == 0:
+            blocks.append({'block': 0, 'start': 0, 'stop': start,
+                           'n_estimators': n_estimators, 'random_state': random_state})
+        else:
+            # Árboles nuevos con las filas del año anterior, proporcionales a las de la base
+            _, previous_start, previous_stop = ranges[eval_positions[k - 1]]
+            base_rows = blocks[0]['stop']
+            n_trees = max(math.ceil(n_estimators * (previous_stop - previous_start) / base_rows), 1)
+            trees_before = sum(block['n_estimators'] for block in blocks)
+            blocks.append({'block': k, 'start': previous_start, 'stop': previous_stop,
+                           'n_estimators': n_trees, 'random_state': random_state + trees_before})
+        folds.append({'year': year, 'start': start, 'stop': stop, 'blocks': list(range(k + 1))})
+    return blocks, folds
+
+
+def _fit_block(
+    store_dir: str,
+    n_rows: int,
+    block: Dict[str, Any],
+    params: Dict[str, Any],
+    n_jobs: int,
+    max_threads: Optional[int],
+    model_path: str
+) -> Dict[str, Any]:
+    """
+    Entrena un bloque de árboles con un rango de filas (se ejecuta en un proceso del pool).
+
+    Returns:
+        Diccionario con block, model_path, fit_seconds y error
+    """
+    result = {'block': block['block'], 'model_path': None, 'fit_seconds': None, 'error': None}
+    try:
+        X, y, _, _ = SharedTrainingData.open_store(store_dir, n_rows)
+        budget = ComputeBudget(n_jobs=n_jobs, max_threads=max_threads)
+        model = RandomForestRegressor(**params, n_estimators=block['n_estimators'],
+                                      random_state=block['random_state'], n_jobs=budget.cores)
+        start = time.perf_counter()
+        with budget.limits():
+            model.fit(X[block['start']:block['stop']], y[block['start']:block['stop']])
+        result['fit_seconds'] = time.perf_counter() - start
+        joblib.dump(model, model_path)
+        result['model_path'] = model_path
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+
+def _evaluate_fold(
+    store_dir: str,
+    n_rows: int,
+    fold: Dict[str, Any],
+    model_paths: List[str],
+    max_trees: Optional[int],
+    n_jobs: int,
+    max_threads: Optional[int]
+) -> Dict[str, Any]:
+    """
+    Combina los bloques de un fold y lo evalúa con las filas de su año (en un proceso del pool).
+
+    Returns:
+        Diccionario con year, train_rows, test_rows, n_estimators,
+        dropped_trees, metrics y error
+    """
+    result = {'year': fold['year'], 'train_rows': fold['start'], 'test_rows': fold['stop'] - fold['start'],
+              'n_estimators': None, 'dropped_trees': 0, 'metrics': None, 'error': None}
+    try:
+        X, y, _, _ = SharedTrainingData.open_store(store_dir, n_rows)
+        model = joblib.load(model_paths[0])
+        for path in model_paths[1:]:
+            model, dropped = merge_forests(model, joblib.load(path), max_trees=max_trees)
+            result['dropped_trees'] += dropped
+        budget = ComputeBudget(n_jobs=n_jobs, max_threads=max_threads)
+        model.set_params(n_jobs=budget.cores)
+        with budget.limits():
+            y_pred = model.predict(X[fold['start']:fold['stop']])
+        result['n_estimators'] = len(model.estimators_)
+        result['metrics'] = compute_regression_metrics(y[fold['start']:fold['stop']], y_pred)
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+
+class Backtest:
+    """Entrena y evalúa los folds de un backtesting por año en paralelo."""
+
+    def __init__(self, budget: ComputeBudget, max_trees: Optional[int] = None):
+        """
+        Args:
+            budget: Presupuesto de cómputo total
+            max_trees: Tamaño máximo de los bosques incrementales (se
+                descartan los árboles más antiguos; None = sin límite)
+        """
+        self.budget = budget
+        self.max_trees = max_trees
+
+    def _map(self, function: Callable[..., Dict[str, Any]], tasks: List[tuple], jobs_arg: int) -> List[Dict[str, Any]]:
+        """
+        Ejecuta function(*args) para cada tarea repartiendo los núcleos.
+
+        Args:
+            function: Función de nivel de módulo (se envía al pool)
+            tasks: Argumentos de cada tarea, sin los núcleos
+            jobs_arg: Posición en la que se insertan los núcleos por tarea
+
+        Returns:
+            Resultados en el orden de tasks
+        """
+        workers = max(min(len(tasks), self.budget.cores), 1)
+        task_jobs = max(self.budget.cores // workers, 1)
+        args = [task[:jobs_arg] + (task_jobs,) + task[jobs_arg:] for task in tasks]
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(tasks)
+        if workers == 1:
+            return [function(*task_args) for task_args in args]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(function, *task_args): position for position, task_args in enumerate(args)}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        return results
+
+    def run(
+        self,
+        data: SharedTrainingData,
+        blocks: List[Dict[str, Any]],
+        folds: List[Dict[str, Any]],
+        params: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """
+        Entrena los bloques y evalúa cada fold.
+
+        Args:
+            data: Features ordenadas por año (todas las filas como train)
+            blocks: Bloques de árboles (plan_backtest)
+            folds: Folds por año (plan_backtest)
+            params: Hiperparámetros del RandomForest salvo n_estimators y random_state
+
+        Returns:
+            Un resultado por año, con refit_seconds (entrenamiento del
+            bloque más reciente del fold)
+        """
+        model_dir = os.path.join(data.root_dir, "backtest_models")
+        os.makedirs(model_dir, exist_ok=True)
+
+        print(f"🏗️ Entrenando {len(blocks)} bloques de árboles para {len(folds)} años "
+              f"({self.budget.cores} núcleos)")
+        fitted = self._map(_fit_block, [
+            (data.store_dir, data.n_train, block, params)
+            + (self.budget.max_threads, os.path.join(model_dir, f"block_{block['block']}.joblib"))
+            for block in blocks
+        ], jobs_arg=4)
+        for block, result in zip(blocks, fitted):
+            if result['error']:
+                raise Exception(f"Error entrenando el bloque de filas {block['start']}-{block['stop']}: {result['error']}")
+
+        results = self._map(_evaluate_fold, [
+            (data.store_dir, data.n_train, fold, [fitted[i]['model_path'] for i in fold['blocks']], self.max_trees)
+            + (self.budget.max_threads,)
+            for fold in folds
+        ], jobs_arg=5)
+
+        for fold, result in zip(folds, results):
+            result['refit_seconds'] = fitted[fold['blocks'][-1]]['fit_seconds']
+            if result['error']:
+                print(f"❌ Error en el año {result['year']}: {result['error']}")
+            else:
+                metrics = result['metrics']
+                print(f"📅 {result['year']}: {result['train_rows']} filas de train, {result['test_rows']} de test, "
+                      f"{result['n_estimators']} árboles: R² = {metrics['r2_score']:.4f}, RMSE = ${metrics['rmse']:,.0f}")
+        return results
+
+
+def backtest_table(results: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Tabla de métricas por año.
+
+    Returns:
+        DataFrame con year, train_rows, test_rows, n_estimators,
+        dropped_trees, refit_seconds, las métricas y error
+    """
+    rows = []
+    for result in results:
+        row = {key: result.get(key) for key in
+               ('year', 'train_rows', 'test_rows', 'n_estimators', 'dropped_trees', 'refit_seconds')}
+        row.update(result['metrics'] or {})
+        row['error'] = result['error']
+        rows.append(row)
+    return pd.DataFrame(rows)
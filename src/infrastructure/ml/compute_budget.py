@@ -0,0 +1,55 @@
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional
+from threadpoolctl import threadpool_limits
+
+@dataclass
+class ComputeBudget:
+    """
+    Presupuesto de cómputo del entrenamiento.
+
+    n_jobs son los núcleos que usa el estimador (hilos de joblib en el
+    RandomForest); max_threads limita además los pools de BLAS y OpenMP
+    mientras el presupuesto está activo, para que n_jobs × hilos nativos no
+    supere los núcleos asignados al nodo.
+    """
+
+    n_jobs: Optional[int] = None        # None = 1 núcleo; -1 = todos
+    max_threads: Optional[int] = None   # None = sin límite para BLAS/OpenMP
+
+    @classmethod
+    def from_env(cls) -> 'ComputeBudget':
+        """Crea el presupuesto desde TRAIN_N_JOBS y TRAIN_MAX_THREADS."""
+        n_jobs = os.getenv('TRAIN_N_JOBS')
+        max_threads = os.getenv('TRAIN_MAX_THREADS')
+        return cls(
+            n_jobs=int(n_jobs) if n_jobs else None,
+            max_threads=int(max_threads) if max_threads else None
+        )
+
+    @property
+    def cores(self) -> int:
+        """Número efectivo de núcleos (resuelve None y valores negativos como joblib)."""
+        cpu_count = os.cpu_count() or 1
+        if self.n_jobs is None or self.n_jobs == 0:
+            return 1
+        if self.n_jobs < 0:
+            return max(cpu_count + 1 + self.n_jobs, 1)
+        return self.n_jobs
+
+    @contextmanager
+    def limits(self) -> Iterator[None]:
+        """Aplica el límite de hilos de BLAS/OpenMP durante el bloque."""
+        if self.max_threads is None:
+            yield
+            return
+        with threadpool_limits(limits=self.max_threads):
+            yield
+
+    def as_params(self) -> Dict[str, Any]:
+        """Parámetros a registrar en MLflow."""
+        return {
+            'n_jobs': self.cores,
+            'max_threads': self.max_threads if self.max_threads is not None else 'unlimited'
+        }
@@ -0,0 +1,179 @@
+"""
+Validación cruzada K-fold en paralelo.
+
+X e y se escriben una sola vez en un FeatureStore temporal
+(SharedTrainingData, con todas las filas como train) y cada fold corre en
+un proceso del pool abriéndolos con memory-mapping. Los índices de cada
+fold se recalculan dentro del proceso a partir de la semilla, así por el
+pipe solo viajan los hiperparámetros y las métricas. Con W procesos cada
+fold recibe cores // W núcleos, como los trials de la búsqueda de
+hiperparámetros, y el tiempo total escala con los núcleos disponibles.
+
+Con un backend de categóricas nativas el almacén lleva los códigos de todas
+las categorías y cada fold ajusta su propio encoder solo con sus filas de
+train: las categorías que solo aparecen en el test del fold llegan al
+modelo como faltantes, igual que una categoría nueva en producción.
+"""
+
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+from sklearn.model_selection import KFold
+from infrastructure.data.feature_encoder import PropertyFeatureEncoder
+from infrastructure.ml.compute_budget import ComputeBudget
+from infrastructure.ml.estimator_backends import get_backend
+from infrastructure.ml.hyperparameter_search import SharedTrainingData
+from infrastructure.ml.metrics import compute_regression_metrics
+
+DEFAULT_N_SPLITS = 5
+
+
+def fold_indices(n_rows: int, n_splits: int, random_state: int, fold: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Índices de train y test de un fold (KFold barajado con semilla fija).
+
+    Args:
+        n_rows: Filas totales
+        n_splits: Número de folds
+        random_state: Semilla del barajado
+        fold: Fold pedido (0 a n_splits - 1)
+
+    Returns:
+        Tuple con (índices de train, índices de test)
+    """
+    splitter = KFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    for i, (train_index, test_index) in enumerate(splitter.split(np.empty((n_rows, 0)))):
+        if i == fold:
+            return train_index, test_index
+    raise ValueError(f"Fold {fold} fuera de rango para {n_splits} folds")
+
+
+def _run_fold(
+    store_dir: str,
+    n_rows: int,
+    fold: int,
+    n_splits: int,
+    backend_name: str,
+    hyperparams: Dict[str, Any],
+    encoder: PropertyFeatureEncoder,
+    n_jobs: int,
+    max_threads: Optional[int]
+) -> Dict[str, Any]:
+    """
+    Entrena y evalúa un fold (se ejecuta en un proceso del pool).
+
+    Returns:
+        Diccionario con fold, metrics, fit_seconds, n_train, n_test y
+        error (None si el fold terminó bien)
+    """
+    result = {'fold': fold, 'metrics': None, 'fit_seconds': None, 'n_train': None, 'n_test': None, 'error': None}
+    try:
+        X, y, _, _ = SharedTrainingData.open_store(store_dir, n_rows)
+        train_index, test_index = fold_indices(n_rows, n_splits, hyperparams.get('random_state', 42), fold)
+        backend = get_backend(backend_name)
+        budget = ComputeBudget(n_jobs=n_jobs, max_threads=max_threads)
+        if backend.categorical_columns:
+            rows = encoder.inverse_transform(X)
+            encoder = backend.make_encoder(rows.iloc[train_index])
+            X = encoder.transform(rows)
+
+        model = backend.build(hyperparams, encoder, budget.cores)
+        start = time.perf_counter()
+        with budget.limits():
+            backend.fit(model, X[train_index], y[train_index], budget.cores)
+            y_pred = model.predict(X[test_index])
+        result['fit_seconds'] = time.perf_counter() - start
+        result['metrics'] = compute_regression_metrics(y[test_index], y_pred)
+        result['n_train'] = len(train_index)
+        result['n_test'] = len(test_index)
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+
+def aggregate_folds(folds: List[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    Media y desviación estándar de cada métrica entre los folds que terminaron bien.
+
+    Args:
+        folds: Resultados de los folds
+
+    Returns:
+        Diccionario con la media de cada métrica (mismo nombre) y su
+        desviación estándar (sufijo _std)
+    """
+    completed = [fold['metrics'] for fold in folds if not fold['error']]
+    if not completed:
+        raise Exception("Todos los folds fallaron")
+    summary = {}
+    for key in completed[0]:
+        values = np.array([metrics[key] for metrics in completed], dtype=np.float64)
+        summary[key] = float(values.mean())
+        summary[f"{key}_std"] = float(values.std())
+    return summary
+
+
+class CrossValidation:
+    """Ejecuta los folds de una validación cruzada en paralelo sobre datos compartidos."""
+
+    def __init__(self, budget: ComputeBudget, n_splits: int = DEFAULT_N_SPLITS):
+        """
+        Args:
+            budget: Presupuesto de cómputo total de la validación
+            n_splits: Número de folds
+        """
+        if n_splits < 2:
+            raise ValueError(f"La validación cruzada necesita al menos 2 folds, no {n_splits}")
+        self.budget = budget
+        self.n_splits = n_splits
+
+    def run(
+        self,
+        data: SharedTrainingData,
+        backend_name: str,
+        hyperparams: Dict[str, Any],
+        encoder: PropertyFeatureEncoder
+    ) -> List[Dict[str, Any]]:
+        """
+        Entrena y evalúa un modelo por fold.
+
+        Args:
+            data: Datos compartidos (todas las filas como train)
+            backend_name: Backend del estimador
+            hyperparams: Hiperparámetros del modelo
+            encoder: Encoder que produjo las features; con categóricas nativas
+                debe conservarlas todas (sin tope), cada fold ajusta el suyo
+
+        Returns:
+            Resultados de los folds, en orden
+        """
+        workers = max(min(self.n_splits, self.budget.cores), 1)
+        fold_jobs = max(self.budget.cores // workers, 1)
+        print(f"🔁 {self.n_splits} folds en {workers} procesos ({fold_jobs} núcleos por fold, "
+              f"{data.n_train} filas compartidas)")
+
+        def fold_args(fold: int) -> tuple:
+            return (data.store_dir, data.n_train, fold, self.n_splits, backend_name, hyperparams, encoder,
+                    fold_jobs, self.budget.max_threads)
+
+        results: List[Optional[Dict[str, Any]]] = [None] * self.n_splits
+        if workers == 1:
+            for fold in range(self.n_splits):
+                results[fold] = self._report(_run_fold(*fold_args(fold)))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(_run_fold, *fold_args(fold)): fold for fold in range(self.n_splits)}
+                for future in as_completed(futures):
+                    results[futures[future]] = self._report(future.result())
+        return results
+
+    @staticmethod
+    def _report(result: Dict[str, Any]) -> Dict[str, Any]:
+        if result['error']:
+            print(f"❌ Error en fold {result['fold'] + 1}: {result['error']}")
+        else:
+            metrics = result['metrics']
+            print(f"📂 Fold {result['fold'] + 1}: R² = {metrics['r2_score']:.4f}, RMSE = ${metrics['rmse']:,.0f}, "
+                  f"MAE = ${metrics['mae']:,.0f} ({result['fit_seconds']:.1f}s)")
+        return result
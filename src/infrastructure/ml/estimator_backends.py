@@ -0,0 +1,135 @@
+"""
+Backends de estimador seleccionables para el entrenamiento.
+
+Cada backend define su encoder (la codificación que viaja con el modelo en
+el artefacto), cómo construir y ajustar el estimador y qué parámetros
+ajustados registrar. 'random_forest' es el RandomForestRegressor original
+sobre las columnas dummy de Property Type; 'hist_gradient_boosting' usa
+HistGradientBoostingRegressor con manejo nativo de Property Type,
+Residential Type y Town y early stopping sobre una parte de validación del
+conjunto de entrenamiento.
+"""
+
+import pandas as pd
+from typing import Any, Dict, Optional, Tuple
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from threadpoolctl import threadpool_limits
+from infrastructure.data.feature_encoder import CATEGORICAL_COLUMNS, CategoricalPropertyEncoder, PropertyFeatureEncoder
+
+DEFAULT_BACKEND = 'random_forest'
+
+
+class EstimatorBackend:
+    """Backend base: RandomForestRegressor sobre las features dummy."""
+
+    name = DEFAULT_BACKEND
+
+    # Columnas raw que el backend necesita además de las features cacheadas
+    categorical_columns: Tuple[str, ...] = ()
+
+    def make_encoder(self, rows: Optional[pd.DataFrame] = None) -> PropertyFeatureEncoder:
+        """
+        Crea el encoder ajustado del backend.
+
+        Args:
+            rows: Filas raw de entrenamiento (solo si el encoder aprende categorías)
+
+        Returns:
+            Encoder ajustado
+        """
+        return PropertyFeatureEncoder().fit()
+
+    def build(self, hyperparams: Dict[str, Any], encoder: PropertyFeatureEncoder, n_jobs: int) -> Any:
+        """
+        Construye el estimador sin entrenar.
+
+        Args:
+            hyperparams: Hiperparámetros (n_estimators, max_depth, random_state, ...)
+            encoder: Encoder ajustado del backend
+            n_jobs: Núcleos del presupuesto de cómputo
+
+        Returns:
+            Estimador de scikit-learn
+        """
+        return RandomForestRegressor(
+            n_estimators=hyperparams.get('n_estimators', 100),
+            max_depth=hyperparams.get('max_depth', 5),
+            random_state=hyperparams.get('random_state', 42),
+            n_jobs=n_jobs
+        )
+
+    def fit(self, model: Any, X_train: Any, y_train: Any, n_jobs: int) -> Any:
+        """Entrena el estimador (el RandomForest reparte los árboles en n_jobs hilos de joblib)."""
+        return model.fit(X_train, y_train)
+
+    def params(self, model: Any) -> Dict[str, Any]:
+        """Parámetros propios del backend a registrar en MLflow, una vez entrenado."""
+        return {'backend': self.name}
+
+
+class HistGradientBoostingBackend(EstimatorBackend):
+    """HistGradientBoostingRegressor con categóricas nativas y early stopping."""
+
+    name = 'hist_gradient_boosting'
+    categorical_columns = CATEGORICAL_COLUMNS
+
+    DEFAULT_LEARNING_RATE = 0.1
+    DEFAULT_VALIDATION_FRACTION = 0.1
+    DEFAULT_N_ITER_NO_CHANGE = 10
+
+    def make_encoder(self, rows: Optional[pd.DataFrame] = None) -> CategoricalPropertyEncoder:
+        """Crea el encoder con códigos de categoría aprendidos de las filas de entrenamiento."""
+        return CategoricalPropertyEncoder().fit(rows)
+
+    def build(self, hyperparams: Dict[str, Any], encoder: PropertyFeatureEncoder, n_jobs: int) -> Any:
+        """
+        Construye el HistGradientBoostingRegressor.
+
+        n_estimators se usa como número máximo de iteraciones: el early
+        stopping corta antes si la pérdida de validación deja de mejorar.
+        """
+        return HistGradientBoostingRegressor(
+            max_iter=hyperparams.get('n_estimators', 100),
+            max_depth=hyperparams.get('max_depth', 5),
+            learning_rate=hyperparams.get('learning_rate', self.DEFAULT_LEARNING_RATE),
+            categorical_features=encoder.categorical_indices_,
+            early_stopping=True,
+            validation_fraction=hyperparams.get('validation_fraction', self.DEFAULT_VALIDATION_FRACTION),
+            n_iter_no_change=hyperparams.get('n_iter_no_change', self.DEFAULT_N_ITER_NO_CHANGE),
+            random_state=hyperparams.get('random_state', 42)
+        )
+
+    def fit(self, model: Any, X_train: Any, y_train: Any, n_jobs: int) -> Any:
+        """Entrena el estimador con n_jobs hilos de OpenMP (no tiene parámetro n_jobs)."""
+        with threadpool_limits(limits=n_jobs, user_api='openmp'):
+            return model.fit(X_train, y_train)
+
+    def params(self, model: Any) -> Dict[str, Any]:
+        """Registra además las iteraciones reales tras el early stopping."""
+        return {
+            'backend': self.name,
+            'learning_rate': model.learning_rate,
+            'validation_fraction': model.validation_fraction,
+            'n_iter': model.n_iter_
+        }
+
+
+BACKENDS: Dict[str, EstimatorBackend] = {
+    backend.name: backend for backend in (EstimatorBackend(), HistGradientBoostingBackend())
+}
+
+
+def get_backend(name: Optional[str] = None) -> EstimatorBackend:
+    """
+    Devuelve el backend registrado con ese nombre.
+
+    Args:
+        name: 'random_forest' o 'hist_gradient_boosting' (None = DEFAULT_BACKEND)
+
+    Returns:
+        Backend de estimador
+    """
+    name = name or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Backend desconocido: {name}. Disponibles: {', '.join(BACKENDS)}")
+    return BACKENDS[name]
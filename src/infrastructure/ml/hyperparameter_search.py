@@ -0,0 +1,332 @@
+"""
+Búsqueda de hiperparámetros en paralelo.
+
+Los datos se cargan y preprocesan una sola vez: el train y el test se
+escriben en un FeatureStore temporal y cada trial los abre con
+memory-mapping, de modo que los procesos comparten las páginas del sistema
+operativo en lugar de recibir una copia serializada de X e y.
+
+Los trials corren en un pool de procesos dentro del presupuesto de
+cómputo: con W procesos cada trial recibe cores // W núcleos para el
+RandomForest. Cada trial guarda su modelo con joblib y el proceso
+principal solo carga el mejor.
+
+Las combinaciones que solo difieren en n_estimators se entrenan como un
+único bosque que crece con warm start (ver warm_start.py): cada una es un
+checkpoint de la misma curva.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+import joblib
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sklearn.ensemble import RandomForestRegressor
+from infrastructure.data.feature_store import FeatureStore
+from infrastructure.ml.compute_budget import ComputeBudget
+from infrastructure.ml.metrics import compute_regression_metrics
+from infrastructure.ml.warm_start import group_by_n_estimators, grow_forest, truncate_forest
+
+# Configuraciones a probar (optimizadas para inmobiliaria)
+DEFAULT_SEARCH_SPACE = [
+    {'n_estimators': 100, 'max_depth': 5},    # Baseline
+    {'n_estimators': 150, 'max_depth': 7},    # Más complejo
+    {'n_estimators': 200, 'max_depth': 10},   # Aún más complejo
+    {'n_estimators': 300, 'max_depth': 8},    # Más estimadores
+    {'n_estimators': 250, 'max_depth': 12},   # Más profundo
+    {'n_estimators': 100, 'max_depth': 15},   # Muy profundo
+    {'n_estimators': 500, 'max_depth': 6},    # Muchos estimadores
+]
+
+# Métricas en las que menor es mejor
+LOWER_IS_BETTER = ('rmse', 'mae', 'mse')
+
+
+class SharedTrainingData:
+    """
+    Train y test preprocesados una vez y compartidos por memory-mapping.
+
+    Las filas de train van primero y las de test a continuación en el mismo
+    FeatureStore; open() devuelve las cuatro vistas de solo lectura.
+    """
+
+    def __init__(
+        self,
+        X_train: pd.DataFrame,
+        y_train: pd.Series,
+        X_test: pd.DataFrame,
+        y_test: pd.Series,
+        root_dir: Optional[str] = None
+    ):
+        """
+        Args:
+            X_train: Features de entrenamiento
+            y_train: Target de entrenamiento
+            X_test: Features de prueba
+            y_test: Target de prueba
+            root_dir: Directorio de trabajo (None = directorio temporal)
+        """
+        self.root_dir = root_dir or tempfile.mkdtemp(prefix="hp-search-")
+        self.store_dir = os.path.join(self.root_dir, "features")
+        self.n_train = len(X_train)
+
+        store = FeatureStore(self.store_dir)
+        store.create(list(X_train.columns), y_train.name or "target")
+        store.append(X_train.to_numpy(), y_train.to_numpy())
+        store.append(X_test.to_numpy(), y_test.to_numpy())
+
+    @staticmethod
+    def open_store(store_dir: str, n_train: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Abre train y test de un almacén compartido con memory-mapping.
+
+        Args:
+            store_dir: Directorio del FeatureStore
+            n_train: Filas de train (las primeras del almacén)
+
+        Returns:
+            Tuple con (X_train, y_train, X_test, y_test)
+        """
+        store = FeatureStore(store_dir)
+        X_train, y_train = store.load_arrays(mmap=True, stop=n_train)
+        X_test, y_test = store.load_arrays(mmap=True, start=n_train)
+        return X_train, y_train, X_test, y_test
+
+    def open(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Abre train y test con memory-mapping."""
+        return self.open_store(self.store_dir, self.n_train)
+
+    def fingerprint(self) -> str:
+        """
+        Huella de los datos (contenido de X e y y corte train/test).
+
+        Identifica "los mismos datos" en el almacén de trials: dos búsquedas
+        sobre datos con la misma huella pueden reutilizar sus resultados.
+        """
+        hasher = hashlib.sha256(f"n_train={self.n_train}".encode())
+        for name in (FeatureStore.X_FILE, FeatureStore.Y_FILE):
+            with open(os.path.join(self.store_dir, name), 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    hasher.update(block)
+        return hasher.hexdigest()
+
+    def close(self) -> None:
+        """Elimina los archivos temporales."""
+        shutil.rmtree(self.root_dir, ignore_errors=True)
+
+    def __enter__(self) -> 'SharedTrainingData':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def _run_trial(
+    store_dir: str,
+    n_train: int,
+    trial_id: int,
+    params: Dict[str, Any],
+    random_state: int,
+    n_jobs: int,
+    max_threads: Optional[int],
+    model_path: Optional[str],
+    train_rows: Optional[int] = None,
+    checkpoints: Optional[List[int]] = None
+) -> Dict[str, Any]:
+    """
+    Entrena y evalúa un trial (se ejecuta en un proceso del pool).
+
+    Args:
+        model_path: Archivo donde guardar el modelo (None = no guardarlo)
+        train_rows: Entrena solo con las primeras filas del train (ya
+            barajado por el split); None = todas
+        checkpoints: Si se indica, params no lleva n_estimators y el bosque
+            crece con warm start evaluándose en cada checkpoint (ver curve)
+
+    Returns:
+        Diccionario con trial, params, metrics, model_path, fit_seconds,
+        curve (solo con checkpoints) y error (None si el trial terminó bien)
+    """
+    result = {'trial': trial_id, 'params': params, 'metrics': None, 'model_path': None, 'fit_seconds': None, 'error': None}
+    try:
+        X_train, y_train, X_test, y_test = SharedTrainingData.open_store(store_dir, n_train)
+        if train_rows is not None:
+            X_train, y_train = X_train[:train_rows], y_train[:train_rows]
+        budget = ComputeBudget(n_jobs=n_jobs, max_threads=max_threads)
+
+        if checkpoints:
+            model = RandomForestRegressor(**params, random_state=random_state, n_jobs=budget.cores)
+            with budget.limits():
+                curve = grow_forest(model, checkpoints, X_train, y_train, X_test, y_test)
+            result['curve'] = curve
+            result['fit_seconds'] = curve[-1]['fit_seconds']
+            result['metrics'] = curve[-1]['metrics']
+        else:
+            model = RandomForestRegressor(**params, random_state=random_state, n_jobs=budget.cores)
+            start = time.perf_counter()
+            with budget.limits():
+                model.fit(X_train, y_train)
+                y_pred = model.predict(X_test)
+            result['fit_seconds'] = time.perf_counter() - start
+            result['metrics'] = compute_regression_metrics(y_test, y_pred)
+
+        if model_path is not None:
+            joblib.dump(model, model_path)
+            result['model_path'] = model_path
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+
+class HyperparameterSearch:
+    """Ejecuta trials de RandomForest en paralelo sobre datos compartidos."""
+
+    def __init__(self, budget: ComputeBudget, random_state: int = 42, metric: str = 'r2_score'):
+        """
+        Args:
+            budget: Presupuesto de cómputo total de la búsqueda
+            random_state: Semilla de todos los trials
+            metric: Métrica para elegir el mejor trial
+        """
+        self.budget = budget
+        self.random_state = random_state
+        self.metric = metric
+
+    def _is_better(self, value: float, best: float) -> bool:
+        if self.metric in LOWER_IS_BETTER:
+            return value < best
+        return value > best
+
+    def run(self, data: SharedTrainingData, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Ejecuta un trial por combinación de hiperparámetros.
+
+        Las combinaciones que comparten todo salvo n_estimators se entrenan
+        en una sola tarea con warm start y cada una toma su checkpoint de la
+        curva; su modelo es el bosque final recortado (load_trial_model).
+
+        Args:
+            data: Datos compartidos
+            candidates: Combinaciones de hiperparámetros
+
+        Returns:
+            Resultados de los trials, en el orden de candidates
+        """
+        model_dir = os.path.join(data.root_dir, "models")
+        os.makedirs(model_dir, exist_ok=True)
+
+        groups = group_by_n_estimators([{'n_estimators': 100, **params} for params in candidates])
+        tasks = []
+        for i, (base, checkpoints) in enumerate(groups, 1):
+            task = {'trial': i, 'model_path': os.path.join(model_dir, f"trial_{i}.joblib")}
+            if len(checkpoints) > 1:
+                task.update(params=base, checkpoints=checkpoints)
+            else:
+                task.update(params={**base, 'n_estimators': checkpoints[0]})
+            tasks.append(task)
+        if len(tasks) < len(candidates):
+            print(f"🌱 {len(candidates)} combinaciones en {len(tasks)} bosques con warm start")
+        results = self.execute(data, tasks)
+
+        # Un trial por combinación, tomando el checkpoint de su grupo
+        trials = []
+        for i, params in enumerate(candidates, 1):
+            params = {'n_estimators': 100, **params}
+            base = {k: v for k, v in params.items() if k != 'n_estimators'}
+            position = next(j for j, (group_base, _) in enumerate(groups) if group_base == base)
+            result = results[position]
+            trial = {'trial': i, 'params': params, 'model_path': result['model_path'], 'error': result['error'],
+                     'metrics': result['metrics'], 'fit_seconds': result['fit_seconds']}
+            if 'curve' in result:
+                curve = [point for point in result['curve'] if point['n_estimators'] <= params['n_estimators']]
+                trial.update(metrics=curve[-1]['metrics'], fit_seconds=curve[-1]['fit_seconds'], curve=curve)
+            trials.append(trial)
+        return trials
+
+    def execute(
+        self,
+        data: SharedTrainingData,
+        tasks: List[Dict[str, Any]],
+        on_result: Optional[Callable[[Dict[str, Any], Dict[str, Any]], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Ejecuta un lote de trials repartiendo los núcleos del presupuesto.
+
+        Args:
+            data: Datos compartidos
+            tasks: Trials a ejecutar: trial, params y opcionalmente
+                model_path y train_rows
+            on_result: Callback (task, resultado) a medida que termina cada
+                trial, p. ej. para persistirlo
+
+        Returns:
+            Resultados de los trials, en el orden de tasks
+        """
+        if not tasks:
+            return []
+
+        workers = max(min(len(tasks), self.budget.cores), 1)
+        trial_jobs = max(self.budget.cores // workers, 1)
+        print(f"🔍 {len(tasks)} trials en {workers} procesos ({trial_jobs} núcleos por trial, "
+              f"{data.n_train} filas de train compartidas)")
+
+        def trial_args(task: Dict[str, Any]) -> tuple:
+            return (data.store_dir, data.n_train, task['trial'], task['params'], self.random_state,
+                    trial_jobs, self.budget.max_threads, task.get('model_path'), task.get('train_rows'),
+                    task.get('checkpoints'))
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(tasks)
+
+        def collect(position: int, result: Dict[str, Any]) -> None:
+            results[position] = self._report(result, tasks[position])
+            if on_result is not None:
+                on_result(tasks[position], result)
+
+        if workers == 1:
+            for position, task in enumerate(tasks):
+                collect(position, _run_trial(*trial_args(task)))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(_run_trial, *trial_args(task)): position for position, task in enumerate(tasks)}
+                for future in as_completed(futures):
+                    collect(futures[future], future.result())
+
+        return results
+
+    def _report(self, result: Dict[str, Any], task: Dict[str, Any]) -> Dict[str, Any]:
+        if result['error']:
+            print(f"❌ Error en trial {result['trial']}: {result['error']}")
+        elif 'curve' in result:
+            for point in result['curve']:
+                metrics = point['metrics']
+                print(f"🧪 Trial {result['trial']} {result['params']} con {point['n_estimators']} árboles: "
+                      f"R² = {metrics['r2_score']:.4f}, RMSE = ${metrics['rmse']:,.0f} ({point['fit_seconds']:.1f}s acumulados)")
+        else:
+            metrics = result['metrics']
+            rows = f", {task['train_rows']} filas" if task.get('train_rows') else ""
+            print(f"🧪 Trial {result['trial']} {result['params']}{rows}: "
+                  f"R² = {metrics['r2_score']:.4f}, RMSE = ${metrics['rmse']:,.0f} ({result['fit_seconds']:.1f}s)")
+        return result
+
+    def best_trial(self, trials: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Devuelve el mejor trial según la métrica (None si todos fallaron)."""
+        best = None
+        for trial in trials:
+            if trial['error']:
+                continue
+            if best is None or self._is_better(trial['metrics'][self.metric], best['metrics'][self.metric]):
+                best = trial
+        return best
+
+    @staticmethod
+    def load_trial_model(trial: Dict[str, Any]) -> Any:
+        """Carga el modelo guardado por un trial (recortado a su n_estimators si creció con warm start)."""
+        model = joblib.load(trial['model_path'])
+        if 'curve' in trial:
+            model = truncate_forest(model, trial['params']['n_estimators'])
+        return model
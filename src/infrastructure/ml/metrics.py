@@ -0,0 +1,104 @@
+import pickle
+import time
+import numpy as np
+from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+from typing import Any, Dict
+
+def compute_regression_metrics(y_true, y_pred) -> Dict[str, float]:
+    """
+    Calcula las métricas de regresión que se registran en MLflow.
+
+    Args:
+        y_true: Valores reales
+        y_pred: Valores predichos
+
+    Returns:
+        Diccionario con rmse, mae, r2_score, mse, mean_error y std_error
+    """
+    y_true = np.asarray(y_true)
+    y_pred = np.asarray(y_pred)
+    mse = mean_squared_error(y_true, y_pred)
+    errors = y_true - y_pred
+    return {
+        'rmse': float(np.sqrt(mse)),
+        'mae': float(mean_absolute_error(y_true, y_pred)),
+        'r2_score': float(r2_score(y_true, y_pred)),
+        'mse': float(mse),
+        'mean_error': float(np.mean(errors)),
+        'std_error': float(np.std(errors))
+    }
+
+
+def measure_serving_cost(model: Any, row: Any, repeats: int = 50) -> Dict[str, float]:
+    """
+    Mide el tamaño serializado del artefacto y la latencia de predecir una fila.
+
+    Args:
+        model: Artefacto entrenado (p. ej. el pipeline encoder + modelo)
+        row: Una fila de entrada en el formato que recibe el artefacto
+        repeats: Repeticiones de la predicción (se informa la mediana)
+
+    Returns:
+        Diccionario con model_size_bytes y single_row_latency_ms
+    """
+    size = len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+    model.predict(row)  # Calentamiento (cachés, imports perezosos)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(row)
+        timings.append(time.perf_counter() - start)
+    return {
+        'model_size_bytes': float(size),
+        'single_row_latency_ms': float(np.median(timings) * 1000)
+    }
+
+
+class RunningRegressionMetrics:
+    """
+    Acumulador de las métricas de compute_regression_metrics por lotes.
+
+    Guarda solo sumas (de errores, errores al cuadrado, |errores|, y e y²),
+    así el entrenamiento out-of-core evalúa el conjunto de prueba chunk a
+    chunk sin tenerlo completo en memoria.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.sum_error = 0.0
+        self.sum_squared_error = 0.0
+        self.sum_abs_error = 0.0
+        self.sum_y = 0.0
+        self.sum_y_squared = 0.0
+
+    def update(self, y_true, y_pred) -> None:
+        """Agrega un lote de valores reales y predichos."""
+        y_true = np.asarray(y_true, dtype=np.float64)
+        errors = y_true - np.asarray(y_pred, dtype=np.float64)
+        self.n += len(y_true)
+        self.sum_error += float(errors.sum())
+        self.sum_squared_error += float(np.dot(errors, errors))
+        self.sum_abs_error += float(np.abs(errors).sum())
+        self.sum_y += float(y_true.sum())
+        self.sum_y_squared += float(np.dot(y_true, y_true))
+
+    def result(self) -> Dict[str, float]:
+        """
+        Métricas acumuladas.
+
+        Returns:
+            Diccionario con rmse, mae, r2_score, mse, mean_error y std_error
+        """
+        if self.n == 0:
+            raise ValueError("No hay valores acumulados para calcular métricas")
+        mse = self.sum_squared_error / self.n
+        mean_error = self.sum_error / self.n
+        total_sum_squares = self.sum_y_squared - self.sum_y ** 2 / self.n
+        return {
+            'rmse': float(np.sqrt(mse)),
+            'mae': self.sum_abs_error / self.n,
+            'r2_score': float(1 - self.sum_squared_error / total_sum_squares) if total_sum_squares > 0 else 0.0,
+            'mse': mse,
+            'mean_error': mean_error,
+            'std_error': float(np.sqrt(max(mse - mean_error ** 2, 0.0)))
+        }
@@ -1,14 +1,33 @@
 import mlflow
 import mlflow.sklearn
-from typing import Any, Dict
-from domain.repositories.model_repository import ModelRepository
+import pandas as pd
+from typing import Any, Dict, List, Optional
+from domain.repositories.model_repository import BacktestRepository, ModelRepository, ModelRunRepository, SearchRepository
+from infrastructure.ml.artifact_cache import ModelArtifactCache, is_immutable_uri
+from infrastructure.ml.model_index import DEFAULT_INDEX_TTL_SECONDS, ModelVersionIndex
 
-class MLflowModelRepository(ModelRepository):
+REGISTERED_MODEL_NAME = "Proyec_Inmobiliario_Model"
+
+class MLflowModelRepository(ModelRepository, ModelRunRepository, SearchRepository, BacktestRepository):
     """Implementación del repositorio de modelos usando MLflow."""
     
-    def __init__(self):
-        """Inicializa el repositorio MLflow."""
+    def __init__(
+        self,
+        index_ttl_seconds: float = DEFAULT_INDEX_TTL_SECONDS,
+        artifact_cache: Optional[ModelArtifactCache] = None
+    ):
+        """
+        Inicializa el repositorio MLflow.
+        
+        Args:
+            index_ttl_seconds: Segundos que se reutiliza el índice de versiones
+                registradas antes de consultar al servidor por versiones nuevas
+            artifact_cache: Caché local de artefactos compartida entre procesos
+                (None = descargar el artefacto en cada carga)
+        """
         self.client = mlflow.tracking.MlflowClient()
+        self.artifact_cache = artifact_cache
+        self.index = ModelVersionIndex(self.client, REGISTERED_MODEL_NAME, ttl_seconds=index_ttl_seconds)
     
     def set_experiment(self, experiment_name: str) -> None:
         """
@@ -27,7 +46,10 @@ class MLflowModelRepository(ModelRepository):
         metrics: Dict[str, float],
         input_example: Any = None,
         signature: Any = None,
-        registered_model_name: str = "Proyec_Inmobiliario_Model"
+        registered_model_name: str = "Proyec_Inmobiliario_Model",
+        curve: Optional[List[Dict[str, Any]]] = None,
+        tags: Optional[Dict[str, str]] = None,
+        folds: Optional[List[Dict[str, Any]]] = None
     ) -> str:
         """
         Guarda un modelo entrenado con sus parámetros y métricas.
@@ -39,12 +61,20 @@ class MLflowModelRepository(ModelRepository):
             input_example: Ejemplo de entrada
             signature: Firma del modelo
             registered_model_name: Nombre en el registry
+            curve: Checkpoints de n_estimators (ver warm_start.grow_forest),
+                registrados como métricas por paso
+            tags: Tags del run (p. ej. el linaje de un modelo refrescado)
+            folds: Resultados de una validación cruzada, registrados como
+                métricas por paso (step = fold)
             
         Returns:
             URI del modelo guardado
         """
         
         with mlflow.start_run() as run:
+            if tags:
+                mlflow.set_tags(tags)
+            
             # Log parámetros
             for key, value in params.items():
                 mlflow.log_param(key, value)
@@ -52,6 +82,10 @@ class MLflowModelRepository(ModelRepository):
             # Log métricas
             for key, value in metrics.items():
                 mlflow.log_metric(key, value)
+            if curve:
+                self._log_curve(curve)
+            if folds:
+                self._log_folds(folds)
             
             # Log modelo
             model_info = mlflow.sklearn.log_model(
@@ -62,27 +96,240 @@ class MLflowModelRepository(ModelRepository):
                 registered_model_name=registered_model_name
             )
             
+            if registered_model_name:
+                self.index.invalidate()
+            
             print(f"Modelo guardado con RMSE: {metrics.get('rmse', 'N/A'):.2f}")
             print(f"Run ID: {run.info.run_id}")
             
             return model_info.model_uri
     
-    def load_model(self, model_uri: str) -> Any:
+    def save_search(
+        self,
+        model: Any,
+        search_params: Dict[str, Any],
+        trials: List[Dict[str, Any]],
+        best_params: Dict[str, Any],
+        metrics: Dict[str, float],
+        input_example: Any = None,
+        signature: Any = None,
+        registered_model_name: str = "Proyec_Inmobiliario_Model"
+    ) -> str:
+        """
+        Guarda una búsqueda de hiperparámetros bajo un run padre.
+        
+        Cada trial se registra como run anidado con sus parámetros y
+        métricas; el run padre guarda los parámetros de la búsqueda, los
+        del mejor trial, sus métricas y el modelo registrado.
+        
+        Args:
+            model: Mejor modelo entrenado
+            search_params: Parámetros de la búsqueda (estrategia, presupuesto, datos)
+            trials: Resultados de los trials
+            best_params: Hiperparámetros del mejor trial
+            metrics: Métricas del mejor trial
+            input_example: Ejemplo de entrada
+            signature: Firma del modelo
+            registered_model_name: Nombre en el registry
+            
+        Returns:
+            URI del modelo guardado
+        """
+        
+        with mlflow.start_run(run_name="hyperparameter_search") as run:
+            for key, value in search_params.items():
+                mlflow.log_param(key, value)
+            
+            # Un run anidado por trial
+            for trial in trials:
+                with mlflow.start_run(run_name=f"trial_{trial['trial']}", nested=True):
+                    for key, value in trial['params'].items():
+                        mlflow.log_param(key, value)
+                    if 'fidelity' in trial:
+                        mlflow.log_param('fidelity', trial['fidelity'])
+                    if trial.get('cached'):
+                        mlflow.set_tag('cached', 'true')
+                    if trial.get('error'):
+                        mlflow.set_tag('error', trial['error'])
+                        continue
+                    for key, value in trial['metrics'].items():
+                        mlflow.log_metric(key, value)
+                    if trial.get('curve'):
+                        self._log_curve(trial['curve'])
+                    if trial.get('fit_seconds') is not None:
+                        mlflow.log_metric('fit_seconds', trial['fit_seconds'])
+            
+            # Mejor trial en el run padre (get_best_run compara estas métricas)
+            for key, value in best_params.items():
+                mlflow.log_param(key, value)
+            for key, value in metrics.items():
+                mlflow.log_metric(key, value)
+            
+            model_info = mlflow.sklearn.log_model(
+                sk_model=model,
+                artifact_path="random_forest_model",
+                input_example=input_example,
+                signature=signature,
+                registered_model_name=registered_model_name
+            )
+            
+            if registered_model_name:
+                self.index.invalidate()
+            
+            print(f"Búsqueda guardada: {len(trials)} trials, mejor RMSE: {metrics.get('rmse', 'N/A'):.2f}")
+            print(f"Run ID: {run.info.run_id}")
+            
+            return model_info.model_uri
+    
+    def save_backtest(self, params: Dict[str, Any], table: pd.DataFrame, metrics: Dict[str, float]) -> str:
+        """
+        Guarda un backtesting por año en un run sin modelo registrado.
+        
+        Las métricas de cada año se registran como métricas por paso
+        (step = año, prefijo 'year_'), la tabla completa como artefacto CSV
+        y el resumen entre años como métricas del run.
+        
+        Args:
+            params: Parámetros del backtesting (estrategia, años, hiperparámetros)
+            table: Tabla de métricas por año (backtesting.backtest_table)
+            metrics: Media y desviación estándar de cada métrica entre años
+        
+        Returns:
+            ID del run
+        """
+        
+        with mlflow.start_run(run_name="backtest") as run:
+            mlflow.set_tag('run_type', 'backtest')
+            for key, value in params.items():
+                mlflow.log_param(key, value)
+            for key, value in metrics.items():
+                mlflow.log_metric(key, value)
+            
+            for row in table.to_dict('records'):
+                year = int(row['year'])
+                if row.get('error'):
+                    mlflow.set_tag(f"year_{year}_error", row['error'])
+                    continue
+                for key in ('rmse', 'mae', 'r2_score', 'test_rows', 'refit_seconds'):
+                    if row.get(key) is not None:
+                        mlflow.log_metric(f"year_{key}", float(row[key]), step=year)
+            mlflow.log_text(table.to_csv(index=False), "backtest_by_year.csv")
+            
+            print(f"Backtesting guardado: {len(table)} años, R² medio: {metrics.get('r2_score', float('nan')):.4f}")
+            print(f"Run ID: {run.info.run_id}")
+            
+            return run.info.run_id
+    
+    @staticmethod
+    def _log_curve(curve: List[Dict[str, Any]]) -> None:
+        """
+        Registra la curva de n_estimators como métricas por paso (step = árboles).
+        
+        Se usa el prefijo 'checkpoint_' para no pisar las métricas finales
+        del run, que son las que compara get_best_run.
+        """
+        for point in curve:
+            for key, value in point['metrics'].items():
+                mlflow.log_metric(f"checkpoint_{key}", value, step=point['n_estimators'])
+            mlflow.log_metric("checkpoint_fit_seconds", point['fit_seconds'], step=point['n_estimators'])
+    
+    @staticmethod
+    def _log_folds(folds: List[Dict[str, Any]]) -> None:
+        """
+        Registra las métricas de cada fold como métricas por paso (step = fold).
+        
+        Se usa el prefijo 'fold_' para no pisar las medias del run.
+        """
+        for fold in folds:
+            if fold.get('error'):
+                mlflow.set_tag(f"fold_{fold['fold']}_error", fold['error'])
+                continue
+            for key, value in fold['metrics'].items():
+                mlflow.log_metric(f"fold_{key}", value, step=fold['fold'])
+            mlflow.log_metric("fold_fit_seconds", fold['fit_seconds'], step=fold['fold'])
+    
+    def load_model(self, model_uri: str, run_id: Optional[str] = None, version: Optional[int] = None) -> Any:
         """
         Carga un modelo desde su URI.
         
+        Con caché de artefactos, las URIs inmutables se leen de la copia
+        local y solo se descargan la primera vez; las URIs por etapa o
+        alias se resuelven siempre contra el servidor.
+        
         Args:
             model_uri: URI del modelo
+            run_id: Run del modelo (se registra en la caché)
+            version: Versión registrada (se registra en la caché)
             
         Returns:
             Modelo cargado
         """
+        if self.artifact_cache is not None and is_immutable_uri(model_uri):
+            return self.artifact_cache.load(model_uri, mlflow.sklearn.load_model, run_id=run_id, version=version)
         return mlflow.sklearn.load_model(model_uri)
     
+    def get_best_run(self, metric_name: str = "rmse") -> Dict[str, Any]:
+        """
+        Obtiene el run del mejor modelo registrado según una métrica, sin cargarlo.
+        
+        Se resuelve sobre el índice de versiones (ver model_index): sin
+        consultas al servidor mientras no venza su TTL y, al vencer, solo
+        se leen las versiones registradas desde el último refresh.
+        
+        Args:
+            metric_name: Nombre de la métrica para comparar
+            
+        Returns:
+            Diccionario con run_id, model_uri, version, params, metrics y tags del run
+        """
+        best = self.index.best(metric_name)
+        if best is None:
+            raise Exception(f"No se encontró ningún modelo con métrica {metric_name}")
+        return dict(best)
+    
+    def resolve_model(self, selector: str = "best", metric_name: str = "rmse") -> Dict[str, Any]:
+        """
+        Resuelve la versión a servir con una consulta liviana (sin cargar el modelo).
+        
+        Args:
+            selector: 'best' (mejor métrica, desde el índice de versiones),
+                'stage:<etapa>' (p. ej. stage:Production) o 'alias:<alias>'
+            metric_name: Métrica para 'best'
+            
+        Returns:
+            Diccionario con model_uri (inmutable), version y run_id
+        """
+        if selector == "best":
+            best = self.get_best_run(metric_name)
+            return {'model_uri': best['model_uri'], 'version': best['version'], 'run_id': best['run_id']}
+        
+        kind, _, value = selector.partition(':')
+        if kind == "stage" and value:
+            versions = self.client.get_latest_versions(REGISTERED_MODEL_NAME, stages=[value])
+            if not versions:
+                raise Exception(f"No hay versiones de {REGISTERED_MODEL_NAME} en la etapa {value}")
+            version = versions[0]
+        elif kind == "alias" and value:
+            version = self.client.get_model_version_by_alias(REGISTERED_MODEL_NAME, value)
+        else:
+            raise ValueError(f"Selector de modelo inválido: {selector}. Use best, stage:<etapa> o alias:<alias>")
+        
+        # URI por número de versión: inmutable, así la caché de artefactos y el pool la reutilizan
+        return {
+            'model_uri': f"models:/{REGISTERED_MODEL_NAME}/{version.version}",
+            'version': int(version.version),
+            'run_id': version.run_id
+        }
+    
     def get_best_model(self, metric_name: str = "rmse") -> Any:
         """
         Obtiene el mejor modelo basado en una métrica.
         
+        Cada llamada carga el modelo (desde la caché local de artefactos si
+        está configurada); el servicio de predicción mantiene los modelos en
+        memoria con su ModelPool. Si el artefacto ya no existe (versión
+        borrada), se reconstruye el índice y se vuelve a resolver.
+        
         Args:
             metric_name: Nombre de la métrica para comparar
             
@@ -90,29 +337,14 @@ class MLflowModelRepository(ModelRepository):
             Mejor modelo encontrado
         """
         try:
-            # Buscar todos los modelos registrados
-            registered_models = self.client.search_registered_models()
-            
-            best_model_uri = None
-            best_metric_value = float('inf') if metric_name == "rmse" else float('-inf')
-            
-            for rm in registered_models:
-                if rm.name == "Proyec_Inmobiliario_Model":
-                    for version in rm.latest_versions:
-                        run = self.client.get_run(version.run_id)
-                        metric_value = run.data.metrics.get(metric_name)
-                        
-                        if metric_value is not None:
-                            if (metric_name == "rmse" and metric_value < best_metric_value) or \
-                               (metric_name != "rmse" and metric_value > best_metric_value):
-                                best_metric_value = metric_value
-                                best_model_uri = version.source
-            
-            if best_model_uri:
-                return self.load_model(best_model_uri)
-            else:
-                raise Exception(f"No se encontró ningún modelo con métrica {metric_name}")
+            best = self.get_best_run(metric_name)
+            try:
+                return self.load_model(best['model_uri'], run_id=best['run_id'], version=best['version'])
+            except Exception:
+                self.index.refresh(full=True)
+                best = self.get_best_run(metric_name)
+                return self.load_model(best['model_uri'], run_id=best['run_id'], version=best['version'])
                 
         except Exception as e:
             print(f"Error al obtener el mejor modelo: {str(e)}")
-            raise
\ No newline at end of file
+            raise
@@ -0,0 +1,170 @@
+"""
+Índice en memoria de las versiones registradas de un modelo.
+
+Resolver el mejor modelo recorriendo el registry (un get_run por versión)
+cuesta N + 1 llamadas al servidor en cada predicción. El índice guarda,
+por versión, la URI y los datos del run (params, métricas y tags) y se
+refresca como mucho una vez por TTL y de forma incremental: las versiones
+se piden ordenadas de la más nueva a la más vieja y la paginación se corta
+en la última versión ya vista; los runs de las versiones nuevas se leen
+con un search_runs por lote. Elegir el mejor es una pasada en memoria.
+
+Las versiones borradas del registry no se detectan en el refresh
+incremental; refresh(full=True) reconstruye el índice desde cero.
+
+El índice se comparte entre hilos (predicciones, entrenamiento y el hilo
+de recarga en caliente): refresh y best se serializan con un lock, así
+nunca se recorre un índice a medio reconstruir.
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from mlflow.entities import ViewType
+from mlflow.tracking import MlflowClient
+from infrastructure.ml.hyperparameter_search import LOWER_IS_BETTER
+
+DEFAULT_INDEX_TTL_SECONDS = 60.0
+PAGE_SIZE = 1000
+RUN_BATCH_SIZE = 100
+
+
+def is_better(metric_name: str, value: float, best: float) -> bool:
+    """Las métricas de error (LOWER_IS_BETTER) se minimizan; el resto se maximiza."""
+    return value < best if metric_name in LOWER_IS_BETTER else value > best
+
+
+class ModelVersionIndex:
+    """Versiones de un modelo registrado con los datos de sus runs, cacheadas con TTL."""
+
+    def __init__(self, client: MlflowClient, model_name: str, ttl_seconds: float = DEFAULT_INDEX_TTL_SECONDS):
+        """
+        Args:
+            client: Cliente de MLflow
+            model_name: Nombre del modelo en el registry
+            ttl_seconds: Segundos durante los que se confía en el índice sin consultar al servidor
+        """
+        self.client = client
+        self.model_name = model_name
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[int, Dict[str, Any]] = {}
+        self._last_version = 0
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        """Fuerza un refresh (incremental) en la próxima consulta, p. ej. tras registrar una versión."""
+        self._expires_at = 0.0
+
+    def refresh(self, full: bool = False) -> int:
+        """
+        Incorpora las versiones registradas desde el último refresh.
+
+        Args:
+            full: Reconstruir el índice desde cero (detecta versiones borradas)
+
+        Returns:
+            Número de versiones nuevas incorporadas
+        """
+        with self._lock:
+            return self._refresh(full)
+
+    def _refresh(self, full: bool) -> int:
+        """Refresh con el lock tomado (ver refresh)."""
+        if full:
+            self._entries = {}
+            self._last_version = 0
+
+        new_versions = []
+        page_token = None
+        while True:
+            page = self.client.search_model_versions(
+                filter_string=f"name='{self.model_name}'",
+                max_results=PAGE_SIZE,
+                order_by=['version_number DESC'],
+                page_token=page_token
+            )
+            fresh = [version for version in page if int(version.version) > self._last_version]
+            new_versions.extend(fresh)
+            page_token = page.token
+            # Orden descendente: la primera versión ya vista cierra la paginación
+            if len(fresh) < len(page) or not page_token:
+                break
+
+        if new_versions:
+            runs = self._fetch_runs([version.run_id for version in new_versions])
+            for version in new_versions:
+                run = runs.get(version.run_id)
+                if run is None:  # Run borrado: la versión no tiene métricas que comparar
+                    continue
+                self._entries[int(version.version)] = {
+                    'version': int(version.version),
+                    'run_id': version.run_id,
+                    'model_uri': version.source,
+                    'params': dict(run.data.params),
+                    'metrics': dict(run.data.metrics),
+                    'tags': dict(run.data.tags)
+                }
+            self._last_version = max(self._last_version, max(int(version.version) for version in new_versions))
+
+        self._expires_at = time.monotonic() + self.ttl_seconds
+        return len(new_versions)
+
+    def _fetch_runs(self, run_ids: List[str]) -> Dict[str, Any]:
+        """Lee los runs por lotes con search_runs en lugar de un get_run por versión."""
+        experiment_ids = []
+        page_token = None
+        while True:
+            page = self.client.search_experiments(view_type=ViewType.ALL, page_token=page_token)
+            experiment_ids.extend(experiment.experiment_id for experiment in page)
+            page_token = page.token
+            if not page_token:
+                break
+
+        runs = {}
+        unique_ids = list(dict.fromkeys(run_ids))
+        for start in range(0, len(unique_ids), RUN_BATCH_SIZE):
+            batch = unique_ids[start:start + RUN_BATCH_SIZE]
+            filter_string = "attributes.run_id IN ({})".format(", ".join(f"'{run_id}'" for run_id in batch))
+            page_token = None
+            while True:
+                page = self.client.search_runs(experiment_ids, filter_string=filter_string,
+                                               run_view_type=ViewType.ALL, page_token=page_token)
+                runs.update((run.info.run_id, run) for run in page)
+                page_token = page.token
+                if not page_token:
+                    break
+        return runs
+
+    def best(self, metric_name: str = "rmse") -> Optional[Dict[str, Any]]:
+        """
+        Versión con la mejor métrica (refresca el índice si venció el TTL).
+
+        Args:
+            metric_name: Métrica a comparar
+
+        Returns:
+            Entrada del índice (version, run_id, model_uri, params, metrics,
+            tags) o None si ninguna versión tiene la métrica
+        """
+        with self._lock:
+            if time.monotonic() >= self._expires_at:
+                self._refresh(full=False)
+
+            best_entry = None
+            for entry in self._entries.values():
+                value = entry['metrics'].get(metric_name)
+                if value is None:
+                    continue
+                if best_entry is None:
+                    best_entry = entry
+                    continue
+                best_value = best_entry['metrics'][metric_name]
+                # A igual métrica gana la versión más nueva
+                if is_better(metric_name, value, best_value) or (value == best_value and entry['version'] > best_entry['version']):
+                    best_entry = entry
+            return best_entry
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,225 @@
+"""
+Pool en memoria de modelos cargados, con presupuesto de bytes.
+
+El servicio de predicción puede atender varias versiones registradas a la
+vez (la actual, una candidata, modelos por segmento). Cada versión se carga
+la primera vez que se pide y se mide su huella real en memoria; cuando la
+suma supera el presupuesto se liberan los modelos usados hace más tiempo.
+Las versiones fijadas (pin) no se liberan y se precargan en hilos en
+paralelo (la deserialización y la lectura de disco liberan el GIL en buena
+parte). Una versión que varios hilos piden a la vez se carga una sola vez.
+"""
+
+import sys
+import threading
+import time
+import types
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+import numpy as np
+from sklearn.tree._tree import NODE_DTYPE, Tree
+from infrastructure.ml.single_flight import SingleFlight
+
+DEFAULT_POOL_MAX_BYTES = 1024**3
+DEFAULT_PRELOAD_WORKERS = 4
+
+
+def model_memory_bytes(model: Any) -> int:
+    """
+    Huella en memoria de un modelo recorriendo sus atributos.
+
+    Se suman los buffers de numpy y los nodos de los árboles de
+    scikit-learn (que viven fuera de los objetos Python, en el Tree de
+    Cython) sin serializar el modelo; cada objeto se cuenta una sola vez.
+
+    Args:
+        model: Modelo o pipeline cargado
+
+    Returns:
+        Bytes aproximados que ocupa el modelo
+    """
+    seen = set()
+    stack = [model]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, np.ndarray):
+            if isinstance(obj.base, np.ndarray):
+                stack.append(obj.base)  # Vista: se cuenta el array dueño de la memoria
+                continue
+            total += obj.nbytes
+            if obj.dtype == object:
+                stack.extend(obj.ravel())
+        elif isinstance(obj, Tree):
+            total += obj.node_count * NODE_DTYPE.itemsize + obj.value.nbytes
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            total += sys.getsizeof(obj)
+            stack.extend(obj)
+        elif isinstance(obj, dict):
+            total += sys.getsizeof(obj)
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif hasattr(obj, '__dict__') and not isinstance(obj, (type, types.ModuleType)):
+            total += sys.getsizeof(obj)
+            stack.append(vars(obj))
+        else:
+            total += sys.getsizeof(obj)
+    return total
+
+
+class ModelPool:
+    """Modelos cargados por URI con desalojo LRU bajo un presupuesto de bytes."""
+
+    def __init__(
+        self,
+        loader: Callable[..., Any],
+        max_bytes: int = DEFAULT_POOL_MAX_BYTES,
+        preload_workers: int = DEFAULT_PRELOAD_WORKERS
+    ):
+        """
+        Args:
+            loader: Función que carga un modelo desde su URI (p. ej. ModelRepository.load_model);
+                recibe run_id y version como argumentos con nombre cuando se conocen
+            max_bytes: Presupuesto de memoria de los modelos no fijados y fijados
+            preload_workers: Hilos para precargar las versiones fijadas
+        """
+        self.loader = loader
+        self.max_bytes = max_bytes
+        self.preload_workers = preload_workers
+        self._models: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()  # Del menos al más reciente
+        self._pinned = set()
+        self._lock = threading.Lock()
+        self._loads = SingleFlight()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, model_uri: str, run_id: Optional[str] = None, version: Optional[int] = None) -> Any:
+        """
+        Devuelve el modelo, cargándolo si no está en el pool.
+
+        Args:
+            model_uri: URI del modelo
+            run_id: Run del modelo, si se conoce (se pasa al loader, p. ej. para la caché de artefactos)
+            version: Versión registrada, si se conoce
+
+        Returns:
+            Modelo cargado
+        """
+        with self._lock:
+            entry = self._models.get(model_uri)
+            if entry is not None:
+                self._models.move_to_end(model_uri)
+                self._stats['hits'] += 1
+                return entry['model']
+            self._stats['misses'] += 1
+
+        # La carga corre fuera del lock (otras versiones se siguen sirviendo) y
+        # una sola vez por URI: los hilos que piden la misma versión esperan esa carga
+        metadata = {name: value for name, value in (('run_id', run_id), ('version', version)) if value is not None}
+        return self._loads.do(model_uri, lambda: self._load(model_uri, metadata))
+
+    def _load(self, model_uri: str, metadata: Dict[str, Any]) -> Any:
+        """Carga un modelo y lo agrega al pool."""
+        with self._lock:
+            entry = self._models.get(model_uri)
+            if entry is not None:  # Se terminó de cargar justo antes de esta carga
+                self._models.move_to_end(model_uri)
+                return entry['model']
+
+        start = time.perf_counter()
+        model = self.loader(model_uri, **metadata)
+        size = model_memory_bytes(model)
+        print(f"📦 Modelo en el pool: {model_uri} ({size / 1024**2:.1f} MB, {time.perf_counter() - start:.1f}s)")
+
+        with self._lock:
+            self._models[model_uri] = {'model': model, 'bytes': size, 'loaded_at': time.time()}
+            self._evict(keep=model_uri)
+        return model
+
+    def _evict(self, keep: Optional[str] = None) -> int:
+        """Libera los modelos no fijados usados hace más tiempo hasta respetar max_bytes (con el lock tomado)."""
+        total = sum(entry['bytes'] for entry in self._models.values())
+        removed = 0
+        for model_uri in list(self._models):
+            if total <= self.max_bytes:
+                break
+            if model_uri == keep or model_uri in self._pinned:
+                continue
+            total -= self._models.pop(model_uri)['bytes']
+            removed += 1
+        self._stats['evictions'] += removed
+        if removed:
+            print(f"🧹 Pool de modelos: {removed} modelos liberados ({total / 1024**2:.1f} MB en uso)")
+        if total > self.max_bytes:
+            print(f"⚠️ Pool de modelos sobre el presupuesto: {total / 1024**2:.1f} MB de "
+                  f"{self.max_bytes / 1024**2:.1f} MB (modelos fijados o en uso)")
+        return removed
+
+    def pin(self, models: Iterable[Union[str, Dict[str, Any]]]) -> List[str]:
+        """
+        Fija versiones (no se liberan) y las precarga en paralelo.
+
+        Args:
+            models: URIs a fijar, o versiones resueltas (model_uri, run_id,
+                version; ver ModelRepository.resolve_model)
+
+        Returns:
+            URIs que no se pudieron cargar
+        """
+        targets = {}
+        for model in models:
+            target = {'model_uri': model} if isinstance(model, str) else model
+            targets.setdefault(target['model_uri'], target)
+        model_uris = list(targets)
+        with self._lock:
+            self._pinned.update(model_uris)
+        if not model_uris:
+            return []
+
+        failed = []
+        with ThreadPoolExecutor(max_workers=max(min(self.preload_workers, len(model_uris)), 1)) as executor:
+            futures = {
+                model_uri: executor.submit(self.get, model_uri, target.get('run_id'), target.get('version'))
+                for model_uri, target in targets.items()
+            }
+            for model_uri, future in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"❌ No se pudo precargar {model_uri}: {str(e)}")
+                    failed.append(model_uri)
+        return failed
+
+    def unpin(self, model_uri: str) -> None:
+        """Permite liberar una versión fijada (queda en el pool hasta que la desaloje el LRU)."""
+        with self._lock:
+            self._pinned.discard(model_uri)
+            self._evict()
+
+    def discard(self, model_uri: str) -> bool:
+        """Libera un modelo del pool aunque esté fijado. Devuelve True si estaba cargado."""
+        with self._lock:
+            self._pinned.discard(model_uri)
+            return self._models.pop(model_uri, None) is not None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Estado del pool.
+
+        Returns:
+            Diccionario con hits, misses, evictions, total_bytes, max_bytes
+            y los modelos cargados (uri, bytes, pinned), del menos al más reciente
+        """
+        with self._lock:
+            return {
+                **self._stats,
+                'total_bytes': sum(entry['bytes'] for entry in self._models.values()),
+                'max_bytes': self.max_bytes,
+                'models': [
+                    {'model_uri': model_uri, 'bytes': entry['bytes'], 'pinned': model_uri in self._pinned}
+                    for model_uri, entry in self._models.items()
+                ]
+            }
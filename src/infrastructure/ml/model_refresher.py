@@ -0,0 +1,65 @@
+"""
+Recarga en caliente del modelo que sirve el servicio de predicción.
+
+Un hilo en segundo plano consulta el registry cada cierto intervalo
+(selector 'best' sobre el índice de versiones, 'stage:<etapa>' o
+'alias:<alias>'). Si la versión que corresponde servir cambió, la carga,
+la calienta con una predicción de prueba y recién entonces la activa: la
+carga nunca ocurre en el camino de una predicción y ninguna predicción ve
+un modelo a medio cargar. Si la carga falla se sigue sirviendo la versión
+anterior y se reintenta en la próxima consulta.
+"""
+
+import threading
+from typing import Optional
+from infrastructure.ml.model_trainer import RealEstatePredictionService
+
+DEFAULT_POLL_SECONDS = 30.0
+
+
+class ModelRefresher:
+    """Consulta el registry en segundo plano y activa la nueva versión sin cortar el servicio."""
+
+    def __init__(self, prediction_service: RealEstatePredictionService, interval_seconds: float = DEFAULT_POLL_SECONDS):
+        """
+        Args:
+            prediction_service: Servicio cuyo modelo activo se mantiene al día
+            interval_seconds: Segundos entre consultas al registry
+        """
+        self.prediction_service = prediction_service
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def check(self) -> bool:
+        """
+        Consulta el registry una vez y activa la versión que corresponda.
+
+        Returns:
+            True si cambió la versión activa
+        """
+        try:
+            return self.prediction_service.activate(self.prediction_service.resolve_target())
+        except Exception as e:
+            print(f"⚠️ No se pudo actualizar el modelo activo ({self.prediction_service.active_version} sigue en uso): {str(e)}")
+            return False
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self.check()
+
+    def start(self) -> 'ModelRefresher':
+        """Inicia el hilo de consulta (daemon: no impide que el proceso termine)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="model-refresher", daemon=True)
+            self._thread.start()
+            print(f"👀 Consultando el registry cada {self.interval_seconds:g}s "
+                  f"(selector: {self.prediction_service.model_selector})")
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Detiene el hilo de consulta."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -1,31 +1,327 @@
+import json
+import math
+import os
+import threading
+import time
 import numpy as np
+import pandas as pd
 import mlflow
+from sklearn.base import clone
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
-from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score  # 👈 Agregado MAE y R²
-from typing import Dict, Any
-from domain.services.prediction_service import ModelTrainingService, PredictionService
-from domain.repositories.model_repository import DataRepository, ModelRepository
+from sklearn.pipeline import Pipeline
+from typing import Dict, Any, List, Optional, Tuple
+from domain.services.prediction_service import (
+    BacktestService, CheckpointTrainingService, CrossValidationService, HyperparameterSearchService,
+    ModelRefreshService, ModelTrainingService, PredictionService
+)
+from domain.repositories.model_repository import (
+    AlignedColumnRepository, BacktestRepository, DataRepository, IncrementalDataRepository,
+    ModelRepository, ModelRunRepository, SearchRepository
+)
 from domain.entities.property import Property
+from infrastructure.data.feature_encoder import CategoricalPropertyEncoder, PropertyFeatureEncoder
+from infrastructure.data.sampling import sample_size, sample_training_set
+from infrastructure.ml.backtesting import DEFAULT_MIN_TRAIN_YEARS, Backtest, backtest_table, plan_backtest, row_years, year_ranges
+from infrastructure.ml.compute_budget import ComputeBudget
+from infrastructure.ml.cross_validation import DEFAULT_N_SPLITS, CrossValidation, aggregate_folds
+from infrastructure.ml.estimator_backends import EstimatorBackend, get_backend
+from infrastructure.ml.adaptive_search import AdaptiveSearch
+from infrastructure.ml.hyperparameter_search import DEFAULT_SEARCH_SPACE, HyperparameterSearch, SharedTrainingData
+from infrastructure.ml.metrics import compute_regression_metrics, measure_serving_cost
+from infrastructure.ml.model_pool import ModelPool
+from infrastructure.ml.single_flight import SingleFlight
+from infrastructure.ml.trial_store import TrialStore
+from infrastructure.ml.warm_start import DEFAULT_CHECKPOINTS, grow_forest, merge_forests, truncate_forest
 
-class RealEstateModelTrainer(ModelTrainingService):
+class RealEstateModelTrainer(
+    ModelTrainingService,
+    CrossValidationService,
+    BacktestService,
+    CheckpointTrainingService,
+    ModelRefreshService,
+    HyperparameterSearchService
+):
     """Implementación del servicio de entrenamiento para modelos inmobiliarios."""
     
     def __init__(
         self, 
         data_repository: DataRepository,
-        model_repository: ModelRepository
+        model_repository: ModelRepository,
+        trial_store: Optional[TrialStore] = None
     ):
+        """
+        Args:
+            data_repository: Repositorio de datos
+            model_repository: Repositorio de modelos
+            trial_store: Almacén persistente de trials para la búsqueda
+                adaptativa (None = en memoria, sin reanudación)
+        """
         self.data_repository = data_repository
         self.model_repository = model_repository
+        self.trial_store = trial_store
+    
+    @staticmethod
+    def _require(repository: Any, capability: type, description: str) -> Any:
+        """Devuelve el repositorio si tiene la capacidad opcional pedida; si no, lanza ValueError."""
+        if not isinstance(repository, capability):
+            raise ValueError(f"{type(repository).__name__} no soporta {description}")
+        return repository
+    
+    def _data_watermark(self, file_path: str, data_filters: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Marca de agua de la fuente (None con filtros o si el repositorio no admite ingesta incremental)."""
+        if data_filters or not isinstance(self.data_repository, IncrementalDataRepository):
+            return None
+        return self.data_repository.data_watermark(file_path)
+    
+    def _load_training_features(
+        self,
+        file_path: str,
+        data_filters: Optional[Dict[str, Any]],
+        backend: Optional[EstimatorBackend]
+    ) -> Tuple[pd.DataFrame, pd.Series, PropertyFeatureEncoder, Optional[pd.DataFrame]]:
+        """
+        Carga las features completas y el encoder que debe viajar con el modelo.
+        
+        El encoder de un backend con categóricas propias aprende sus
+        categorías de todas las filas; para entrenar con un split
+        train/test o por folds ver _load_raw_features y _encode_features.
+        
+        Args:
+            file_path: Ruta al archivo de datos
+            data_filters: Filtros de partición (opcional)
+            backend: Backend del estimador (None = RandomForest)
+            
+        Returns:
+            Tuple con (X, y, encoder, columnas categóricas raw o None)
+        """
+        X, y, raw_categoricals = self._load_raw_features(file_path, data_filters, backend)
+        X, encoder = self._encode_features(X, raw_categoricals, backend)
+        return X, y, encoder, raw_categoricals
+    
+    def _load_raw_features(
+        self,
+        file_path: str,
+        data_filters: Optional[Dict[str, Any]],
+        backend: Optional[EstimatorBackend]
+    ) -> Tuple[pd.DataFrame, pd.Series, Optional[pd.DataFrame]]:
+        """
+        Carga las features cacheadas y, si el backend las usa, sus columnas categóricas raw alineadas.
+        
+        Args:
+            file_path: Ruta al archivo de datos
+            data_filters: Filtros de partición (opcional)
+            backend: Backend del estimador (None = RandomForest)
+            
+        Returns:
+            Tuple con (X, y, columnas categóricas raw o None)
+        """
+        # Cargar y preprocesar datos
+        X, y = self.data_repository.load_features(file_path, filters=data_filters)
+        
+        # El encoder que viaja con el modelo debe producir exactamente estas columnas
+        encoder = PropertyFeatureEncoder().fit()
+        if list(X.columns) != encoder.feature_names_out_:
+            raise ValueError(f"Las features {list(X.columns)} no coinciden con las del encoder {encoder.feature_names_out_}")
+        
+        # Backends con categóricas nativas: las columnas raw se leen alineadas con X
+        raw_categoricals = None
+        if backend is not None and backend.categorical_columns:
+            data_repository = self._require(self.data_repository, AlignedColumnRepository, "columnas alineadas")
+            raw_categoricals = data_repository.load_aligned_columns(
+                file_path, list(backend.categorical_columns), filters=data_filters, sources=X.attrs.get('sources')
+            )
+            if len(raw_categoricals) != len(X):
+                raise ValueError(f"Las columnas {list(backend.categorical_columns)} no están alineadas con las features "
+                                 f"({len(raw_categoricals)} vs {len(X)})")
+        
+        return X, y, raw_categoricals
+    
+    def _encode_features(
+        self,
+        X: pd.DataFrame,
+        raw_categoricals: Optional[pd.DataFrame],
+        backend: Optional[EstimatorBackend],
+        fit_positions: Optional[np.ndarray] = None,
+        all_categories: bool = False
+    ) -> Tuple[pd.DataFrame, PropertyFeatureEncoder]:
+        """
+        Crea el encoder del backend y recodifica las features con él.
+        
+        Args:
+            X: Features cacheadas (ver _load_raw_features)
+            raw_categoricals: Columnas categóricas raw alineadas con X o None
+            backend: Backend del estimador (None = RandomForest)
+            fit_positions: Posiciones de las filas de las que el encoder aprende
+                sus categorías, p. ej. las de train (None = todas)
+            all_categories: Si es True el encoder conserva todas las categorías
+                (sin el tope del backend), para recodificar después por
+                subconjunto de filas (ver cross_validation._run_fold)
+            
+        Returns:
+            Tuple con (X codificado, encoder ajustado)
+        """
+        encoder = PropertyFeatureEncoder().fit()
+        if raw_categoricals is None:
+            return X, encoder
+        
+        rows = X[list(encoder.numeric_columns)].reset_index(drop=True)
+        for column in backend.categorical_columns:
+            rows[column] = raw_categoricals[column].to_numpy()
+        fit_rows = rows if fit_positions is None else rows.iloc[fit_positions]
+        if all_categories:
+            encoder = CategoricalPropertyEncoder(categorical_columns=backend.categorical_columns, max_categories=None).fit(fit_rows)
+        else:
+            encoder = backend.make_encoder(fit_rows)
+        return pd.DataFrame(encoder.transform(rows), columns=encoder.feature_names_out_, index=X.index), encoder
+    
+    def _prepare_training_data(
+        self,
+        file_path: str,
+        options: Dict[str, Any],
+        backend: Optional[EstimatorBackend] = None
+    ) -> Dict[str, Any]:
+        """
+        Carga las features, hace el split train/test y, si se pide, muestrea el train.
+        
+        Args:
+            file_path: Ruta al archivo de datos
+            options: Opciones de datos (test_size, random_state, data_filters, muestreo)
+            backend: Backend del estimador (None = RandomForest); si usa
+                columnas categóricas propias se recodifican las features con su encoder
+            
+        Returns:
+            Diccionario con X_train, X_test, y_train, y_test, n_train_full,
+            el encoder del artefacto y los parámetros de datos a registrar en MLflow
+        """
+        random_state = options.get('random_state', 42)
+        test_size = options.get('test_size', 0.2)
+        data_filters = options.get('data_filters')
+        sampling = options.get('sampling', 'reservoir')
+        sample_rows = options.get('sample_rows')
+        sample_memory_mb = options.get('sample_memory_mb')
+        
+        # Marca de agua antes de leer: las filas que lleguen durante la carga
+        # las leerá el próximo refresh (a lo sumo se repiten, nunca se pierden)
+        watermark = self._data_watermark(file_path, data_filters)
+        
+        X, y, raw_categoricals = self._load_raw_features(file_path, data_filters, backend)
+        
+        # Ciudad de cada fila para estratificar el muestreo (si el repositorio la ofrece)
+        towns = None
+        if sampling == 'stratified' and (sample_rows or sample_memory_mb):
+            if raw_categoricals is not None and 'Town' in raw_categoricals.columns:
+                towns = raw_categoricals['Town']
+            else:
+                towns = self._load_towns(file_path, len(X), data_filters, sources=X.attrs.get('sources'))
+        
+        # Split train/test (el test conserva su tamaño completo aunque se muestree el train)
+        train_positions, test_positions = train_test_split(
+            np.arange(len(X)), test_size=test_size, random_state=random_state
+        )
+        towns_train = towns.to_numpy()[train_positions] if towns is not None else None
+        
+        # Las categorías del encoder se aprenden solo del train: el test no se filtra en él
+        X, encoder = self._encode_features(X, raw_categoricals, backend, fit_positions=train_positions)
+        X_train, X_test = X.iloc[train_positions], X.iloc[test_positions]
+        y_train, y_test = y.iloc[train_positions], y.iloc[test_positions]
+        
+        # Muestreo del conjunto de entrenamiento para datasets muy grandes
+        n_train_full = len(X_train)
+        k = sample_size(n_train_full, X.shape[1], sample_rows=sample_rows, memory_budget_mb=sample_memory_mb)
+        if k is not None:
+            X_train, y_train = sample_training_set(
+                X_train, y_train, k, method=sampling, random_state=random_state, towns=towns_train
+            )
+        
+        data_params = {}
+        if watermark is not None:
+            # Permiten refrescar el modelo con las filas agregadas después (refresh_model)
+            data_params['data_source'] = watermark['source']
+            data_params['data_watermark'] = watermark['byte_offset']
+            data_params['data_rows'] = len(X)
+            data_params['test_size'] = test_size
+        if data_filters:
+            data_params['data_filters'] = json.dumps(data_filters, sort_keys=True, default=str)
+        if k is not None:
+            data_params['sampling'] = sampling
+            data_params['sample_rows'] = len(X_train)
+            data_params['train_rows_full'] = n_train_full
+        
+        return {
+            'X_train': X_train,
+            'X_test': X_test,
+            'y_train': y_train,
+            'y_test': y_test,
+            'n_train_full': n_train_full,
+            'encoder': encoder,
+            'data_params': data_params
+        }
+    
+    def _load_towns(
+        self,
+        file_path: str,
+        n_rows: int,
+        data_filters: Optional[Dict[str, Any]],
+        sources: Optional[List[str]] = None
+    ) -> Optional[pd.Series]:
+        """Carga Town alineada con las features para estratificar (None si no está disponible)."""
+        if not isinstance(self.data_repository, AlignedColumnRepository):
+            print("ℹ️ El repositorio no ofrece Town; se estratifica por Property Type y decil de precio")
+            return None
+        try:
+            towns = self.data_repository.load_aligned_column(file_path, 'Town', filters=data_filters, sources=sources)
+        except NotImplementedError:
+            print("ℹ️ El repositorio no ofrece Town; se estratifica por Property Type y decil de precio")
+            return None
+        if len(towns) != n_rows:
+            print(f"⚠️ Town no está alineada con las features ({len(towns)} vs {n_rows}); se estratifica sin Town")
+            return None
+        return towns
+    
+    @staticmethod
+    def _build_artifact(
+        model: Any,
+        X_train: pd.DataFrame,
+        encoder: Optional[PropertyFeatureEncoder] = None
+    ) -> Tuple[Pipeline, pd.DataFrame, Any]:
+        """
+        Arma el artefacto (encoder + modelo) con su ejemplo de entrada y signature.
+        
+        Args:
+            model: Estimador entrenado sobre la matriz de features
+            X_train: Features de entrenamiento (para el ejemplo de entrada)
+            encoder: Encoder ajustado que produjo X_train (None = el de columnas dummy)
+            
+        Returns:
+            Tuple con (pipeline, input_example, signature)
+        """
+        # El artefacto se sirve fila a fila: predecir en un solo hilo evita el costo de lanzar el pool
+        if 'n_jobs' in model.get_params():
+            model.set_params(n_jobs=None)
+        
+        # Artefacto: encoder + modelo, recibe filas raw
+        if encoder is None:
+            encoder = PropertyFeatureEncoder().fit()
+        pipeline = Pipeline([('encoder', encoder), ('model', model)])
+        
+        # Crear ejemplo de entrada (filas raw) y signature
+        input_example = encoder.inverse_transform(X_train.iloc[:2].to_numpy())
+        signature = mlflow.models.infer_signature(input_example, pipeline.predict(input_example))
+        return pipeline, input_example, signature
     
     def train_model(self, file_path: str, **hyperparams) -> Dict[str, Any]:
         """
-        Entrena un modelo RandomForest con los datos especificados.
+        Entrena un modelo con el backend indicado (RandomForest por defecto).
+        
+        Además de las métricas de error se registran el tiempo de
+        entrenamiento, el tamaño serializado del artefacto y la latencia de
+        predecir una fila, para comparar backends entre runs.
         
         Args:
             file_path: Ruta al archivo de datos
-            **hyperparams: Hiperparámetros del modelo
+            **hyperparams: Hiperparámetros del modelo; backend elige el
+                estimador ('random_forest' o 'hist_gradient_boosting')
             
         Returns:
             Diccionario con información del entrenamiento
@@ -35,44 +331,47 @@ class RealEstateModelTrainer(ModelTrainingService):
         n_estimators = hyperparams.get('n_estimators', 100)
         max_depth = hyperparams.get('max_depth', 5)
         random_state = hyperparams.get('random_state', 42)
-        test_size = hyperparams.get('test_size', 0.2)
+        budget = ComputeBudget(n_jobs=hyperparams.get('n_jobs'), max_threads=hyperparams.get('max_threads'))
+        backend = get_backend(hyperparams.get('backend'))
         
-        # Cargar y preprocesar datos
-        df = self.data_repository.load_data(file_path)
-        X, y = self.data_repository.preprocess_data(df)
-        
-        # Split train/test
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=test_size, random_state=random_state
-        )
+        data = self._prepare_training_data(file_path, hyperparams, backend=backend)
+        X_train, X_test = data['X_train'], data['X_test']
+        y_train, y_test = data['y_train'], data['y_test']
         
         # Crear y entrenar modelo
-        model = RandomForestRegressor(
-            n_estimators=n_estimators,
-            max_depth=max_depth,
-            random_state=random_state
-        )
+        model = backend.build(hyperparams, data['encoder'], budget.cores)
         
-        print(f"Entrenando modelo con {n_estimators} estimadores y profundidad {max_depth}...")
-        model.fit(X_train, y_train)
+        print(f"Entrenando modelo {backend.name} con {n_estimators} estimadores y profundidad {max_depth} "
+              f"({budget.cores} núcleos)...")
+        with budget.limits():
+            start = time.perf_counter()
+            backend.fit(model, X_train.to_numpy(), y_train, budget.cores)
+            training_seconds = time.perf_counter() - start
+            
+            # Evaluar modelo (ahora incluye MAE y R²)
+            metrics = self.evaluate_model(model, X_test.to_numpy(), y_test)
         
-        # Evaluar modelo (ahora incluye MAE y R²)
-        metrics = self.evaluate_model(model, X_test, y_test)
+        pipeline, input_example, signature = self._build_artifact(model, X_train, data['encoder'])
         
-        # Preparar parámetros y signature para MLflow
+        serving_cost = measure_serving_cost(pipeline, input_example.iloc[:1])
+        metrics.update({'training_seconds': training_seconds, **serving_cost})
+        print(f"⏱️ {backend.name}: entrenamiento {training_seconds:.1f}s, "
+              f"artefacto {serving_cost['model_size_bytes'] / 1024**2:.1f} MB, "
+              f"latencia por fila {serving_cost['single_row_latency_ms']:.2f} ms")
+        
+        # Preparar parámetros para MLflow
         params = {
             'n_estimators': n_estimators,
             'max_depth': max_depth,
-            'random_state': random_state
+            'random_state': random_state,
+            **backend.params(model),
+            **budget.as_params(),
+            **data['data_params']
         }
         
-        # Crear ejemplo de entrada y signature
-        input_example = X_train.iloc[:2] if hasattr(X_train, 'iloc') else X_train[:2]
-        signature = mlflow.models.infer_signature(X_train, model.predict(X_train))
-        
         # Guardar modelo en MLflow
         model_uri = self.model_repository.save_model(
-            model=model,
+            model=pipeline,
             params=params,
             metrics=metrics,
             input_example=input_example,
@@ -86,7 +385,607 @@ class RealEstateModelTrainer(ModelTrainingService):
             'r2_score': metrics['r2_score'],          # 👈 Agregado R²
             'experiment_id': "experiment_id_placeholder",
             'run_id': "run_id_placeholder", 
-            'model': model
+            'n_train_rows': len(X_train),
+            'n_train_rows_full': data['n_train_full'],
+            'n_test_rows': len(X_test),
+            'backend': backend.name,
+            'training_seconds': training_seconds,
+            **serving_cost,
+            'model': pipeline
+        }
+    
+    def cross_validate(self, file_path: str, n_splits: int = DEFAULT_N_SPLITS, **hyperparams) -> Dict[str, Any]:
+        """
+        Evalúa los hiperparámetros con validación cruzada K-fold en paralelo.
+        
+        Los folds corren en procesos sobre X e y compartidos por
+        memory-mapping. Se registra un único run con la media y la
+        desviación estándar (sufijo _std) de cada métrica de evaluate_model,
+        las métricas de cada fold como pasos (fold_*) y el modelo
+        reentrenado con todas las filas.
+        
+        Args:
+            file_path: Ruta al archivo de datos
+            n_splits: Número de folds
+            **hyperparams: Hiperparámetros y backend del modelo, data_filters,
+                n_jobs y max_threads
+            
+        Returns:
+            Diccionario con las métricas medias, sus desviaciones y los folds
+        """
+        data_filters = hyperparams.get('data_filters')
+        random_state = hyperparams.get('random_state', 42)
+        budget = ComputeBudget(n_jobs=hyperparams.get('n_jobs'), max_threads=hyperparams.get('max_threads'))
+        backend = get_backend(hyperparams.get('backend'))
+        
+        watermark = self._data_watermark(file_path, data_filters)
+        X, y, raw_categoricals = self._load_raw_features(file_path, data_filters, backend)
+        
+        fold_params = {**hyperparams, 'random_state': random_state}
+        start = time.perf_counter()
+        # Sin test: los folds salen de todas las filas. Cada fold ajusta su
+        # encoder con su train, así las categorías de su test no se filtran
+        X_folds, fold_encoder = self._encode_features(X, raw_categoricals, backend, all_categories=True)
+        with SharedTrainingData(X_folds, y, X_folds.iloc[:0], y.iloc[:0]) as data:
+            folds = CrossValidation(budget, n_splits=n_splits).run(data, backend.name, fold_params, fold_encoder)
+        wall_seconds = time.perf_counter() - start
+        del X_folds
+        X, encoder = self._encode_features(X, raw_categoricals, backend)
+        
+        summary = aggregate_folds(folds)
+        fit_seconds = sum(fold['fit_seconds'] for fold in folds if not fold['error'])
+        print(f"📊 Validación cruzada ({n_splits} folds): R² = {summary['r2_score']:.4f} ± {summary['r2_score_std']:.4f}, "
+              f"RMSE = ${summary['rmse']:,.0f} ± ${summary['rmse_std']:,.0f}")
+        print(f"⏱️ {wall_seconds:.1f}s de reloj para {fit_seconds:.1f}s de entrenamiento "
+              f"(aceleración x{fit_seconds / wall_seconds if wall_seconds else 0:.1f})")
+        
+        # Modelo final: mismos hiperparámetros sobre todas las filas
+        model = backend.build(fold_params, encoder, budget.cores)
+        with budget.limits():
+            backend.fit(model, X.to_numpy(), y, budget.cores)
+        pipeline, input_example, signature = self._build_artifact(model, X, encoder)
+        
+        params = {
+            'n_estimators': hyperparams.get('n_estimators', 100),
+            'max_depth': hyperparams.get('max_depth', 5),
+            'random_state': random_state,
+            'cv_folds': n_splits,
+            **backend.params(model),
+            **budget.as_params()
+        }
+        if watermark is not None:
+            params.update(data_source=watermark['source'], data_watermark=watermark['byte_offset'], data_rows=len(X))
+        if data_filters:
+            params['data_filters'] = json.dumps(data_filters, sort_keys=True, default=str)
+        
+        model_uri = self.model_repository.save_model(
+            model=pipeline,
+            params=params,
+            metrics={**summary, 'cv_wall_seconds': wall_seconds, 'cv_fit_seconds': fit_seconds},
+            input_example=input_example,
+            signature=signature,
+            folds=folds
+        )
+        
+        return {
+            'model_uri': model_uri,
+            'rmse': summary['rmse'],
+            'mae': summary['mae'],
+            'r2_score': summary['r2_score'],
+            'metrics': summary,
+            'folds': folds,
+            'backend': backend.name,
+            'cv_wall_seconds': wall_seconds,
+            'experiment_id': "experiment_id_placeholder",
+            'run_id': "run_id_placeholder",
+            'model': pipeline
+        }
+    
+    def backtest(
+        self,
+        file_path: str,
+        year_column: str = 'List Year',
+        strategy: str = 'incremental',
+        min_train_years: int = DEFAULT_MIN_TRAIN_YEARS,
+        first_year: Optional[int] = None,
+        max_trees: Optional[int] = None,
+        **hyperparams
+    ) -> Dict[str, Any]:
+        """
+        Backtesting con origen móvil: para cada año entrena con los anteriores y evalúa ese año.
+        
+        Las features se cargan una vez (caché de features incluida) y se
+        comparten ordenadas por año entre los procesos. Con la estrategia
+        incremental cada año suma árboles entrenados con el año anterior al
+        bosque del fold previo, en lugar de entrenar un bosque desde cero
+        (ver infrastructure/ml/backtesting.py). Solo RandomForest.
+        
+        Args:
+            file_path: Ruta al archivo de datos
+            year_column: 'List Year' o 'Date Recorded'
+            strategy: 'incremental' o 'full' (un bosque nuevo por año)
+            min_train_years: Años de historia mínimos antes del primer año evaluado
+            first_year: Primer año a evaluar (None = según min_train_years)
+            max_trees: Tamaño máximo de los bosques incrementales (None = sin límite)
+            **hyperparams: n_estimators, max_depth, random_state, data_filters,
+                n_jobs y max_threads
+        
+        Returns:
+            Diccionario con run_id, la tabla por año y las métricas medias
+        """
+        n_estimators = hyperparams.get('n_estimators', 100)
+        max_depth = hyperparams.get('max_depth', 5)
+        random_state = hyperparams.get('random_state', 42)
+        data_filters = hyperparams.get('data_filters')
+        budget = ComputeBudget(n_jobs=hyperparams.get('n_jobs'), max_threads=hyperparams.get('max_threads'))
+        model_repository = self._require(self.model_repository, BacktestRepository, "backtesting")
+        data_repository = self._require(self.data_repository, AlignedColumnRepository, "columnas alineadas")
+        if get_backend(hyperparams.get('backend')).name != EstimatorBackend.name:
+            raise ValueError("El backtesting incremental solo soporta el backend random_forest")
+        
+        X, y, _, _ = self._load_training_features(file_path, data_filters, EstimatorBackend())
+        years = row_years(
+            data_repository.load_aligned_column(file_path, year_column, data_filters, sources=X.attrs.get('sources')),
+            year_column
+        )
+        if len(years) != len(X):
+            raise Exception(f"La columna {year_column} no está alineada con las features ({len(years)} != {len(X)})")
+        
+        # Filas ordenadas por año: el train de cada fold es un prefijo del almacén compartido
+        positions = np.flatnonzero(~np.isnan(years))
+        positions = positions[np.argsort(years[positions], kind='stable')]
+        if len(positions) < len(years):
+            print(f"ℹ️ {len(years) - len(positions)} filas sin {year_column} quedan fuera del backtesting")
+        X_sorted, y_sorted = X.iloc[positions], y.iloc[positions]
+        ranges = year_ranges(years[positions])
+        blocks, folds = plan_backtest(ranges, n_estimators, random_state, strategy=strategy,
+                                      min_train_years=min_train_years, first_year=first_year)
+        
+        start = time.perf_counter()
+        with SharedTrainingData(X_sorted, y_sorted, X_sorted.iloc[:0], y_sorted.iloc[:0]) as data:
+            results = Backtest(budget, max_trees=max_trees).run(data, blocks, folds, {'max_depth': max_depth})
+        wall_seconds = time.perf_counter() - start
+        
+        table = backtest_table(results)
+        summary = aggregate_folds(results)
+        fit_seconds = sum(result['refit_seconds'] for result in results if result['refit_seconds'] is not None)
+        print(f"📊 Backtesting {folds[0]['year']}-{folds[-1]['year']} ({strategy}): "
+              f"R² = {summary['r2_score']:.4f} ± {summary['r2_score_std']:.4f}, "
+              f"RMSE = ${summary['rmse']:,.0f} ± ${summary['rmse_std']:,.0f} ({wall_seconds:.1f}s)")
+        
+        params = {
+            'year_column': year_column,
+            'strategy': strategy,
+            'first_year': folds[0]['year'],
+            'last_year': folds[-1]['year'],
+            'min_train_years': min_train_years,
+            'n_estimators': n_estimators,
+            'max_depth': max_depth,
+            'random_state': random_state,
+            'max_trees': max_trees if max_trees is not None else 'unlimited',
+            **budget.as_params()
+        }
+        if data_filters:
+            params['data_filters'] = json.dumps(data_filters, sort_keys=True, default=str)
+        
+        run_id = model_repository.save_backtest(
+            params=params,
+            table=table,
+            metrics={**summary, 'backtest_wall_seconds': wall_seconds, 'backtest_fit_seconds': fit_seconds}
+        )
+        
+        return {
+            'run_id': run_id,
+            'year_column': year_column,
+            'strategy': strategy,
+            'table': table,
+            'metrics': summary,
+            'rmse': summary['rmse'],
+            'mae': summary['mae'],
+            'r2_score': summary['r2_score'],
+            'backtest_wall_seconds': wall_seconds
+        }
+    
+    def train_with_checkpoints(
+        self,
+        file_path: str,
+        checkpoints: Optional[List[int]] = None,
+        **hyperparams
+    ) -> Dict[str, Any]:
+        """
+        Entrena un solo bosque con warm start y lo evalúa en cada checkpoint de n_estimators.
+        
+        La curva completa cuesta lo mismo que entrenar el bosque más grande
+        una vez; cada checkpoint se registra como métrica por paso y se
+        guarda el mejor checkpoint (el bosque recortado a ese tamaño).
+        
+        Args:
+            file_path: Ruta al archivo de datos
+            checkpoints: Números de árboles a evaluar (None = DEFAULT_CHECKPOINTS)
+            **hyperparams: Hiperparámetros del modelo salvo n_estimators, y
+                las opciones de datos y cómputo de train_model
+            
+        Returns:
+            Diccionario con información del entrenamiento del mejor checkpoint y la curva
+        """
+        checkpoints = sorted(set(checkpoints or DEFAULT_CHECKPOINTS))
+        max_depth = hyperparams.get('max_depth', 5)
+        random_state = hyperparams.get('random_state', 42)
+        budget = ComputeBudget(n_jobs=hyperparams.get('n_jobs'), max_threads=hyperparams.get('max_threads'))
+        
+        data = self._prepare_training_data(file_path, hyperparams)
+        X_train, X_test = data['X_train'], data['X_test']
+        y_train, y_test = data['y_train'], data['y_test']
+        
+        model = RandomForestRegressor(max_depth=max_depth, random_state=random_state, n_jobs=budget.cores)
+        
+        print(f"🌱 Creciendo un bosque de profundidad {max_depth} hasta {checkpoints[-1]} árboles "
+              f"(checkpoints: {checkpoints}, {budget.cores} núcleos)...")
+        with budget.limits():
+            curve = grow_forest(model, checkpoints, X_train.to_numpy(), y_train.to_numpy(), X_test.to_numpy(), y_test.to_numpy())
+        
+        for point in curve:
+            print(f"   {point['n_estimators']:>5} árboles: R² = {point['metrics']['r2_score']:.4f}, "
+                  f"RMSE = ${point['metrics']['rmse']:,.0f} ({point['fit_seconds']:.1f}s acumulados)")
+        
+        best = max(curve, key=lambda point: point['metrics']['r2_score'])
+        metrics = best['metrics']
+        print(f"🏆 Mejor checkpoint: {best['n_estimators']} árboles")
+        
+        pipeline, input_example, signature = self._build_artifact(
+            truncate_forest(model, best['n_estimators']), X_train
+        )
+        
+        params = {
+            'n_estimators': best['n_estimators'],
+            'max_depth': max_depth,
+            'random_state': random_state,
+            'checkpoints': ",".join(str(n) for n in checkpoints),
+            **budget.as_params(),
+            **data['data_params']
+        }
+        model_uri = self.model_repository.save_model(
+            model=pipeline,
+            params=params,
+            metrics=metrics,
+            input_example=input_example,
+            signature=signature,
+            curve=curve
+        )
+        
+        return {
+            'model_uri': model_uri,
+            'n_estimators': best['n_estimators'],
+            'rmse': metrics['rmse'],
+            'mae': metrics['mae'],
+            'r2_score': metrics['r2_score'],
+            'curve': curve,
+            'experiment_id': "experiment_id_placeholder",
+            'run_id': "run_id_placeholder",
+            'n_train_rows': len(X_train),
+            'n_train_rows_full': data['n_train_full'],
+            'n_test_rows': len(X_test),
+            'model': pipeline
+        }
+    
+    @staticmethod
+    def _holdout_segments(run: Dict[str, Any]) -> List[List[Any]]:
+        """
+        Segmentos de filas reservadas (nunca entrenadas) de un run con marca de agua.
+        
+        Cada segmento es [primera fila, filas, test_size, random_state]: sus
+        filas de prueba son las del train_test_split de esas filas. Un run
+        refrescado hereda los segmentos del padre más el de sus filas nuevas
+        (tag holdout); la validación cruzada entrena con todas las filas y
+        no reserva ninguna.
+        """
+        if run['tags'].get('holdout'):
+            return json.loads(run['tags']['holdout'])
+        params = run['params']
+        if 'cv_folds' in params:
+            return []
+        return [[0, int(params['data_rows']), float(params.get('test_size', 0.2)), int(params.get('random_state', 42))]]
+    
+    @staticmethod
+    def _holdout_positions(segments: List[List[Any]]) -> np.ndarray:
+        """Posiciones (en las filas cargadas) de las filas reservadas de los segmentos."""
+        positions = [
+            first + train_test_split(np.arange(n_rows), test_size=test_size, random_state=random_state)[1]
+            for first, n_rows, test_size, random_state in segments
+        ]
+        return np.sort(np.concatenate(positions)) if positions else np.array([], dtype=np.int64)
+    
+    def refresh_model(
+        self,
+        file_path: Optional[str] = None,
+        n_new_trees: Optional[int] = None,
+        max_trees: Optional[int] = None,
+        **options
+    ) -> Dict[str, Any]:
+        """
+        Refresca el mejor modelo registrado con las filas agregadas desde su marca de agua.
+        
+        Se entrenan árboles nuevos solo con las filas que se agregaron al
+        CSV después del entrenamiento del modelo padre (data_watermark), se
+        suman al bosque y, si se indica max_trees, se descartan los más
+        antiguos. Una parte de las filas nuevas queda reservada y se suma a
+        las filas de prueba del padre (ver _holdout_segments): el bosque
+        refrescado y el padre se evalúan sobre esa unión y, solo si el
+        refrescado mejora, se registra ese mismo bosque como nueva versión
+        con el linaje hasta el run padre.
+        
+        El rmse, mae y r2_score del nuevo run son los de esa evaluación
+        (parent_rmse y parent_r2_score, los del padre sobre las mismas
+        filas): como el conjunto de prueba extiende el del padre, son
+        comparables con los de su linaje en la selección del mejor modelo.
+        Las filas reservadas no se entrenan nunca, tampoco en los refresh
+        siguientes, que las heredan en el tag holdout.
+        
+        Args:
+            file_path: CSV de datos (None = la fuente registrada en el modelo padre)
+            n_new_trees: Árboles a agregar (None = proporcional a la fracción
+                de filas nuevas respecto de las que vio el padre)
+            max_trees: Tamaño máximo del bosque refrescado (None = sin límite)
+            **options: test_size, metric_name (para elegir el padre), n_jobs y max_threads
+            
+        Returns:
+            Diccionario con refreshed (False si no había filas nuevas o si el
+            modelo refrescado no mejoró al padre) y, si se refrescó, la
+            información del nuevo modelo
+        """
+        test_size = options.get('test_size', 0.2)
+        metric_name = options.get('metric_name', 'rmse')
+        budget = ComputeBudget(n_jobs=options.get('n_jobs'), max_threads=options.get('max_threads'))
+        
+        parent = self._require(self.model_repository, ModelRunRepository, "consultar runs").get_best_run(metric_name)
+        parent_params = parent['params']
+        source = parent_params.get('data_source')
+        if not source or parent_params.get('data_watermark') is None:
+            raise Exception(f"El modelo del run {parent['run_id']} no registra la marca de agua de sus datos; "
+                            f"hace falta un entrenamiento completo")
+        file_path = file_path or source
+        if os.path.abspath(file_path) != source:
+            raise Exception(f"El modelo del run {parent['run_id']} se entrenó con {source}, no con {file_path}")
+        
+        parent_offset = int(parent_params['data_watermark'])
+        parent_rows = int(parent_params.get('data_rows', 0))
+        random_state = int(parent_params.get('random_state', 42))
+        watermark = self._data_watermark(file_path)
+        if watermark is None:
+            raise Exception(f"{file_path} no admite lectura incremental")
+        if watermark['byte_offset'] < parent_offset:
+            raise Exception(f"{file_path} es más chico que cuando se entrenó el modelo (se reescribió); "
+                            f"hace falta un entrenamiento completo")
+        
+        X_new, y_new = (self.data_repository.load_appended_features(file_path, parent_offset)
+                        if watermark['byte_offset'] > parent_offset else (None, None))
+        if X_new is None or len(X_new) < 2:
+            print(f"ℹ️ Sin filas nuevas desde el byte {parent_offset}: el modelo del run {parent['run_id']} está al día")
+            return {'refreshed': False, 'parent_run_id': parent['run_id'], 'new_rows': 0 if X_new is None else len(X_new)}
+        
+        # Una parte de las filas nuevas se reserva y se suma a las de prueba del padre
+        segments = self._holdout_segments(parent) + [[parent_rows, len(X_new), test_size, random_state]]
+        fit_positions, eval_positions = train_test_split(
+            np.arange(len(X_new)), test_size=test_size, random_state=random_state
+        )
+        X_fit, y_fit = X_new.iloc[fit_positions], y_new.iloc[fit_positions]
+        
+        # Las filas de prueba del padre se leen de la carga completa: el CSV
+        # solo crece, así sus primeras parent_rows filas son las que vio el padre
+        X_all, y_all = self.data_repository.load_features(file_path)
+        if len(X_all) < parent_rows + len(X_new) or not np.array_equal(
+            y_all.iloc[parent_rows:parent_rows + len(X_new)].to_numpy(), y_new.to_numpy()
+        ):
+            raise Exception(f"Las filas de {file_path} no coinciden con las del modelo del run {parent['run_id']} "
+                            f"(¿se reescribió?); hace falta un entrenamiento completo")
+        holdout = self._holdout_positions(segments)
+        X_holdout, y_holdout = X_all.iloc[holdout].to_numpy(), y_all.iloc[holdout]
+        del X_all, y_all
+        
+        pipeline = self.model_repository.load_model(parent['model_uri'])
+        forest = pipeline.named_steps['model'] if isinstance(pipeline, Pipeline) else pipeline
+        if not isinstance(forest, RandomForestRegressor):
+            raise Exception(f"El refresh solo admite RandomForestRegressor, no {type(forest).__name__}")
+        n_old_trees = len(forest.estimators_)
+        
+        if n_new_trees is None:
+            share = len(X_fit) / parent_rows if parent_rows else 0.1
+            n_new_trees = max(math.ceil(n_old_trees * share), 1)
+        
+        # Los árboles nuevos usan los mismos hiperparámetros y otra semilla
+        new_forest = clone(forest).set_params(
+            n_estimators=n_new_trees,
+            random_state=random_state + n_old_trees,
+            n_jobs=budget.cores,
+            warm_start=False
+        )
+        print(f"🔄 Refrescando el modelo del run {parent['run_id']}: {n_new_trees} árboles nuevos "
+              f"con {len(X_fit)} de {len(X_new)} filas nuevas ({n_old_trees} árboles existentes)")
+        with budget.limits():
+            new_forest.fit(X_fit.to_numpy(), y_fit)
+        
+        merged, n_dropped = merge_forests(forest, new_forest, max_trees=max_trees)
+        if n_dropped:
+            print(f"✂️ Descartados los {n_dropped} árboles más antiguos (máximo {max_trees})")
+        
+        with budget.limits():
+            parent_metrics = compute_regression_metrics(y_holdout, forest.predict(X_holdout))
+            metrics = self.evaluate_model(merged, X_holdout, y_holdout)
+        print(f"   Padre sobre las {len(holdout)} filas de prueba: RMSE = ${parent_metrics['rmse']:,.2f}, "
+              f"R² = {parent_metrics['r2_score']:.4f}")
+        
+        if not metrics['rmse'] < parent_metrics['rmse']:
+            print(f"⚠️ El modelo refrescado no mejora al padre sobre las filas de prueba: no se registra")
+            return {
+                'refreshed': False,
+                'rejected': True,
+                'parent_run_id': parent['run_id'],
+                'new_rows': len(X_new),
+                'rmse': metrics['rmse'],
+                'mae': metrics['mae'],
+                'r2_score': metrics['r2_score'],
+                'parent_rmse': parent_metrics['rmse'],
+                'parent_r2_score': parent_metrics['r2_score']
+            }
+        
+        pipeline, input_example, signature = self._build_artifact(merged, X_fit)
+        
+        lineage = [run_id for run_id in parent['tags'].get('lineage', '').split(',') if run_id] + [parent['run_id']]
+        params = {
+            'n_estimators': len(merged.estimators_),
+            'max_depth': parent_params.get('max_depth'),
+            'random_state': random_state,
+            'parent_run_id': parent['run_id'],
+            'n_new_trees': n_new_trees,
+            'n_dropped_trees': n_dropped,
+            'max_trees': max_trees if max_trees is not None else 'unlimited',
+            'new_rows': len(X_new),
+            'holdout_rows': len(holdout),
+            'data_source': source,
+            'data_watermark': watermark['byte_offset'],
+            'data_rows': parent_rows + len(X_new),
+            **budget.as_params()
+        }
+        model_uri = self.model_repository.save_model(
+            model=pipeline,
+            params=params,
+            metrics={
+                **metrics,
+                'parent_rmse': parent_metrics['rmse'],
+                'parent_r2_score': parent_metrics['r2_score']
+            },
+            input_example=input_example,
+            signature=signature,
+            tags={'parent_run_id': parent['run_id'], 'lineage': ",".join(lineage), 'holdout': json.dumps(segments)}
+        )
+        
+        return {
+            'refreshed': True,
+            'model_uri': model_uri,
+            'parent_run_id': parent['run_id'],
+            'lineage': lineage,
+            'new_rows': len(X_new),
+            'n_new_trees': n_new_trees,
+            'n_dropped_trees': n_dropped,
+            'n_estimators': len(merged.estimators_),
+            'max_depth': merged.max_depth,
+            'rmse': metrics['rmse'],
+            'mae': metrics['mae'],
+            'r2_score': metrics['r2_score'],
+            'parent_rmse': parent_metrics['rmse'],
+            'parent_r2_score': parent_metrics['r2_score'],
+            'model': pipeline
+        }
+    
+    def search_hyperparameters(
+        self,
+        file_path: str,
+        candidates: Optional[List[Dict[str, Any]]] = None,
+        **options
+    ) -> Dict[str, Any]:
+        """
+        Búsqueda de hiperparámetros en paralelo.
+        
+        Los datos se cargan y preprocesan una sola vez y se comparten con los
+        procesos de los trials por memory-mapping (ver SharedTrainingData).
+        Los trials corren en paralelo dentro del presupuesto de cómputo y se
+        registran como runs anidados bajo un run padre, que guarda y
+        registra el mejor modelo.
+        
+        Con strategy='grid' se evalúan las combinaciones de candidates; con
+        strategy='adaptive' se hace successive halving y luego propuestas
+        de un modelo sustituto (ver AdaptiveSearch), persistiendo los trials
+        en el TrialStore para reanudar y no repetir configuraciones.
+        
+        Args:
+            file_path: Ruta al archivo de datos
+            candidates: Combinaciones de hiperparámetros para 'grid' (None = DEFAULT_SEARCH_SPACE)
+            **options: Opciones de datos (ver _prepare_training_data), n_jobs,
+                max_threads, metric ('r2_score' por defecto), strategy
+                ('grid' o 'adaptive') y, para 'adaptive', study, n_initial,
+                eta, min_fraction, resource y n_proposals
+                
+        Returns:
+            Diccionario con el mejor modelo, sus métricas y todos los trials
+        """
+        strategy = options.get('strategy', 'grid')
+        if strategy not in ('grid', 'adaptive'):
+            raise ValueError(f"Estrategia de búsqueda no soportada: {strategy}. Opciones: grid, adaptive")
+        random_state = options.get('random_state', 42)
+        metric = options.get('metric', 'r2_score')
+        budget = ComputeBudget(n_jobs=options.get('n_jobs'), max_threads=options.get('max_threads'))
+        model_repository = self._require(self.model_repository, SearchRepository, "búsquedas de hiperparámetros")
+        strategy_params: Dict[str, Any] = {}
+        
+        data = self._prepare_training_data(file_path, options)
+        
+        with SharedTrainingData(data['X_train'], data['y_train'], data['X_test'], data['y_test']) as shared:
+            search = HyperparameterSearch(budget, random_state=random_state, metric=metric)
+            if strategy == 'grid':
+                trials = search.run(shared, list(candidates or DEFAULT_SEARCH_SPACE))
+                best = search.best_trial(trials)
+                if best is None:
+                    raise Exception("Ningún trial de la búsqueda terminó correctamente")
+                model = search.load_trial_model(best)
+            else:
+                trial_store = self.trial_store
+                if trial_store is None:
+                    print("ℹ️ Sin almacén de trials persistente: la búsqueda no se podrá reanudar")
+                    trial_store = TrialStore(':memory:')
+                adaptive = AdaptiveSearch(
+                    search,
+                    trial_store,
+                    study=options.get('study', 'default'),
+                    n_initial=options.get('n_initial', 16),
+                    eta=options.get('eta', 3),
+                    min_fraction=options.get('min_fraction', 1 / 9),
+                    resource=options.get('resource', 'rows'),
+                    n_proposals=options.get('n_proposals', 6)
+                )
+                trials = adaptive.run(shared)
+                best = adaptive.best_trial(trials)
+                if best is None:
+                    raise Exception("Ningún trial de la búsqueda terminó correctamente")
+                model = adaptive.load_best_model(shared, best)
+                strategy_params = {
+                    'study': adaptive.study,
+                    'resource': adaptive.resource,
+                    'eta': adaptive.eta,
+                    'fidelities': ",".join(f"{f:.3f}" for f in adaptive.fidelities),
+                    'n_cached_trials': sum(1 for t in trials if t['cached'])
+                }
+        
+        pipeline, input_example, signature = self._build_artifact(model, data['X_train'])
+        
+        search_params = {
+            'search_strategy': strategy,
+            'n_trials': len(trials),
+            'metric': metric,
+            'random_state': random_state,
+            **strategy_params,
+            **budget.as_params(),
+            **data['data_params']
+        }
+        model_uri = model_repository.save_search(
+            model=pipeline,
+            search_params=search_params,
+            trials=[{k: v for k, v in trial.items() if k not in ('model_path', 'trial_key')} for trial in trials],
+            best_params=best['params'],
+            metrics=best['metrics'],
+            input_example=input_example,
+            signature=signature
+        )
+        
+        return {
+            'model_uri': model_uri,
+            'best_params': best['params'],
+            'rmse': best['metrics']['rmse'],
+            'mae': best['metrics']['mae'],
+            'r2_score': best['metrics']['r2_score'],
+            'trials': trials,
+            'n_train_rows': len(data['X_train']),
+            'n_test_rows': len(data['X_test']),
+            'model': pipeline
         }
     
     def evaluate_model(self, model, X_test, y_test) -> Dict[str, float]:
@@ -105,35 +1004,18 @@ class RealEstateModelTrainer(ModelTrainingService):
         # Hacer predicciones
         y_pred = model.predict(X_test)
         
-        # Calcular todas las métricas
-        rmse = np.sqrt(mean_squared_error(y_test, y_pred))
-        mae = mean_absolute_error(y_test, y_pred)              # 👈 Calcular MAE
-        r2 = r2_score(y_test, y_pred)                          # 👈 Calcular R²
-        
-        # Calcular métricas adicionales útiles
-        mse = mean_squared_error(y_test, y_pred)
-        
-        # Estadísticas descriptivas de los errores
-        errors = y_test - y_pred
-        mean_error = np.mean(errors)
-        std_error = np.std(errors)
+        # Calcular todas las métricas (RMSE, MAE, R², MSE y estadísticas del error)
+        metrics = compute_regression_metrics(y_test, y_pred)
         
         print(f"📊 Métricas de Evaluación:")
-        print(f"   RMSE: ${rmse:,.2f}")
-        print(f"   MAE:  ${mae:,.2f}")
-        print(f"   R²:   {r2:.4f}")
-        print(f"   MSE:  ${mse:,.2f}")
-        print(f"   Error promedio: ${mean_error:,.2f}")
-        print(f"   Desv. estándar del error: ${std_error:,.2f}")
+        print(f"   RMSE: ${metrics['rmse']:,.2f}")
+        print(f"   MAE:  ${metrics['mae']:,.2f}")
+        print(f"   R²:   {metrics['r2_score']:.4f}")
+        print(f"   MSE:  ${metrics['mse']:,.2f}")
+        print(f"   Error promedio: ${metrics['mean_error']:,.2f}")
+        print(f"   Desv. estándar del error: ${metrics['std_error']:,.2f}")
         
-        return {
-            'rmse': rmse,
-            'mae': mae,                    # 👈 Incluir MAE
-            'r2_score': r2,               # 👈 Incluir R²
-            'mse': mse,
-            'mean_error': mean_error,
-            'std_error': std_error
-        }
+        return metrics
     
     def evaluate_model_comprehensive(self, model, X_test, y_test) -> Dict[str, Any]:
         """
@@ -184,19 +1066,194 @@ class RealEstateModelTrainer(ModelTrainingService):
         
         return comprehensive_metrics
 
+# Reintentos de la carga perezosa del modelo activo (espera 0.5s, 1s, ... entre intentos)
+DEFAULT_LOAD_ATTEMPTS = 3
+DEFAULT_LOAD_BACKOFF_SECONDS = 0.5
+
+# Propiedad típica para calentar un modelo antes de activarlo
+WARMUP_PROPERTY = Property(
+    assessed_value=150000.0,
+    area_m2=120.0,
+    meses_en_venta=3,
+    nro_habitaciones=3,
+    nro_pisos=2,
+    property_type="Single Family"
+)
+
 class RealEstatePredictionService(PredictionService):
     """Implementación del servicio de predicción para propiedades inmobiliarias."""
     
-    def __init__(self, model_repository: ModelRepository):
+    def __init__(
+        self,
+        model_repository: ModelRepository,
+        model_pool: Optional[ModelPool] = None,
+        model_selector: str = "best",
+        load_attempts: int = DEFAULT_LOAD_ATTEMPTS,
+        load_backoff_seconds: float = DEFAULT_LOAD_BACKOFF_SECONDS
+    ):
+        """
+        Args:
+            model_repository: Repositorio de modelos
+            model_pool: Pool de modelos cargados con presupuesto de memoria
+                (None = un pool con el presupuesto por defecto)
+            model_selector: Versión a servir: 'best', 'stage:<etapa>' o 'alias:<alias>'
+            load_attempts: Intentos de la primera carga del modelo activo
+            load_backoff_seconds: Espera antes del primer reintento (se duplica en cada uno)
+        """
+        if not isinstance(model_repository, ModelRunRepository):
+            raise ValueError(f"{type(model_repository).__name__} no resuelve versiones para servir")
         self.model_repository = model_repository
-        self._model = None
+        self.model_pool = model_pool or ModelPool(model_repository.load_model)
+        self.model_selector = model_selector
+        self.load_attempts = max(load_attempts, 1)
+        self.load_backoff_seconds = load_backoff_seconds
+        # Modelo activo (model_uri, version, model): se reemplaza con una sola
+        # asignación, así cada predicción ve la versión anterior o la nueva completa
+        self._active: Optional[Dict[str, Any]] = None
+        # Las activaciones (primera carga, refresco en segundo plano) no se solapan
+        # y la primera carga corre una sola vez aunque lleguen varias predicciones
+        self._activation_lock = threading.Lock()
+        self._loads = SingleFlight()
+        self._prewarm_thread: Optional[threading.Thread] = None
         self._model_metrics = None  # 👈 Cache para métricas del modelo
+        self._encoder = PropertyFeatureEncoder().fit()  # Para modelos registrados sin encoder
+    
+    def resolve_target(self) -> Dict[str, Any]:
+        """Versión que debería estar activa según el selector (consulta liviana al registry)."""
+        return self.model_repository.resolve_model(self.model_selector)
+    
+    def activate(self, target: Dict[str, Any]) -> bool:
+        """
+        Carga una versión, la calienta con una predicción de prueba y la deja activa.
+        
+        Todo el trabajo ocurre antes del reemplazo: las predicciones en curso
+        siguen usando la versión anterior hasta la asignación final.
+        
+        Args:
+            target: Versión a activar (model_uri y version, ver resolve_target)
+            
+        Returns:
+            True si cambió la versión activa
+        """
+        with self._activation_lock:
+            previous = self._active
+            if previous is not None and previous['model_uri'] == target['model_uri']:
+                return False
+            
+            activated = False
+            try:
+                if self.model_pool.pin([target]):
+                    raise Exception(f"No se pudo cargar el modelo {target['model_uri']}")
+                model = self.model_pool.get(target['model_uri'], target.get('run_id'), target.get('version'))
+                start = time.perf_counter()
+                warmup = self._predict_with(model, [WARMUP_PROPERTY.to_raw_dict()])
+                if not np.all(np.isfinite(warmup)):
+                    raise Exception(f"El modelo {target['model_uri']} devolvió una predicción de prueba inválida")
+                activated = True
+            finally:
+                if not activated:  # La versión rechazada no queda fijada en el pool
+                    self.model_pool.unpin(target['model_uri'])
+            
+            self._active = {'model_uri': target['model_uri'], 'version': target.get('version'), 'model': model}
+            if previous is not None:
+                self.model_pool.unpin(previous['model_uri'])
+            print(f"🔄 Modelo activo: {self._version_label(self._active)} "
+                  f"(calentado en {(time.perf_counter() - start) * 1000:.0f} ms)")
+            return True
+    
+    def _load_active(self) -> Dict[str, Any]:
+        """
+        Primera carga del modelo activo, con reintentos y espera exponencial.
+        
+        Returns:
+            Modelo activo
+        """
+        for attempt in range(1, self.load_attempts + 1):
+            try:
+                if self._active is None:
+                    self.activate(self.resolve_target())
+                return self._active
+            except Exception as e:
+                if attempt == self.load_attempts:
+                    raise Exception(f"No se pudo cargar el modelo tras {attempt} intentos: {str(e)}") from e
+                delay = self.load_backoff_seconds * 2 ** (attempt - 1)
+                print(f"⚠️ Falló la carga del modelo (intento {attempt}/{self.load_attempts}): {str(e)}. "
+                      f"Reintentando en {delay:g}s")
+                time.sleep(delay)
+    
+    def prewarm(self) -> threading.Thread:
+        """
+        Carga el modelo activo en segundo plano, antes de la primera predicción.
+        
+        Las predicciones que lleguen durante la carga esperan a esta misma
+        carga en lugar de iniciar otra. Si falla, la próxima predicción
+        vuelve a intentarlo.
+        
+        Returns:
+            Hilo de la precarga (daemon)
+        """
+        def run():
+            try:
+                self._get_model()
+            except Exception as e:
+                print(f"⚠️ No se pudo precargar el modelo: {str(e)}")
+        
+        if self._prewarm_thread is None or not self._prewarm_thread.is_alive():
+            self._prewarm_thread = threading.Thread(target=run, name="model-prewarm", daemon=True)
+            self._prewarm_thread.start()
+        return self._prewarm_thread
+    
+    @staticmethod
+    def _version_label(active: Dict[str, Any]) -> str:
+        return f"v{active['version']}" if active.get('version') is not None else active['model_uri']
+    
+    @property
+    def active_version(self) -> Optional[str]:
+        """Versión activa (None si todavía no se cargó ninguna)."""
+        active = self._active
+        return self._version_label(active) if active is not None else None
+    
+    def _get_model(self, model_uri: Optional[str] = None) -> Tuple[Any, str]:
+        """
+        Obtiene el modelo activo (lazy loading) o una versión concreta desde el pool.
+        
+        Args:
+            model_uri: Versión a usar (None = el modelo activo)
+            
+        Returns:
+            Tuple con (modelo, versión usada)
+        """
+        if model_uri is not None:
+            return self.model_pool.get(model_uri), model_uri
+        active = self._active
+        if active is None:
+            # Un solo hilo carga; los demás esperan esa carga (y su error, si falla)
+            active = self._loads.do('active', self._load_active)
+        return active['model'], self._version_label(active)
+    
+    def _predict_with(self, model: Any, rows: list[dict]) -> np.ndarray:
+        """Predice filas raw con un modelo (con o sin encoder en el artefacto)."""
+        frame = pd.DataFrame.from_records(rows)
+        
+        if isinstance(model, Pipeline) and 'encoder' in model.named_steps:
+            return model.predict(frame)
+        
+        # Modelos registrados antes de incluir el encoder en el artefacto
+        return model.predict(self._encoder.transform(frame))
     
-    def _get_model(self):
-        """Obtiene el modelo actual (lazy loading)."""
-        if self._model is None:
-            self._model = self.model_repository.get_best_model()
-        return self._model
+    def _predict_rows(self, rows: list[dict], model_uri: Optional[str] = None) -> Tuple[np.ndarray, str]:
+        """
+        Predice sobre filas raw en una sola llamada vectorizada.
+        
+        Args:
+            rows: Filas con las columnas raw de la propiedad
+            model_uri: Versión a usar (None = el modelo activo)
+            
+        Returns:
+            Tuple con (precios predichos, versión usada)
+        """
+        model, version = self._get_model(model_uri)
+        return self._predict_with(model, rows), version
     
     def get_model_metrics(self) -> Dict[str, float]:
         """
@@ -219,36 +1276,33 @@ class RealEstatePredictionService(PredictionService):
         
         return self._model_metrics
     
-    def predict_price(self, property_data: Property) -> float:
+    def predict_price(self, property_data: Property, model_uri: Optional[str] = None) -> float:
         """
         Predice el precio de una propiedad.
         
         Args:
             property_data: Datos de la propiedad
+            model_uri: Versión a usar (None = el modelo actual)
             
         Returns:
             Precio predicho
         """
         
-        model = self._get_model()
-        
-        # Convertir propiedad a formato de predicción
-        feature_dict = property_data.to_dict()
-        
-        # Crear array de features en el orden correcto
-        features = [
-            feature_dict['Assessed Value'],
-            feature_dict['area_m2'],
-            feature_dict['meses_en_venta'],
-            feature_dict['nro_habitaciones'],
-            feature_dict['nro_pisos'],
-            feature_dict['Property Type_Residential'],
-            feature_dict['Property Type_Single Family']
-        ]
+        return self.predict_with_version(property_data, model_uri=model_uri)[0]
+    
+    def predict_with_version(self, property_data: Property, model_uri: Optional[str] = None) -> Tuple[float, str]:
+        """
+        Predice el precio e informa la versión que lo calculó.
         
-        # Predecir
-        prediction = model.predict([features])
-        return float(prediction[0])
+        Args:
+            property_data: Datos de la propiedad
+            model_uri: Versión a usar (None = el modelo activo)
+            
+        Returns:
+            Tuple con (precio predicho, versión usada)
+        """
+        prediction, version = self._predict_rows([property_data.to_raw_dict()], model_uri)
+        return float(prediction[0]), version
     
     def predict_with_confidence(self, property_data: Property) -> Dict[str, Any]:
         """
@@ -290,36 +1344,20 @@ class RealEstatePredictionService(PredictionService):
                            'Aceptable' if r2 >= 0.70 else 'Necesita mejora'
         }
     
-    def predict_batch(self, properties: list[Property]) -> list[float]:
+    def predict_batch(self, properties: list[Property], model_uri: Optional[str] = None) -> list[float]:
         """
         Predice precios para múltiples propiedades.
         
         Args:
             properties: Lista de propiedades
+            model_uri: Versión a usar (None = el modelo actual)
             
         Returns:
             Lista de precios predichos
         """
         
-        model = self._get_model()
-        
-        # Convertir todas las propiedades a features
-        features_list = []
-        for prop in properties:
-            feature_dict = prop.to_dict()
-            features = [
-                feature_dict['Assessed Value'],
-                feature_dict['area_m2'],
-                feature_dict['meses_en_venta'],
-                feature_dict['nro_habitaciones'],
-                feature_dict['nro_pisos'],
-                feature_dict['Property Type_Residential'],
-                feature_dict['Property Type_Single Family']
-            ]
-            features_list.append(features)
-        
         # Predecir en lote
-        predictions = model.predict(features_list)
+        predictions, _ = self._predict_rows([prop.to_raw_dict() for prop in properties], model_uri)
         return [float(pred) for pred in predictions]
     
     def validate_property(self, property_data: Property) -> Dict[str, Any]:
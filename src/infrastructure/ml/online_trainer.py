@@ -0,0 +1,285 @@
+"""
+Entrenamiento out-of-core para exports que no entran en memoria.
+
+OnlineModelTrainer recorre el archivo por chunks (iter_feature_chunks del
+repositorio de datos) y nunca arma la matriz X completa: las estadísticas
+de escalado de las features y del target se acumulan con partial_fit en
+una primera pasada completa (así todas las épocas escalan igual), y
+después un SGDRegressor se ajusta con partial_fit chunk a chunk. La
+partición train/test se decide fila a fila con una semilla fija, así cada
+época (y la pasada final de evaluación) ve exactamente las mismas filas de
+prueba.
+"""
+
+import os
+import sys
+import time
+import numpy as np
+import mlflow
+from sklearn.base import BaseEstimator, RegressorMixin
+from sklearn.linear_model import SGDRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from typing import Any, Dict, Iterator, Optional, Tuple
+from domain.services.prediction_service import ModelTrainingService
+from domain.repositories.model_repository import ChunkedDataRepository, DataRepository, ModelRepository
+from infrastructure.data.feature_encoder import PropertyFeatureEncoder
+from infrastructure.ml.compute_budget import ComputeBudget
+from infrastructure.ml.metrics import RunningRegressionMetrics, compute_regression_metrics, measure_serving_cost
+
+try:
+    import resource
+except ImportError:  # Windows: sin getrusage, no se informa el pico de RSS
+    resource = None
+
+DEFAULT_EPOCHS = 5
+ONLINE_BACKEND = 'online_sgd'
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """
+    Pico de memoria residente (RSS) del proceso hasta el momento.
+
+    Returns:
+        Bytes, o None si la plataforma no lo informa
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KB; macOS, bytes
+    return int(peak if sys.platform == 'darwin' else peak * 1024)
+
+
+class ScaledTargetRegressor(BaseEstimator, RegressorMixin):
+    """
+    Regresor ajustado sobre el target estandarizado que predice en la escala original.
+
+    El SGD necesita un target de escala unitaria (los precios llegan a
+    millones); el escalador del target viaja con el modelo en el artefacto.
+    """
+
+    def __init__(self, regressor: Any, target_scaler: StandardScaler):
+        self.regressor = regressor
+        self.target_scaler = target_scaler
+
+    def fit(self, X: Any, y: Any) -> 'ScaledTargetRegressor':
+        """Ajusta el escalador del target y el regresor en memoria."""
+        y = np.asarray(y, dtype=np.float64).reshape(-1, 1)
+        self.target_scaler.fit(y)
+        self.regressor.fit(X, self.target_scaler.transform(y).ravel())
+        return self
+
+    def __sklearn_is_fitted__(self) -> bool:
+        """Ajustado cuando regresor y escalador lo están (también si se ajustaron con partial_fit)."""
+        return hasattr(self.regressor, 'coef_') and hasattr(self.target_scaler, 'scale_')
+
+    def predict(self, X: Any) -> np.ndarray:
+        """Predice y vuelve a la escala del target."""
+        scaled = self.regressor.predict(X).reshape(-1, 1)
+        return self.target_scaler.inverse_transform(scaled).ravel()
+
+
+class OnlineModelTrainer(ModelTrainingService):
+    """
+    Servicio de entrenamiento out-of-core con SGDRegressor y partial_fit.
+
+    Implementa la interfaz base de entrenamiento (ModelTrainingService), de
+    modo que TrainModelUseCase.execute lo usa sin cambios; los
+    hiperparámetros de árboles (n_estimators, max_depth, backend) y el
+    muestreo no aplican y se ignoran. No ofrece las capacidades opcionales
+    (validación cruzada, búsqueda, checkpoints, refresh ni backtesting).
+    """
+
+    def __init__(
+        self,
+        data_repository: DataRepository,
+        model_repository: ModelRepository,
+        chunk_rows: Optional[int] = None
+    ):
+        """
+        Args:
+            data_repository: Repositorio de datos (debe leer por chunks: ChunkedDataRepository)
+            model_repository: Repositorio de modelos
+            chunk_rows: Filas por chunk (None = el valor por defecto del repositorio)
+        """
+        if not isinstance(data_repository, ChunkedDataRepository):
+            raise ValueError(f"{type(data_repository).__name__} no soporta lectura por chunks")
+        self.data_repository = data_repository
+        self.model_repository = model_repository
+        self.chunk_rows = chunk_rows
+
+    def _iter_split_chunks(
+        self,
+        file_path: str,
+        chunk_rows: Optional[int],
+        data_filters: Optional[Dict[str, Any]],
+        test_size: float,
+        random_state: int
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Recorre los chunks marcando qué filas son de prueba.
+
+        La semilla se reinicia en cada recorrido, así la partición es la
+        misma en todas las épocas y en la evaluación.
+
+        Returns:
+            Iterador de (X, y, máscara de filas de prueba) por chunk
+        """
+        rng = np.random.default_rng(random_state)
+        for X_chunk, y_chunk in self.data_repository.iter_feature_chunks(file_path, chunksize=chunk_rows, filters=data_filters):
+            yield X_chunk.to_numpy(), y_chunk.to_numpy(dtype=np.float64), rng.random(len(X_chunk)) < test_size
+
+    def train_model(self, file_path: str, **hyperparams) -> Dict[str, Any]:
+        """
+        Entrena un SGDRegressor recorriendo el archivo por chunks.
+
+        Se registra en MLflow, además de las métricas de error, el pico de
+        RSS del proceso frente al tamaño del archivo y al de la matriz X
+        que habría hecho falta para el entrenamiento en memoria. El pico es
+        el del proceso completo (getrusage), así que incluye lo que se haya
+        usado antes del entrenamiento.
+
+        Args:
+            file_path: Archivo, directorio de shards o dataset particionado
+            **hyperparams: epochs, chunk_rows, alpha, eta0, random_state,
+                test_size, data_filters, n_jobs y max_threads
+
+        Returns:
+            Diccionario con información del entrenamiento
+        """
+        epochs = hyperparams.get('epochs', DEFAULT_EPOCHS)
+        chunk_rows = hyperparams.get('chunk_rows') or self.chunk_rows
+        alpha = hyperparams.get('alpha', 0.0001)
+        eta0 = hyperparams.get('eta0', 0.01)
+        random_state = hyperparams.get('random_state', 42)
+        test_size = hyperparams.get('test_size', 0.2)
+        data_filters = hyperparams.get('data_filters')
+        budget = ComputeBudget(n_jobs=hyperparams.get('n_jobs'), max_threads=hyperparams.get('max_threads'))
+
+        if hyperparams.get('sample_rows') or hyperparams.get('sample_memory_mb'):
+            print("ℹ️ El entrenamiento out-of-core recorre todas las filas; el muestreo se ignora")
+
+        encoder = PropertyFeatureEncoder().fit()
+        scaler = StandardScaler()
+        target_scaler = StandardScaler()
+        regressor = SGDRegressor(alpha=alpha, eta0=eta0, learning_rate='invscaling', random_state=random_state)
+
+        n_train = n_test = 0
+        example_rows = []
+        print(f"🌊 Entrenamiento out-of-core: {epochs} épocas con SGDRegressor "
+              f"(chunks de {chunk_rows or 'tamaño por defecto'} filas)...")
+        start = time.perf_counter()
+        with budget.limits():
+            # Primera pasada: estadísticas de escalado completas antes del primer partial_fit
+            for X_chunk, y_chunk, is_test in self._iter_split_chunks(file_path, chunk_rows, data_filters, test_size, random_state):
+                n_train += int((~is_test).sum())
+                n_test += int(is_test.sum())
+                if sum(len(rows) for rows in example_rows) < 2:
+                    example_rows.append(X_chunk[:2])
+                if (~is_test).any():
+                    scaler.partial_fit(X_chunk[~is_test])
+                    target_scaler.partial_fit(y_chunk[~is_test].reshape(-1, 1))
+            if n_train == 0:
+                raise Exception(f"No hay filas de entrenamiento en {file_path}")
+            input_example = encoder.inverse_transform(np.vstack(example_rows)[:2])
+            
+            for epoch in range(epochs):
+                shuffle_rng = np.random.default_rng(random_state + epoch)
+                for X_chunk, y_chunk, is_test in self._iter_split_chunks(file_path, chunk_rows, data_filters, test_size, random_state):
+                    X_fit, y_fit = X_chunk[~is_test], y_chunk[~is_test]
+                    if len(y_fit) == 0:
+                        continue
+                    # partial_fit hace una sola pasada en orden: se mezclan las filas del chunk
+                    order = shuffle_rng.permutation(len(y_fit))
+                    regressor.partial_fit(
+                        scaler.transform(X_fit[order]),
+                        target_scaler.transform(y_fit[order].reshape(-1, 1)).ravel()
+                    )
+                print(f"   Época {epoch + 1}/{epochs} completada ({time.perf_counter() - start:.1f}s)")
+            training_seconds = time.perf_counter() - start
+
+            model = ScaledTargetRegressor(regressor, target_scaler)
+            pipeline = Pipeline([('encoder', encoder), ('scaler', scaler), ('model', model)])
+
+            # Evaluación: otra pasada que solo mira las filas de prueba
+            running = RunningRegressionMetrics()
+            for X_chunk, y_chunk, is_test in self._iter_split_chunks(file_path, chunk_rows, data_filters, test_size, random_state):
+                if is_test.any():
+                    running.update(y_chunk[is_test], model.predict(scaler.transform(X_chunk[is_test])))
+            metrics = running.result()
+
+        print("📊 Métricas de Evaluación:")
+        print(f"   RMSE: ${metrics['rmse']:,.2f}")
+        print(f"   MAE:  ${metrics['mae']:,.2f}")
+        print(f"   R²:   {metrics['r2_score']:.4f}")
+
+        n_rows = n_train + n_test
+        peak_rss = peak_rss_bytes()
+        dataset_bytes = os.path.getsize(file_path) if os.path.isfile(file_path) else None
+        full_matrix_bytes = n_rows * len(encoder.feature_names_out_) * np.dtype(np.float32).itemsize
+        if peak_rss is not None:
+            print(f"🧠 Pico de RSS: {peak_rss / 1024**2:.1f} MB para {n_rows} filas "
+                  f"(X completa: {full_matrix_bytes / 1024**2:.1f} MB"
+                  + (f", archivo: {dataset_bytes / 1024**2:.1f} MB)" if dataset_bytes is not None else ")"))
+
+        signature = mlflow.models.infer_signature(input_example, pipeline.predict(input_example))
+        serving_cost = measure_serving_cost(pipeline, input_example.iloc[:1])
+        metrics.update({'training_seconds': training_seconds, 'full_matrix_bytes': float(full_matrix_bytes), **serving_cost})
+        if peak_rss is not None:
+            metrics['peak_rss_bytes'] = float(peak_rss)
+        if dataset_bytes is not None:
+            metrics['dataset_bytes'] = float(dataset_bytes)
+
+        params = {
+            'backend': ONLINE_BACKEND,
+            'epochs': epochs,
+            'chunk_rows': chunk_rows or 'default',
+            'alpha': alpha,
+            'eta0': eta0,
+            'random_state': random_state,
+            'test_size': test_size,
+            'train_rows': n_train,
+            'test_rows': n_test,
+            **budget.as_params()
+        }
+        if data_filters:
+            params['data_filters'] = str(data_filters)
+
+        model_uri = self.model_repository.save_model(
+            model=pipeline,
+            params=params,
+            metrics=metrics,
+            input_example=input_example,
+            signature=signature
+        )
+
+        return {
+            'model_uri': model_uri,
+            'rmse': metrics['rmse'],
+            'mae': metrics['mae'],
+            'r2_score': metrics['r2_score'],
+            'experiment_id': "experiment_id_placeholder",
+            'run_id': "run_id_placeholder",
+            'n_train_rows': n_train,
+            'n_test_rows': n_test,
+            'backend': ONLINE_BACKEND,
+            'training_seconds': training_seconds,
+            'peak_rss_bytes': peak_rss,
+            'dataset_bytes': dataset_bytes,
+            **serving_cost,
+            'model': pipeline
+        }
+
+    def evaluate_model(self, model: Any, X_test: Any, y_test: Any) -> Dict[str, float]:
+        """
+        Evalúa un modelo sobre un conjunto de prueba en memoria.
+
+        Args:
+            model: Pipeline (o modelo) entrenado
+            X_test: Features de prueba
+            y_test: Target de prueba
+
+        Returns:
+            Diccionario con las métricas de regresión
+        """
+        return compute_regression_metrics(y_test, model.predict(X_test))
@@ -0,0 +1,59 @@
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+
+class _Call:
+    """Una ejecución en curso y su resultado compartido."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """
+    Deduplica llamadas concurrentes por clave.
+
+    El primer hilo que pide una clave ejecuta la función; los que llegan
+    mientras tanto esperan y reciben el mismo resultado (o la misma
+    excepción) en lugar de repetir el trabajo. Terminada la ejecución la
+    clave se libera: la próxima llamada vuelve a ejecutar la función.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, function: Callable[[], Any]) -> Any:
+        """
+        Ejecuta function una sola vez para todas las llamadas concurrentes con la misma clave.
+
+        Args:
+            key: Clave del trabajo (p. ej. la URI del modelo)
+            function: Trabajo a ejecutar
+
+        Returns:
+            Resultado de function
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if leader:
+            try:
+                call.result = function()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        else:
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
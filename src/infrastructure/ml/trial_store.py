@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+class TrialStore:
+    """
+    Almacén persistente de trials de búsqueda de hiperparámetros (SQLite).
+
+    Cada trial se identifica por una clave derivada de la huella de los
+    datos, los hiperparámetros, la fidelidad y la semilla: una búsqueda
+    interrumpida retoma donde quedó y una configuración idéntica sobre datos
+    idénticos no se vuelve a entrenar. Los modelos de los trials a fidelidad
+    completa se guardan junto a la base para no tener que reentrenar el
+    mejor.
+    """
+
+    def __init__(self, db_path: str, model_dir: Optional[str] = None):
+        """
+        Args:
+            db_path: Archivo SQLite (':memory:' = sin persistencia)
+            model_dir: Directorio de modelos de los trials (por defecto junto a la base)
+        """
+        self.db_path = db_path
+        if model_dir is None:
+            model_dir = tempfile.mkdtemp(prefix="hp-trials-") if db_path == ':memory:' else f"{db_path}.models"
+        self.model_dir = model_dir
+        os.makedirs(self.model_dir, exist_ok=True)
+        if db_path != ':memory:' and os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        # La app web comparte el almacén entre hilos: la conexión se usa siempre
+        # con el lock tomado (reentrante: prune_models llama a list_trials)
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.RLock()
+        self.connection.row_factory = sqlite3.Row
+        with self.connection:
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS trials (
+                    trial_key TEXT PRIMARY KEY,
+                    study TEXT NOT NULL,
+                    data_key TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    fidelity REAL NOT NULL,
+                    status TEXT NOT NULL,
+                    metrics TEXT,
+                    model_path TEXT,
+                    fit_seconds REAL,
+                    error TEXT,
+                    created_at TEXT NOT NULL
+                )
+            """)
+            self.connection.execute("CREATE INDEX IF NOT EXISTS trials_data ON trials (data_key, study)")
+
+    @staticmethod
+    def trial_key(data_key: str, params: Dict[str, Any], fidelity: float, random_state: int, resource: str) -> str:
+        """
+        Clave de un trial.
+
+        Args:
+            data_key: Huella de los datos (SharedTrainingData.fingerprint)
+            params: Hiperparámetros del trial (a fidelidad completa)
+            fidelity: Fracción del recurso usada (1.0 = completa)
+            random_state: Semilla
+            resource: Recurso de la fidelidad ('rows' o 'n_estimators')
+
+        Returns:
+            Hash SHA-256 en hexadecimal
+        """
+        payload = json.dumps({
+            'data': data_key,
+            'params': params,
+            'fidelity': round(fidelity, 6),
+            'random_state': random_state,
+            'resource': resource if fidelity < 1 else None
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def model_path(self, trial_key: str) -> str:
+        """Ruta del modelo de un trial."""
+        return os.path.join(self.model_dir, f"{trial_key}.joblib")
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            'trial_key': row['trial_key'],
+            'study': row['study'],
+            'data_key': row['data_key'],
+            'params': json.loads(row['params']),
+            'fidelity': row['fidelity'],
+            'status': row['status'],
+            'metrics': json.loads(row['metrics']) if row['metrics'] else None,
+            'model_path': row['model_path'],
+            'fit_seconds': row['fit_seconds'],
+            'error': row['error']
+        }
+
+    def get(self, trial_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Devuelve un trial completado o None si no existe (o falló).
+
+        Los trials fallidos no se reutilizan: se vuelven a intentar.
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT * FROM trials WHERE trial_key = ? AND status = 'complete'", (trial_key,)
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def record(
+        self,
+        trial_key: str,
+        study: str,
+        data_key: str,
+        params: Dict[str, Any],
+        fidelity: float,
+        result: Dict[str, Any]
+    ) -> None:
+        """
+        Guarda el resultado de un trial (sobrescribe un intento fallido previo).
+
+        Args:
+            trial_key: Clave del trial
+            study: Nombre de la búsqueda
+            data_key: Huella de los datos
+            params: Hiperparámetros a fidelidad completa
+            fidelity: Fracción del recurso usada
+            result: Resultado de _run_trial
+        """
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO trials VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    trial_key,
+                    study,
+                    data_key,
+                    json.dumps(params, sort_keys=True, default=str),
+                    fidelity,
+                    'failed' if result.get('error') else 'complete',
+                    json.dumps(result['metrics']) if result.get('metrics') else None,
+                    result.get('model_path'),
+                    result.get('fit_seconds'),
+                    result.get('error'),
+                    datetime.now().isoformat()
+                )
+            )
+
+    def list_trials(self, data_key: Optional[str] = None, study: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Lista los trials guardados, del más antiguo al más reciente.
+
+        Args:
+            data_key: Filtra por huella de datos (opcional)
+            study: Filtra por búsqueda (opcional)
+
+        Returns:
+            Lista de trials
+        """
+        query = "SELECT * FROM trials WHERE 1 = 1"
+        args: List[Any] = []
+        if data_key is not None:
+            query += " AND data_key = ?"
+            args.append(data_key)
+        if study is not None:
+            query += " AND study = ?"
+            args.append(study)
+        with self._lock:
+            rows = self.connection.execute(query + " ORDER BY created_at", args).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def prune_models(self, data_key: str, keep: List[str]) -> int:
+        """
+        Elimina los modelos guardados de los trials de unos datos salvo los indicados.
+
+        Args:
+            data_key: Huella de los datos
+            keep: Claves de los trials cuyo modelo se conserva
+
+        Returns:
+            Número de modelos eliminados
+        """
+        removed = 0
+        with self._lock:
+            for trial in self.list_trials(data_key=data_key):
+                path = trial['model_path']
+                if trial['trial_key'] in keep or not path:
+                    continue
+                if os.path.exists(path):
+                    os.remove(path)
+                    removed += 1
+                with self.connection:
+                    self.connection.execute("UPDATE trials SET model_path = NULL WHERE trial_key = ?", (trial['trial_key'],))
+        return removed
+
+    def close(self) -> None:
+        """Cierra la conexión."""
+        with self._lock:
+            self.connection.close()
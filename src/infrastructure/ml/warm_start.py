@@ -0,0 +1,150 @@
+"""
+Crecimiento incremental de RandomForest (warm start).
+
+Con warm_start=True, subir n_estimators y volver a llamar a fit() solo
+entrena los árboles nuevos, y scikit-learn avanza el generador aleatorio
+por los árboles ya existentes: los primeros n árboles de un bosque crecido
+hasta N son los mismos que los de un bosque entrenado desde cero con
+n_estimators=n y la misma semilla. Por eso una curva de n_estimators
+(p. ej. 100, 200, 300 y 500 árboles) cuesta lo mismo que entrenar el
+bosque más grande una vez, y el modelo de cada checkpoint se obtiene
+recortando el bosque final.
+
+Las predicciones de test se acumulan árbol a árbol, de modo que evaluar
+todos los checkpoints tampoco repite trabajo.
+
+merge_forests agrega a un bosque árboles entrenados aparte (p. ej. con
+filas nuevas) y puede descartar los más antiguos para acotar su tamaño.
+"""
+
+import copy
+import time
+import numpy as np
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sklearn.ensemble import RandomForestRegressor
+from infrastructure.ml.metrics import compute_regression_metrics
+
+DEFAULT_CHECKPOINTS = (100, 200, 300, 500)
+
+
+def group_by_n_estimators(candidates: Sequence[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], List[int]]]:
+    """
+    Agrupa combinaciones que solo difieren en n_estimators.
+
+    Args:
+        candidates: Combinaciones de hiperparámetros (con n_estimators)
+
+    Returns:
+        Lista de (resto de hiperparámetros, checkpoints ordenados), en el
+        orden de primera aparición
+    """
+    groups: Dict[str, Tuple[Dict[str, Any], List[int]]] = {}
+    for params in candidates:
+        base = {k: v for k, v in params.items() if k != 'n_estimators'}
+        key = repr(sorted(base.items(), key=lambda item: item[0]))
+        groups.setdefault(key, (base, []))[1].append(int(params['n_estimators']))
+    return [(base, sorted(set(checkpoints))) for base, checkpoints in groups.values()]
+
+
+def grow_forest(
+    model: RandomForestRegressor,
+    checkpoints: Sequence[int],
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    X_test: np.ndarray,
+    y_test: np.ndarray
+) -> List[Dict[str, Any]]:
+    """
+    Hace crecer un bosque y lo evalúa en cada checkpoint de n_estimators.
+
+    Si el modelo ya tiene árboles (p. ej. un modelo cargado) se continúa a
+    partir de ellos; los checkpoints menores o iguales al tamaño actual se
+    evalúan sin entrenar.
+
+    Args:
+        model: RandomForestRegressor (entrenado o no)
+        checkpoints: Números de árboles en los que evaluar
+        X_train: Features de entrenamiento
+        y_train: Target de entrenamiento
+        X_test: Features de prueba
+        y_test: Target de prueba
+
+    Returns:
+        Curva: una entrada por checkpoint con n_estimators, metrics y
+        fit_seconds (acumulado)
+    """
+    model.set_params(warm_start=True)
+    existing = list(getattr(model, 'estimators_', []))
+    prediction_sum = np.zeros(len(y_test), dtype=np.float64)
+    n_summed = 0
+
+    curve = []
+    fit_seconds = 0.0
+    for n_estimators in sorted(set(int(n) for n in checkpoints)):
+        if n_estimators > len(existing):
+            start = time.perf_counter()
+            model.set_params(n_estimators=n_estimators)
+            model.fit(X_train, y_train)
+            fit_seconds += time.perf_counter() - start
+            existing = model.estimators_
+
+        for tree in existing[n_summed:n_estimators]:
+            prediction_sum += tree.predict(X_test)
+        n_summed = n_estimators
+
+        curve.append({
+            'n_estimators': n_estimators,
+            'metrics': compute_regression_metrics(y_test, prediction_sum / n_estimators),
+            'fit_seconds': fit_seconds
+        })
+
+    model.set_params(warm_start=False)
+    return curve
+
+
+def truncate_forest(model: RandomForestRegressor, n_estimators: int) -> RandomForestRegressor:
+    """
+    Devuelve una copia del bosque con sus primeros n_estimators árboles.
+
+    Equivale al bosque entrenado desde cero con ese n_estimators y la misma semilla.
+    """
+    if n_estimators >= len(model.estimators_):
+        return model
+    truncated = copy.copy(model)
+    truncated.estimators_ = model.estimators_[:n_estimators]
+    truncated.set_params(n_estimators=n_estimators)
+    return truncated
+
+
+def merge_forests(
+    forest: RandomForestRegressor,
+    new_forest: RandomForestRegressor,
+    max_trees: Optional[int] = None
+) -> Tuple[RandomForestRegressor, int]:
+    """
+    Agrega los árboles de new_forest al final de forest.
+
+    Los árboles conservan su orden de antigüedad, así que al superar
+    max_trees se descartan los primeros (los más antiguos).
+
+    Args:
+        forest: Bosque existente
+        new_forest: Bosque con los árboles nuevos (mismas features)
+        max_trees: Tamaño máximo del bosque resultante (None = sin límite)
+
+    Returns:
+        Tuple con (bosque combinado, árboles descartados)
+    """
+    if new_forest.n_features_in_ != forest.n_features_in_:
+        raise ValueError(f"Los bosques tienen distinto número de features: "
+                         f"{forest.n_features_in_} y {new_forest.n_features_in_}")
+    estimators = list(forest.estimators_) + list(new_forest.estimators_)
+    n_dropped = 0
+    if max_trees is not None and len(estimators) > max_trees:
+        n_dropped = len(estimators) - max_trees
+        estimators = estimators[n_dropped:]
+
+    merged = copy.copy(forest)
+    merged.estimators_ = estimators
+    merged.set_params(n_estimators=len(estimators), warm_start=False)
+    return merged, n_dropped
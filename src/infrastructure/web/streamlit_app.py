@@ -23,9 +23,18 @@ sys.path.insert(0, src_dir)
 from application.dto.property_dto import PropertyInputDTO
 from application.use_cases.train_model import TrainModelUseCase
 from application.use_cases.predict_price import PredictPriceUseCase
-from infrastructure.data.data_loader import CSVDataLoader
+from infrastructure.data.data_loader import CSVDataLoader, PREPROCESSING_VERSION
+from infrastructure.data.feature_cache import FeatureCache
+from infrastructure.data.cached_data_repository import CachedDataRepository
+from infrastructure.data.sharded_data_repository import ShardedDataRepository
+from infrastructure.ml.compute_budget import ComputeBudget
+from infrastructure.ml.artifact_cache import ModelArtifactCache
 from infrastructure.ml.mlflow_repository import MLflowModelRepository
+from infrastructure.ml.model_index import DEFAULT_INDEX_TTL_SECONDS
+from infrastructure.ml.model_pool import DEFAULT_POOL_MAX_BYTES, ModelPool
+from infrastructure.ml.model_refresher import DEFAULT_POLL_SECONDS, ModelRefresher
 from infrastructure.ml.model_trainer import RealEstateModelTrainer, RealEstatePredictionService
+from infrastructure.ml.trial_store import TrialStore
 
 # Configuración de la página
 st.set_page_config(
@@ -317,10 +326,54 @@ def load_custom_css():
 @st.cache_resource
 def setup_dependencies():
     """Configura las dependencias de la aplicación."""
-    data_repository = CSVDataLoader()
-    model_repository = MLflowModelRepository()
-    training_service = RealEstateModelTrainer(data_repository, model_repository)
-    prediction_service = RealEstatePredictionService(model_repository)
+    feature_cache = FeatureCache(
+        cache_dir=os.getenv('FEATURE_CACHE_DIR', 'data/feature_cache'),
+        max_bytes=int(os.getenv('FEATURE_CACHE_MAX_MB', '2048')) * 1024**2,
+        preprocessing_version=PREPROCESSING_VERSION
+    )
+    memory_budget_mb = os.getenv('PREPROCESS_MEMORY_BUDGET_MB')
+    data_loader = CSVDataLoader(
+        memory_budget_mb=float(memory_budget_mb) if memory_budget_mb else None,
+        engine=os.getenv('CSV_ENGINE', 'pandas'),
+        track_memory=os.getenv('PREPROCESS_TRACK_MEMORY', 'false').lower() == 'true'
+    )
+    data_workers = os.getenv('DATA_LOADER_WORKERS')
+    data_repository = ShardedDataRepository(
+        CachedDataRepository(data_loader, feature_cache),
+        max_workers=int(data_workers) if data_workers else None
+    )
+    index_ttl = os.getenv('MODEL_INDEX_TTL_SECONDS')
+    model_repository = MLflowModelRepository(
+        index_ttl_seconds=float(index_ttl) if index_ttl else DEFAULT_INDEX_TTL_SECONDS,
+        artifact_cache=ModelArtifactCache(
+            cache_dir=os.getenv('MODEL_CACHE_DIR', 'data/model_cache'),
+            max_bytes=int(os.getenv('MODEL_CACHE_MAX_MB', '2048')) * 1024**2
+        )
+    )
+    training_service = RealEstateModelTrainer(
+        data_repository,
+        model_repository,
+        trial_store=TrialStore(os.getenv('HP_TRIAL_STORE', 'data/hp_trials.sqlite'))
+    )
+    pool_max_mb = os.getenv('MODEL_POOL_MAX_MB')
+    model_pool = ModelPool(
+        model_repository.load_model,
+        max_bytes=int(pool_max_mb) * 1024**2 if pool_max_mb else DEFAULT_POOL_MAX_BYTES
+    )
+    # Versiones que se sirven junto a la actual (candidatas, por segmento), precargadas en paralelo
+    pinned = [uri.strip() for uri in os.getenv('MODEL_POOL_PINNED', '').split(',') if uri.strip()]
+    model_pool.pin(pinned)
+    prediction_service = RealEstatePredictionService(
+        model_repository,
+        model_pool=model_pool,
+        model_selector=os.getenv('MODEL_SELECTOR', 'best')
+    )
+    # El modelo se carga en segundo plano mientras se dibuja la página, no en la primera predicción
+    prediction_service.prewarm()
+    # Recarga en caliente: el proceso de Streamlit vive mucho y setup_dependencies se ejecuta una vez
+    poll_seconds = float(os.getenv('MODEL_POLL_SECONDS', str(DEFAULT_POLL_SECONDS)))
+    if poll_seconds > 0:
+        ModelRefresher(prediction_service, interval_seconds=poll_seconds).start()
     
     train_use_case = TrainModelUseCase(data_repository, model_repository, training_service)
     predict_use_case = PredictPriceUseCase(prediction_service, model_repository)
@@ -916,9 +969,16 @@ def training_page(train_use_case):
         col1, col2 = st.columns(2)
         
         with col1:
-            uploaded_file = st.file_uploader(
-                "Sube tu archivo CSV",
-                type=['csv']
+            uploaded_files = st.file_uploader(
+                "Sube tu archivo CSV (o varios shards)",
+                type=['csv'],
+                accept_multiple_files=True
+            )
+            
+            shards_source = st.text_input(
+                "O ruta/glob de shards en el servidor",
+                value="",
+                help="Directorio o patrón, por ejemplo data/shards/*.csv"
             )
             
             n_estimators = st.slider(
@@ -928,6 +988,13 @@ def training_page(train_use_case):
                 value=100,
                 step=50
             )
+            
+            backend_label = st.selectbox(
+                "Modelo",
+                ["RandomForest", "HistGradientBoosting"],
+                help="HistGradientBoosting usa Property Type, Residential Type y Town como categóricas "
+                     "y corta por early stopping (los estimadores son el máximo de iteraciones)"
+            )
         
         with col2:
             max_depth = st.slider(
@@ -942,26 +1009,74 @@ def training_page(train_use_case):
                 "Nombre del Experimento",
                 value="Grupo_2_Proyecto_Inmobiliario"
             )
+            
+            sampling_label = st.selectbox(
+                "Muestreo del entrenamiento",
+                ["Sin muestreo", "Reservoir (uniforme)", "Estratificado (Town, tipo, precio)"],
+                help="Para datasets muy grandes: el modelo se ajusta sobre una muestra y se evalúa con el test completo"
+            )
+            sample_rows = st.number_input(
+                "Filas de la muestra",
+                min_value=1000,
+                value=50000,
+                step=5000
+            )
+            
+            env_budget = ComputeBudget.from_env()
+            max_cores = os.cpu_count() or 1
+            n_jobs = st.slider(
+                "Núcleos (n_jobs)",
+                min_value=1,
+                max_value=max_cores,
+                value=min(env_budget.cores if env_budget.n_jobs is not None else max_cores, max_cores),
+                help="Núcleos para entrenar y evaluar el modelo"
+            )
+            max_threads = st.number_input(
+                "Límite de hilos BLAS/OpenMP (0 = sin límite)",
+                min_value=0,
+                value=env_budget.max_threads or 0,
+                step=1
+            )
         
         train_button = st.form_submit_button("🎯 Entrenar Modelo")
         
-        if train_button and uploaded_file is not None:
+        if train_button and (uploaded_files or shards_source.strip()):
             try:
                 import tempfile
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.csv') as tmp_file:
-                    tmp_file.write(uploaded_file.getvalue())
-                    tmp_file_path = tmp_file.name
+                if shards_source.strip():
+                    data_source = shards_source.strip()
+                elif len(uploaded_files) == 1:
+                    with tempfile.NamedTemporaryFile(delete=False, suffix='.csv') as tmp_file:
+                        tmp_file.write(uploaded_files[0].getvalue())
+                        data_source = tmp_file.name
+                else:
+                    # Varios archivos: se guardan como shards de un directorio temporal
+                    data_source = tempfile.mkdtemp(prefix="shards-")
+                    for i, shard in enumerate(uploaded_files):
+                        with open(os.path.join(data_source, f"{i:04d}_{os.path.basename(shard.name)}"), 'wb') as f:
+                            f.write(shard.getvalue())
                 
                 with st.spinner("Entrenando modelo..."):
                     result = train_use_case.execute(
-                        file_path=tmp_file_path,
+                        file_path=data_source,
                         n_estimators=n_estimators,
                         max_depth=max_depth,
-                        experiment_name=experiment_name
+                        experiment_name=experiment_name,
+                        sample_rows=None if sampling_label == "Sin muestreo" else int(sample_rows),
+                        sampling="stratified" if sampling_label.startswith("Estratificado") else "reservoir",
+                        n_jobs=int(n_jobs),
+                        max_threads=int(max_threads) or None,
+                        backend="hist_gradient_boosting" if backend_label == "HistGradientBoosting" else "random_forest"
                     )
                 
                 st.success("¡Modelo entrenado exitosamente!")
                 
+                load_report = getattr(train_use_case.data_repository, 'last_load_report', {})
+                if load_report.get('source') == data_source and load_report.get('failed'):
+                    st.warning(f"{len(load_report['failed'])} de {load_report['shards']} shards no se pudieron cargar:")
+                    for shard_path, error in load_report['failed'].items():
+                        st.caption(f"❌ {os.path.basename(shard_path)}: {error}")
+                
                 # Métricas de Performance del Modelo
                 st.subheader("📊 Métricas de Performance")
                 col1, col2, col3 = st.columns(3)
@@ -1024,6 +1139,16 @@ def training_page(train_use_case):
                             accuracy_pct = "N/A"
                     st.metric("✅ Precisión", accuracy_pct, help="Basado en R² Score (*Estimado si no disponible)")
                 
+                # Costo del backend (registrado también en MLflow para comparar runs)
+                if result.training_time_seconds is not None:
+                    col7, col8, col9 = st.columns(3)
+                    with col7:
+                        st.metric("⏱️ Entrenamiento", f"{result.training_time_seconds:.1f}s", help=f"Backend: {result.backend}")
+                    with col8:
+                        st.metric("💾 Tamaño del modelo", f"{result.model_size_bytes / 1024**2:.1f} MB")
+                    with col9:
+                        st.metric("⚡ Latencia por fila", f"{result.single_row_latency_ms:.2f} ms")
+                
                                 
             except Exception as e:
                 st.error(f"Error en el entrenamiento: {str(e)}")
@@ -1054,7 +1179,17 @@ def data_analysis_page(data_repository):
             with col3:
                 st.metric("Valores Nulos", df.isnull().sum().sum())
             with col4:
-                st.metric("Memoria (MB)", f"{df.memory_usage(deep=True).sum() / 1024**2:.1f}")
+                memory = df.attrs.get('memory_report')
+                if memory:
+                    st.metric(
+                        "Memoria (MB)",
+                        f"{memory['memory_bytes'] / 1024**2:.1f}",
+                        delta=f"-{memory['saved_bytes'] / 1024**2:.1f} MB ({memory['saved_pct']:.0f}%)",
+                        delta_color="inverse",
+                        help="Ahorro estimado frente a leer el CSV con los tipos por defecto"
+                    )
+                else:
+                    st.metric("Memoria (MB)", f"{df.memory_usage(deep=True).sum() / 1024**2:.1f}")
             
             st.subheader("Vista Previa de Datos")
             st.dataframe(df.head())
@@ -1078,9 +1213,9 @@ def data_analysis_page(data_repository):
                 
                 with col2:
                     if 'area_m2' in df.columns:
-                        df_clean = df.copy()
-                        if df_clean['area_m2'].dtype == 'object':
-                            df_clean['area_m2'] = df_clean['area_m2'].str.replace('m2', '').astype(float)
+                        df_clean = df[['area_m2', 'Sale Amount']].copy()
+                        if not pd.api.types.is_numeric_dtype(df_clean['area_m2']):
+                            df_clean['area_m2'] = df_clean['area_m2'].astype(str).str.replace('m2', '').astype(float)
                         
                         fig_scatter = px.scatter(
                             df_clean, 
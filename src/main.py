@@ -13,9 +13,18 @@ load_dotenv()
 import mlflow
 mlflow.set_tracking_uri(os.getenv('MLFLOW_TRACKING_URI', 'http://localhost:5000'))
 
-from infrastructure.data.data_loader import CSVDataLoader
+from infrastructure.data.data_loader import CSVDataLoader, PREPROCESSING_VERSION
+from infrastructure.data.feature_cache import FeatureCache
+from infrastructure.data.cached_data_repository import CachedDataRepository
+from infrastructure.data.sharded_data_repository import ShardedDataRepository
+from infrastructure.ml.compute_budget import ComputeBudget
+from infrastructure.ml.artifact_cache import ModelArtifactCache
 from infrastructure.ml.mlflow_repository import MLflowModelRepository
+from infrastructure.ml.model_index import DEFAULT_INDEX_TTL_SECONDS
+from infrastructure.ml.model_pool import DEFAULT_POOL_MAX_BYTES, ModelPool
 from infrastructure.ml.model_trainer import RealEstateModelTrainer, RealEstatePredictionService
+from infrastructure.ml.online_trainer import OnlineModelTrainer
+from infrastructure.ml.trial_store import TrialStore
 from application.use_cases.train_model import TrainModelUseCase
 from application.use_cases.predict_price import PredictPriceUseCase
 from application.dto.property_dto import PropertyInputDTO
@@ -29,12 +38,59 @@ def setup_dependencies():
     """
     
     # Repositorios (Infrastructure)
-    data_repository = CSVDataLoader()
-    model_repository = MLflowModelRepository()
+    feature_cache = FeatureCache(
+        cache_dir=os.getenv('FEATURE_CACHE_DIR', 'data/feature_cache'),
+        max_bytes=int(os.getenv('FEATURE_CACHE_MAX_MB', '2048')) * 1024**2,
+        preprocessing_version=PREPROCESSING_VERSION
+    )
+    memory_budget_mb = os.getenv('PREPROCESS_MEMORY_BUDGET_MB')
+    data_loader = CSVDataLoader(
+        memory_budget_mb=float(memory_budget_mb) if memory_budget_mb else None,
+        engine=os.getenv('CSV_ENGINE', 'pandas'),
+        track_memory=os.getenv('PREPROCESS_TRACK_MEMORY', 'false').lower() == 'true'
+    )
+    data_workers = os.getenv('DATA_LOADER_WORKERS')
+    data_repository = ShardedDataRepository(
+        CachedDataRepository(data_loader, feature_cache),
+        max_workers=int(data_workers) if data_workers else None
+    )
+    index_ttl = os.getenv('MODEL_INDEX_TTL_SECONDS')
+    model_repository = MLflowModelRepository(
+        index_ttl_seconds=float(index_ttl) if index_ttl else DEFAULT_INDEX_TTL_SECONDS,
+        artifact_cache=ModelArtifactCache(
+            cache_dir=os.getenv('MODEL_CACHE_DIR', 'data/model_cache'),
+            max_bytes=int(os.getenv('MODEL_CACHE_MAX_MB', '2048')) * 1024**2
+        )
+    )
     
     # Servicios (Infrastructure)
-    training_service = RealEstateModelTrainer(data_repository, model_repository)
-    prediction_service = RealEstatePredictionService(model_repository)
+    if os.getenv('TRAINING_MODE', 'batch') == 'online':
+        # Exports que no entran en memoria: SGD por chunks (TRAINING_CHUNK_ROWS)
+        chunk_rows = os.getenv('TRAINING_CHUNK_ROWS')
+        training_service = OnlineModelTrainer(
+            data_repository,
+            model_repository,
+            chunk_rows=int(chunk_rows) if chunk_rows else None
+        )
+    else:
+        training_service = RealEstateModelTrainer(
+            data_repository,
+            model_repository,
+            trial_store=TrialStore(os.getenv('HP_TRIAL_STORE', 'data/hp_trials.sqlite'))
+        )
+    pool_max_mb = os.getenv('MODEL_POOL_MAX_MB')
+    model_pool = ModelPool(
+        model_repository.load_model,
+        max_bytes=int(pool_max_mb) * 1024**2 if pool_max_mb else DEFAULT_POOL_MAX_BYTES
+    )
+    # Versiones que se sirven junto a la actual (candidatas, por segmento), precargadas en paralelo
+    pinned = [uri.strip() for uri in os.getenv('MODEL_POOL_PINNED', '').split(',') if uri.strip()]
+    model_pool.pin(pinned)
+    prediction_service = RealEstatePredictionService(
+        model_repository,
+        model_pool=model_pool,
+        model_selector=os.getenv('MODEL_SELECTOR', 'best')
+    )
     
     # Casos de uso (Application)
     train_use_case = TrainModelUseCase(data_repository, model_repository, training_service)
@@ -52,12 +108,17 @@ def train_example():
     # Configurar parámetros de entrenamiento
     data_path = "data/dataset_inmobi.csv"  # Ajustar según tu estructura
     
+    # Presupuesto de cómputo (TRAIN_N_JOBS / TRAIN_MAX_THREADS)
+    compute_budget = ComputeBudget.from_env()
+    
     try:
         result = train_use_case.execute(
             file_path=data_path,
             n_estimators=100,
             max_depth=5,
-            experiment_name="Grupo_2_Proyecto_Inmobiliario"
+            experiment_name="Grupo_2_Proyecto_Inmobiliario",
+            n_jobs=compute_budget.n_jobs,
+            max_threads=compute_budget.max_threads
         )
         
         print(f"✅ Entrenamiento completado!")
@@ -0,0 +1,51 @@
+import pandas as pd
+from infrastructure.data.cached_data_repository import CachedDataRepository
+from infrastructure.data.data_loader import CSVDataLoader, PREPROCESSING_VERSION
+from infrastructure.data.feature_cache import FeatureCache
+
+
+def assert_same_features(actual, expected):
+    X, y = actual
+    X_expected, y_expected = expected
+    pd.testing.assert_frame_equal(X.reset_index(drop=True), X_expected.reset_index(drop=True))
+    pd.testing.assert_series_equal(y.reset_index(drop=True), y_expected.reset_index(drop=True), check_names=False)
+
+
+def test_appended_rows_match_full_reload(property_csv):
+    path, append = property_csv
+    loader = CSVDataLoader()
+    append(300, seed=1)
+    X_old, y_old = loader.load_features(path)
+    offset = loader.data_watermark(path)['byte_offset']
+
+    append(120, seed=2)
+    X_new, y_new = loader.load_appended_features(path, offset)
+
+    assert len(X_new) > 0
+    assert_same_features(
+        (pd.concat([X_old, X_new]), pd.concat([y_old, y_new])),
+        CSVDataLoader().load_features(path)
+    )
+
+
+def test_cached_repository_ingests_appended_rows(property_csv, tmp_path):
+    path, append = property_csv
+    repository = CachedDataRepository(CSVDataLoader(), FeatureCache(str(tmp_path / "cache"), 10**8, PREPROCESSING_VERSION))
+    append(300, seed=1)
+    repository.load_features(path)
+
+    append(120, seed=2)
+    incremental = repository.load_features(path)
+
+    assert_same_features(incremental, CSVDataLoader().load_features(path))
+    # La entrada ampliada se sirve desde la caché en la siguiente carga
+    assert_same_features(repository.load_features(path), incremental)
+
+
+def test_no_watermark_while_last_row_is_incomplete(property_csv):
+    path, append = property_csv
+    append(10, seed=1)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write("10;2020;10/05/2020;Portland;10 MAIN ST;")
+
+    assert CSVDataLoader().data_watermark(path) is None
@@ -0,0 +1,101 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+from infrastructure.ml.model_pool import ModelPool
+from infrastructure.ml.single_flight import SingleFlight
+
+N_THREADS = 16
+MODEL_BYTES = 8 * 1000
+
+
+class CountingLoader:
+    """Loader lento que cuenta las cargas por URI; cada modelo ocupa MODEL_BYTES."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, model_uri, **metadata):
+        with self._lock:
+            self.calls[model_uri] = self.calls.get(model_uri, 0) + 1
+        time.sleep(self.delay)
+        return np.zeros(MODEL_BYTES // 8)
+
+
+def run_concurrently(function, n_threads=N_THREADS):
+    barrier = threading.Barrier(n_threads)
+
+    def call(_):
+        barrier.wait()
+        return function()
+
+    with ThreadPoolExecutor(max_workers=n_threads) as executor:
+        return list(executor.map(call, range(n_threads)))
+
+
+def test_single_flight_runs_once_for_concurrent_callers():
+    flight = SingleFlight()
+    calls = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.2)
+        return object()
+
+    results = run_concurrently(lambda: flight.do('model', work))
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_single_flight_shares_the_error_and_releases_the_key():
+    flight = SingleFlight()
+
+    def fail():
+        time.sleep(0.2)
+        raise RuntimeError("sin modelo")
+
+    errors = run_concurrently(lambda: pytest.raises(RuntimeError, flight.do, 'model', fail))
+    assert len(errors) == N_THREADS
+    assert flight.do('model', lambda: 'cargado') == 'cargado'
+
+
+def test_pool_loads_each_model_once_under_concurrent_gets():
+    loader = CountingLoader(delay=0.2)
+    pool = ModelPool(loader, max_bytes=10 * MODEL_BYTES)
+
+    models = run_concurrently(lambda: pool.get('models:/m-1'))
+
+    assert loader.calls == {'models:/m-1': 1}
+    assert all(model is models[0] for model in models)
+    assert pool.get('models:/m-1') is models[0]
+
+
+def test_eviction_never_drops_a_pinned_model():
+    loader = CountingLoader()
+    pool = ModelPool(loader, max_bytes=2 * MODEL_BYTES)
+    assert pool.pin(['models:/pinned']) == []
+
+    for i in range(5):
+        pool.get(f'models:/m-{i}')
+
+    loaded = {entry['model_uri']: entry for entry in pool.stats()['models']}
+    assert loaded['models:/pinned']['pinned']
+    assert loader.calls['models:/pinned'] == 1
+    assert pool.stats()['total_bytes'] <= pool.max_bytes
+
+
+def test_pinned_models_stay_loaded_over_budget_until_unpinned():
+    loader = CountingLoader()
+    pool = ModelPool(loader, max_bytes=MODEL_BYTES)
+    pool.pin(['models:/a', 'models:/b'])
+
+    pool.get('models:/c')
+    assert {entry['model_uri'] for entry in pool.stats()['models']} >= {'models:/a', 'models:/b'}
+
+    pool.unpin('models:/a')
+    assert 'models:/a' not in {entry['model_uri'] for entry in pool.stats()['models']}
+    assert 'models:/b' in {entry['model_uri'] for entry in pool.stats()['models']}
@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+import pytest
+from mlflow.store.entities.paged_list import PagedList
+from infrastructure.ml.model_index import ModelVersionIndex, is_better
+
+
+class FakeClient:
+    """MlflowClient mínimo: versiones registradas y sus runs (métricas por run)."""
+
+    def __init__(self):
+        self.versions = []
+        self.runs = {}
+
+    def register(self, metrics, tags=None):
+        run_id = f"run-{len(self.versions) + 1}"
+        self.versions.append(SimpleNamespace(version=str(len(self.versions) + 1), run_id=run_id,
+                                             source=f"models:/m-{run_id}"))
+        self.runs[run_id] = SimpleNamespace(
+            info=SimpleNamespace(run_id=run_id),
+            data=SimpleNamespace(params={}, metrics=metrics, tags=tags or {})
+        )
+
+    def search_model_versions(self, filter_string, max_results, order_by, page_token=None):
+        return PagedList(sorted(self.versions, key=lambda v: -int(v.version))[:max_results], None)
+
+    def search_experiments(self, view_type=None, page_token=None):
+        return PagedList([SimpleNamespace(experiment_id='0')], None)
+
+    def search_runs(self, experiment_ids, filter_string, run_view_type=None, page_token=None):
+        return PagedList([run for run_id, run in self.runs.items() if f"'{run_id}'" in filter_string], None)
+
+
+@pytest.mark.parametrize("metric_name, value, best, expected", [
+    ('rmse', 90.0, 100.0, True),
+    ('rmse', 110.0, 100.0, False),
+    ('mae', 90.0, 100.0, True),
+    ('mse', 110.0, 100.0, False),
+    ('r2_score', 0.9, 0.8, True),
+    ('r2_score', 0.7, 0.8, False),
+    ('rmse', 100.0, 100.0, False),
+])
+def test_is_better_minimizes_error_metrics(metric_name, value, best, expected):
+    assert is_better(metric_name, value, best) is expected
+
+
+def test_best_version_by_error_and_score_metrics():
+    client = FakeClient()
+    client.register({'rmse': 120.0, 'mae': 90.0, 'r2_score': 0.80})
+    client.register({'rmse': 100.0, 'mae': 95.0, 'r2_score': 0.85})
+    client.register({'rmse': 110.0, 'mae': 80.0, 'r2_score': 0.82})
+    index = ModelVersionIndex(client, 'model', ttl_seconds=0)
+
+    assert index.best('rmse')['version'] == 2
+    assert index.best('mae')['version'] == 3
+    assert index.best('r2_score')['version'] == 2
+
+
+def test_tie_goes_to_the_newer_version():
+    client = FakeClient()
+    client.register({'rmse': 100.0})
+    client.register({'rmse': 100.0}, tags={'parent_run_id': 'run-1'})
+    index = ModelVersionIndex(client, 'model', ttl_seconds=0)
+
+    best = index.best('rmse')
+    assert best['version'] == 2
+    assert best['tags']['parent_run_id'] == 'run-1'
+
+
+def test_index_picks_up_versions_registered_after_the_first_refresh():
+    client = FakeClient()
+    client.register({'rmse': 100.0})
+    index = ModelVersionIndex(client, 'model', ttl_seconds=3600)
+    assert index.best('rmse')['version'] == 1
+
+    client.register({'rmse': 90.0})
+    assert index.best('rmse')['version'] == 1  # TTL vigente
+    index.invalidate()
+    assert index.best('rmse')['version'] == 2
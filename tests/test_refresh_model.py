@@ -0,0 +1,124 @@
+import json
+import numpy as np
+import pytest
+from sklearn.model_selection import train_test_split
+from domain.repositories.model_repository import ModelRepository, ModelRunRepository
+from infrastructure.data.data_loader import CSVDataLoader
+from infrastructure.ml.metrics import compute_regression_metrics
+from infrastructure.ml.model_index import is_better
+from infrastructure.ml.model_trainer import RealEstateModelTrainer
+
+
+class InMemoryModelRepository(ModelRepository, ModelRunRepository):
+    """Registry en memoria: guarda params y tags como texto, igual que MLflow."""
+
+    def __init__(self):
+        self.runs = []
+
+    def save_model(self, model, params, metrics, input_example=None, signature=None, tags=None, **kwargs):
+        run_id = f"run-{len(self.runs) + 1}"
+        self.runs.append({
+            'run_id': run_id,
+            'model_uri': f"models:/m-{run_id}",
+            'version': len(self.runs) + 1,
+            'params': {name: str(value) for name, value in params.items()},
+            'metrics': dict(metrics),
+            'tags': dict(tags or {}),
+            'model': model
+        })
+        return self.runs[-1]['model_uri']
+
+    def load_model(self, model_uri):
+        return next(run['model'] for run in self.runs if run['model_uri'] == model_uri)
+
+    def get_best_model(self, metric_name="rmse"):
+        return self.load_model(self.get_best_run(metric_name)['model_uri'])
+
+    def set_experiment(self, experiment_name):
+        pass
+
+    def get_best_run(self, metric_name="rmse"):
+        best = None
+        for run in self.runs:
+            if best is None or not is_better(metric_name, best['metrics'][metric_name], run['metrics'][metric_name]):
+                best = run
+        return best
+
+    def resolve_model(self, selector="best", metric_name="rmse"):
+        best = self.get_best_run(metric_name)
+        return {'model_uri': best['model_uri'], 'version': best['version'], 'run_id': best['run_id']}
+
+
+@pytest.fixture
+def trained(property_csv):
+    path, append = property_csv
+    append(600, seed=1)
+    repository = InMemoryModelRepository()
+    trainer = RealEstateModelTrainer(CSVDataLoader(), repository)
+    trainer.train_model(path, n_estimators=10, max_depth=6, random_state=7, test_size=0.25)
+    return path, append, repository, trainer
+
+
+def holdout_metrics(path, run, model):
+    """Métricas del modelo sobre las filas reservadas que declara el tag holdout del run."""
+    X, y = CSVDataLoader().load_features(path)
+    positions = np.sort(np.concatenate([
+        first + train_test_split(np.arange(n_rows), test_size=test_size, random_state=random_state)[1]
+        for first, n_rows, test_size, random_state in json.loads(run['tags']['holdout'])
+    ]))
+    return compute_regression_metrics(y.iloc[positions], model.predict(X.iloc[positions].to_numpy())), len(positions)
+
+
+def test_refresh_registers_the_evaluated_forest(trained):
+    path, append, repository, trainer = trained
+    parent = repository.runs[0]
+    append(400, seed=2)
+
+    result = trainer.refresh_model(test_size=0.25)
+
+    assert result['refreshed']
+    child = repository.runs[-1]
+    assert child['params']['parent_run_id'] == parent['run_id']
+    # El holdout extiende el split de test del padre con una parte de las filas nuevas
+    segments = json.loads(child['tags']['holdout'])
+    assert segments[0] == [0, int(parent['params']['data_rows']), 0.25, 7]
+    assert segments[1][:2] == [int(parent['params']['data_rows']), result['new_rows']]
+
+    # Las métricas registradas son las del bosque registrado sobre ese holdout, no las del padre
+    forest = child['model'].named_steps['model']
+    metrics, n_holdout = holdout_metrics(path, child, forest)
+    assert int(child['params']['holdout_rows']) == n_holdout
+    assert len(forest.estimators_) == result['n_estimators']
+    for name in ('rmse', 'mae', 'r2_score'):
+        assert child['metrics'][name] == pytest.approx(metrics[name])
+    assert child['metrics']['rmse'] != parent['metrics']['rmse']
+
+    parent_metrics, _ = holdout_metrics(path, child, parent['model'].named_steps['model'])
+    assert child['metrics']['parent_rmse'] == pytest.approx(parent_metrics['rmse'])
+    assert child['metrics']['rmse'] < child['metrics']['parent_rmse']
+
+
+def test_refresh_of_a_refreshed_model_keeps_its_holdout(trained):
+    path, append, repository, trainer = trained
+    append(400, seed=2)
+    trainer.refresh_model(test_size=0.25, n_new_trees=10)
+    first = repository.runs[-1]
+    append(400, seed=3)
+
+    result = trainer.refresh_model(test_size=0.25, n_new_trees=10)
+
+    assert result['refreshed'] and result['parent_run_id'] == first['run_id']
+    child = repository.runs[-1]
+    assert json.loads(child['tags']['holdout'])[:2] == json.loads(first['tags']['holdout'])
+    assert child['tags']['lineage'] == f"{repository.runs[0]['run_id']},{first['run_id']}"
+    metrics, _ = holdout_metrics(path, child, child['model'].named_steps['model'])
+    assert child['metrics']['rmse'] == pytest.approx(metrics['rmse'])
+
+
+def test_refresh_without_new_rows_keeps_the_parent(trained):
+    path, append, repository, trainer = trained
+
+    result = trainer.refresh_model()
+
+    assert not result['refreshed']
+    assert len(repository.runs) == 1